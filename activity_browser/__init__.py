@@ -1,12 +1,9 @@
 # -*- coding: utf-8 -*-
 import os
+import platform
 import sys
 import traceback
 
-from PySide2.QtCore import QSysInfo, __version__ as qt_version
-from PySide2.QtWidgets import QApplication
-
-from .application import Application
 from .info import __version__
 
 
@@ -14,15 +11,32 @@ from .info import __version__
 # https://bugreports.qt.io/browse/QTBUG-85546
 # https://github.com/mapeditor/tiled/issues/2845
 # https://doc.qt.io/qt-5/qoperatingsystemversion.html#MacOSBigSur-var
-if QSysInfo.productType() == "osx" and (
-    QSysInfo.productVersion() == "10.16" or QSysInfo.productVersion() == "11.0"
-):
+if sys.platform == "darwin" and ".".join(platform.mac_ver()[0].split(".")[:2]) in ("10.16", "11.0"):
     os.environ["QT_MAC_WANTS_LAYER"] = "1"
     os.environ["QTWEBENGINE_CHROMIUM_FLAGS"] = "--disable-gpu"
     print("Warning! The currently used version of Qt cannot properly handle BigSur yet.")
 
 
+def __getattr__(name):
+    """ The Qt application is imported on first use, this allows the
+    calculation code to be used without PySide2 (see `activity_browser.batch`).
+    """
+    if name == "Application":
+        from .application import Application
+        return Application
+    raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
+
+
+if sys.version_info < (3, 7):
+    # Module level __getattr__ is only supported from python 3.7 onwards.
+    from .application import Application
+
+
 def run_activity_browser():
+    from PySide2.QtCore import __version__ as qt_version
+    from PySide2.QtWidgets import QApplication
+    from .application import Application
+
     qapp = QApplication(sys.argv)
     # qapp.setFont(default_font)
     application = Application()
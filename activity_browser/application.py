@@ -1,10 +1,12 @@
 # -*- coding: utf-8 -*-
 from .controllers import controllers
 from .layouts import MainWindow
+from .settings import project_settings
 
 
 class Application(object):
     def __init__(self):
+        project_settings.connect_signals()
         self.main_window = MainWindow()
 
         # Instantiate all the controllers.
@@ -0,0 +1,214 @@
+# -*- coding: utf-8 -*-
+"""Calculate calculation setups without the graphical interface.
+
+The scores and the top contributions of every calculation setup are written
+to disk in a columnar format (parquet by default, or feather), one directory
+per calculation setup. The columnar formats require pyarrow, without it the
+results are written as csv files by default. The optional superstructure
+files are combined in the same way as in the LCA setup tab and applied to
+every calculation setup.
+
+This module does not import PySide2, allowing it to run on machines
+without a display, e.g.:
+
+    python run-batch.py --project ecoinvent --output results --processes 4
+"""
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+import importlib.util
+from pathlib import Path
+import sys
+import traceback
+from typing import List, Optional
+
+import brightway2 as bw
+import numpy as np
+import pandas as pd
+
+from .bwutils import MLCA, MonteCarloLCA, SuperstructureMLCA
+from .bwutils.superstructure import SuperstructureManager, import_from_excel
+
+FORMATS = ("parquet", "feather", "csv")
+
+
+def has_pyarrow() -> bool:
+    return importlib.util.find_spec("pyarrow") is not None
+
+
+def default_format() -> str:
+    """Return parquet, or csv if pyarrow is not installed."""
+    return "parquet" if has_pyarrow() else "csv"
+
+
+def check_format(fmt: str) -> None:
+    """Raise a ValueError if results can not be written in the given format,
+    parquet and feather files require pyarrow.
+    """
+    if fmt not in FORMATS:
+        raise ValueError("Unknown format: {}".format(fmt))
+    if fmt != "csv" and not has_pyarrow():
+        raise ValueError("Writing {} files requires pyarrow, use 'csv' or install pyarrow".format(fmt))
+
+
+def load_scenarios(paths: List[str], kind: str = "product") -> Optional[pd.DataFrame]:
+    """Read and combine the superstructure files, the first sheet after the
+    'information' sheet is used.
+    """
+    if not paths:
+        return None
+    frames = [import_from_excel(path) for path in paths]
+    return SuperstructureManager(*frames).combined_data(kind)
+
+
+def scores_frame(mlca: MLCA) -> pd.DataFrame:
+    """Return the LCA scores as a tidy dataframe."""
+    scenarios = getattr(mlca, "scenario_names", [None])
+    scores = mlca.lca_scores.reshape(len(mlca.func_units), len(mlca.methods), -1)
+    rows = [
+        (str(fu_key), ", ".join(method), scenario, scores[i, j, k])
+        for i, fu_key in enumerate(mlca.fu_activity_keys)
+        for j, method in enumerate(mlca.methods)
+        for k, scenario in enumerate(scenarios)
+    ]
+    return pd.DataFrame(rows, columns=["reference flow", "method", "scenario", "score"])
+
+
+def contributions_frame(mlca: MLCA, contributions, rev_index: dict, limit: int) -> pd.DataFrame:
+    """Return the `limit` largest (absolute) contributions of every
+    reference flow, method and scenario as a tidy dataframe.
+    """
+    scenarios = getattr(mlca, "scenario_names", [None])
+    rows = []
+    for i, fu_key in enumerate(mlca.fu_activity_keys):
+        for j, method in enumerate(mlca.methods):
+            for k, scenario in enumerate(scenarios):
+                index = (i, j) if scenario is None else (i, j, k)
+                data = np.asarray(contributions[index])
+                top = np.argsort(-np.abs(data))[:limit]
+                rows.extend(
+                    (str(fu_key), ", ".join(method), scenario, str(rev_index[c]), data[c])
+                    for c in top if data[c] != 0
+                )
+    return pd.DataFrame(
+        rows, columns=["reference flow", "method", "scenario", "flow", "amount"]
+    )
+
+
+def write_frame(df: pd.DataFrame, path: Path, fmt: str) -> None:
+    path = path.with_suffix("." + fmt)
+    if fmt == "parquet":
+        df.to_parquet(path, index=False)
+    elif fmt == "feather":
+        df.reset_index(drop=True).to_feather(path)
+    else:
+        df.to_csv(path, index=False)
+
+
+def run_setup(project: str, cs_name: str, output: str, fmt: Optional[str] = None,
+              scenarios: Optional[pd.DataFrame] = None, limit: int = 10,
+              iterations: int = 0) -> str:
+    """Calculate a single calculation setup and write the results to a
+    directory named after the calculation setup, in the `default_format`
+    if no format is given.
+    """
+    fmt = fmt or default_format()
+    check_format(fmt)
+    bw.projects.set_current(project)
+    if scenarios is None:
+        mlca = MLCA(cs_name)
+    else:
+        mlca = SuperstructureMLCA(cs_name, scenarios)
+    mlca.calculate()
+
+    directory = Path(output, cs_name.replace("/", "_"))
+    directory.mkdir(parents=True, exist_ok=True)
+    write_frame(scores_frame(mlca), directory / "scores", fmt)
+    write_frame(contributions_frame(
+        mlca, mlca.process_contributions, mlca.rev_activity_dict, limit
+    ), directory / "process_contributions", fmt)
+    write_frame(contributions_frame(
+        mlca, mlca.elementary_flow_contributions, mlca.rev_biosphere_dict, limit
+    ), directory / "elementary_flow_contributions", fmt)
+
+    if iterations:
+        mc = MonteCarloLCA(cs_name)
+        mc.calculate(iterations=iterations)
+        frames = [
+            mc.get_results_dataframe(method=method, labelled=False).assign(method=", ".join(method))
+            for method in mc.methods
+        ]
+        df = pd.concat(frames).rename_axis("iteration").reset_index()
+        df.columns = [str(c) for c in df.columns]
+        write_frame(df, directory / "monte_carlo", fmt)
+    return cs_name
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Calculate calculation setups without the graphical interface."
+    )
+    parser.add_argument("--project", required=True, help="Brightway project to use")
+    parser.add_argument(
+        "--setups", nargs="+",
+        help="Names of the calculation setups, all setups in the project by default"
+    )
+    parser.add_argument(
+        "--scenarios", nargs="+", default=[],
+        help="Superstructure (scenario) excel files applied to every setup"
+    )
+    parser.add_argument(
+        "--combine", choices=("product", "addition"), default="product",
+        help="How multiple scenario files are combined"
+    )
+    parser.add_argument("--output", default="results", help="Output directory")
+    parser.add_argument(
+        "--format", choices=FORMATS, default=default_format(),
+        help="Format of the result files, parquet by default (csv without pyarrow)"
+    )
+    parser.add_argument(
+        "--limit", type=int, default=10,
+        help="Amount of top contributions to write per reference flow and method"
+    )
+    parser.add_argument(
+        "--monte-carlo", type=int, default=0, metavar="ITERATIONS",
+        help="Also perform a Monte Carlo simulation with this many iterations"
+    )
+    parser.add_argument(
+        "--processes", type=int, default=1,
+        help="Amount of calculation setups calculated in parallel"
+    )
+    args = parser.parse_args(argv)
+    try:
+        check_format(args.format)
+    except ValueError as e:
+        parser.error(str(e))
+
+    if args.project not in bw.projects:
+        parser.error("Unknown project: {}".format(args.project))
+    bw.projects.set_current(args.project)
+    setups = args.setups or sorted(bw.calculation_setups)
+    unknown = [cs for cs in setups if cs not in bw.calculation_setups]
+    if unknown:
+        parser.error("Unknown calculation setup(s): {}".format(", ".join(unknown)))
+    scenarios = load_scenarios(args.scenarios, args.combine)
+
+    jobs = [
+        (args.project, cs, args.output, args.format, scenarios, args.limit, args.monte_carlo)
+        for cs in setups
+    ]
+    failed = 0
+    with ProcessPoolExecutor(max_workers=max(1, args.processes)) as executor:
+        futures = {executor.submit(run_setup, *job): job[1] for job in jobs}
+        for future, cs_name in futures.items():
+            try:
+                future.result()
+                print("Finished calculation setup:", cs_name)
+            except Exception:
+                failed += 1
+                print("Calculation setup '{}' failed:".format(cs_name))
+                traceback.print_exc()
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
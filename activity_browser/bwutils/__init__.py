@@ -4,6 +4,7 @@ bwutils is a collection of methods that build upon brightway2 and are generic en
 re-typing the same code in different parts of the Activity Browser.
 """
 import brightway2 as bw
+from .graph_traversal import SharedGraphTraversal
 from .metadata import AB_metadata
 from .multilca import MLCA, Contributions
 from .pedigree import PedigreeMatrix
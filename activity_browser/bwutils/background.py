@@ -0,0 +1,183 @@
+# -*- coding: utf-8 -*-
+import os
+from pathlib import Path
+import shutil
+from typing import Iterable, NamedTuple
+
+import brightway2 as bw
+import numpy as np
+from scipy.sparse.linalg import splu
+
+from .matrix_cache import matrix_cache
+from .profiling import profiler
+from .result_cache import ResultCache
+from ..settings import ab_settings
+
+
+class Background(object):
+    """The pre-aggregated inventory of a set of background databases.
+
+    `cumulative` is a memory-mapped (products, flows) array which holds the
+    cumulative life cycle inventory of one unit of every background
+    product, where `products` and `flows` contain the brightway mapping ids
+    of the rows and columns.
+    """
+    BLOCK_SIZE = 1024
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.products = np.load(path / "products.npy")
+        self.flows = np.load(path / "flows.npy")
+        self.cumulative = np.load(path / "cumulative.npy", mmap_mode="r")
+        self.product_index = {p: i for i, p in enumerate(self.products.tolist())}
+        self.flow_index = {f: i for i, f in enumerate(self.flows.tolist())}
+
+    def cumulative_scores(self, methods: list, factors: np.ndarray) -> np.ndarray:
+        """Return the (products, methods) cumulative scores of the background
+        products, given the (methods, flows) characterization factors.
+
+        The scores of every method are calculated once and stored next to
+        the cumulative inventory.
+        """
+        scores = np.zeros((len(self.products), len(methods)))
+        for col, (method, cfs) in enumerate(zip(methods, factors)):
+            path = self.path / "scores_{}.npy".format(ResultCache.hash(method, cfs.tobytes()))
+            if path.is_file():
+                scores[:, col] = np.load(path)
+                continue
+            for start in range(0, len(self.products), self.BLOCK_SIZE):
+                rows = slice(start, start + self.BLOCK_SIZE)
+                scores[rows, col] = self.cumulative[rows] @ cfs
+            np.save(path, scores[:, col])
+        return scores
+
+
+class ForegroundSystem(NamedTuple):
+    """The partition of LCA matrices into a foreground system and a
+    pre-aggregated background.
+
+    `products` and `activities` are the foreground rows and columns of the
+    technosphere matrix, `background_rows` are the background rows and
+    `background_products` their rows in the `background`. `flows` are the
+    rows of the biosphere matrix of the background flows.
+    """
+    products: np.ndarray
+    activities: np.ndarray
+    background_rows: np.ndarray
+    background_products: np.ndarray
+    flows: np.ndarray
+    background: Background
+
+
+class BackgroundStore(object):
+    """Pre-aggregates background databases once per database version, so
+    calculations on foreground databases that link into them only have to
+    solve the foreground system.
+
+    Every entry is a directory named '<databases>_<version>', where
+    'databases' is a hash of the database names and 'version' is the key
+    of their processed files in the `matrix_cache`. Building the entry of
+    a new version removes the entries of older versions.
+
+    The total size of the store is limited by the `background_cache_size`
+    setting, the least recently used entries are removed first. The entry
+    in use is never removed.
+    """
+    DIRECTORY = "ab_background"
+
+    @property
+    def directory(self) -> Path:
+        return Path(bw.projects.dir, self.DIRECTORY)
+
+    @property
+    def max_size(self) -> int:
+        return ab_settings.background_cache_size * 1024 ** 2
+
+    @property
+    def enabled(self) -> bool:
+        return ab_settings.background_aggregation
+
+    @staticmethod
+    def paths(databases: Iterable[str]) -> list:
+        return [str(bw.Database(db).filepath_processed()) for db in sorted(databases)]
+
+    def get(self, databases: Iterable[str]) -> Background:
+        """Return the pre-aggregated background of the given databases,
+        building it if the databases were changed since the last build.
+        """
+        databases = sorted(databases)
+        paths = self.paths(databases)
+        name = ResultCache.hash(*databases)
+        path = self.directory / "{}_{}".format(name, matrix_cache.key(paths))
+        if not path.is_dir():
+            self.directory.mkdir(exist_ok=True)
+            for stale in self.directory.glob("{}_*".format(name)):
+                shutil.rmtree(stale, ignore_errors=True)
+            with profiler.stage("Aggregate background", "BackgroundStore"):
+                self.build(paths, path)
+        # Mark the entry as recently used.
+        os.utime(path)
+        self.evict(keep=path)
+        return Background(path)
+
+    @staticmethod
+    def build(paths: list, path: Path) -> None:
+        """Calculate the cumulative inventory of every product in the given
+        processed database files.
+
+        The inventory of all products is given by B A^-1, which is
+        calculated by solving the transposed technosphere matrix against
+        the (transposed) biosphere flows in blocks.
+        """
+        _, _, bio_dict, _, product_dict, biosphere, technosphere = matrix_cache.build(paths)
+        # Write to a temporary directory first, so an interrupted build never
+        # leaves a broken entry behind.
+        temp = path.with_suffix(".tmp")
+        shutil.rmtree(temp, ignore_errors=True)
+        temp.mkdir()
+        np.save(temp / "products", np.array(sorted(product_dict, key=product_dict.get), dtype=np.int64))
+        np.save(temp / "flows", np.array(sorted(bio_dict, key=bio_dict.get), dtype=np.int64))
+        cumulative = np.lib.format.open_memmap(
+            temp / "cumulative.npy", mode="w+", dtype=np.float64,
+            shape=(len(product_dict), len(bio_dict)),
+        )
+        if cumulative.size:
+            solver = splu(technosphere.T.tocsc())
+            rhs = biosphere.T.tocsc()
+            for start in range(0, len(bio_dict), Background.BLOCK_SIZE):
+                cols = slice(start, start + Background.BLOCK_SIZE)
+                cumulative[:, cols] = solver.solve(rhs[:, cols].toarray())
+        cumulative.flush()
+        del cumulative
+        os.replace(temp, path)
+
+    @staticmethod
+    def _size(path: Path) -> int:
+        return sum(p.stat().st_size for p in path.iterdir())
+
+    def evict(self, keep: Path = None) -> None:
+        """Remove the least recently used entries, other than `keep`, until
+        the store fits in the size given by the settings.
+        """
+        if not self.directory.is_dir():
+            return
+        entries = sorted(
+            ((p.stat().st_mtime, self._size(p), p) for p in self.directory.iterdir()
+             if p.is_dir() and not p.suffix),
+            key=lambda x: x[0]
+        )
+        size = sum(x[1] for x in entries)
+        for _, entry_size, path in entries:
+            if size <= self.max_size:
+                break
+            if path == keep:
+                continue
+            shutil.rmtree(path, ignore_errors=True)
+            size -= entry_size
+
+    def clear(self) -> None:
+        """Remove all of the pre-aggregated backgrounds of the current project."""
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+
+background_store = BackgroundStore()
@@ -0,0 +1,27 @@
+# -*- coding: utf-8 -*-
+import brightway2 as bw
+
+from .multilca import MLCA
+
+
+class SharedGraphTraversal(bw.GraphTraversal):
+    """Graph traversal which draws the matrices and the factorized
+    technosphere matrix from an MLCA, instead of constructing and
+    factorizing a new LCA for every traversal.
+
+    Demands which are not part of the MLCA matrices fall back to the
+    regular brightway graph traversal.
+    """
+    def __init__(self, mlca: MLCA):
+        self.mlca = mlca
+
+    def build_lca(self, demand: dict, method: tuple):
+        if not all(key in self.mlca.lca.product_dict for key in demand):
+            return super().build_lca(demand, method)
+        lca = self.mlca.copy_lca()
+        lca.demand = demand
+        lca.build_demand_array()
+        lca.lci_calculation()
+        lca.switch_method(method)
+        lca.lcia_calculation()
+        return lca, lca.supply_array, lca.score
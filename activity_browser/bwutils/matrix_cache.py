@@ -0,0 +1,173 @@
+# -*- coding: utf-8 -*-
+import os
+from pathlib import Path
+import shutil
+from typing import Iterable, Optional
+
+import brightway2 as bw
+from bw2calc.matrices import TechnosphereBiosphereMatrixBuilder as TBMBuilder
+import numpy as np
+from scipy import sparse
+
+from .result_cache import ResultCache
+from ..settings import ab_settings
+
+
+class MatrixCache(object):
+    """Stores the technosphere and biosphere matrices, their parameter arrays
+    and index dictionaries in the directory of the current project, so that
+    calculations on the same databases skip building the matrices.
+
+    The cache acts as the matrix builder of `bw.LCA.load_lci_data`:
+
+        lca.load_lci_data(builder=matrix_cache)
+
+    Every entry is a directory of '.npy' files keyed by the processed
+    database files and the `modified` timestamps of their databases, so
+    altering a database invalidates the entries using it. The arrays are
+    memory-mapped (copy-on-write) when loaded, so only the parts which are
+    used are read from disk and altering them never changes the cache.
+
+    The total size of the cache is limited by the `matrix_cache_size`
+    setting, the least recently used entries are removed first.
+    """
+    DIRECTORY = "ab_matrices"
+    PARAMS = ("bio_params", "tech_params")
+    DICTS = ("biosphere_dict", "activity_dict", "product_dict")
+    MATRICES = ("biosphere_matrix", "technosphere_matrix")
+
+    @property
+    def directory(self) -> Path:
+        return Path(bw.projects.dir, self.DIRECTORY)
+
+    @property
+    def max_size(self) -> int:
+        return ab_settings.matrix_cache_size * 1024 ** 2
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_size > 0
+
+    @staticmethod
+    def key(paths: Iterable) -> str:
+        """Build the key of the given processed database files from the
+        `modified` timestamps of their databases and the files themselves.
+        """
+        databases = {
+            str(bw.Database(name).filepath_processed()): name for name in bw.databases
+        }
+        data = []
+        for path in sorted(str(p) for p in paths):
+            name = databases.get(path)
+            stat = os.stat(path)
+            data.append((
+                path, name, bw.databases[name].get("modified") if name else None,
+                stat.st_size, stat.st_mtime_ns,
+            ))
+        return ResultCache.hash(*data)
+
+    def build(self, paths: Iterable) -> tuple:
+        """Return the parameter arrays, index dictionaries and matrices of the
+        given processed database files in the same order as the brightway
+        `TechnosphereBiosphereMatrixBuilder.build`.
+        """
+        paths = list(paths)
+        if not self.enabled:
+            return TBMBuilder.build(paths)
+        key = self.key(paths)
+        data = self.load(key)
+        if data is None:
+            data = TBMBuilder.build(paths)
+            self.save(key, data)
+        return data
+
+    def load(self, key: str) -> Optional[tuple]:
+        """Return the data stored under the given key or None if it is not
+        cached.
+        """
+        path = self.directory / key
+        if not path.is_dir():
+            return None
+        try:
+            params = [self._load_array(path, name) for name in self.PARAMS]
+            dicts = [
+                dict(self._load_array(path, name).tolist()) for name in self.DICTS
+            ]
+            matrices = [
+                sparse.csr_matrix((
+                    # Copied, as the matrices may be altered by scenarios.
+                    np.array(self._load_array(path, name + "_data")),
+                    self._load_array(path, name + "_indices"),
+                    self._load_array(path, name + "_indptr"),
+                ), shape=tuple(self._load_array(path, name + "_shape")))
+                for name in self.MATRICES
+            ]
+        except (OSError, ValueError):
+            # Remove the broken entry, the matrices are built again.
+            shutil.rmtree(path, ignore_errors=True)
+            return None
+        # Mark the entry as recently used.
+        os.utime(path)
+        return (*params, *dicts, *matrices)
+
+    @staticmethod
+    def _load_array(path: Path, name: str) -> np.ndarray:
+        return np.load(path / "{}.npy".format(name), mmap_mode="c", allow_pickle=False)
+
+    def save(self, key: str, data: tuple) -> None:
+        """Store the data built by `TechnosphereBiosphereMatrixBuilder.build`
+        under the given key.
+        """
+        self.directory.mkdir(exist_ok=True)
+        path = self.directory / key
+        # Write to a temporary directory first, so an interrupted write never
+        # leaves a broken entry behind.
+        temp = self.directory / (key + ".tmp")
+        shutil.rmtree(temp, ignore_errors=True)
+        temp.mkdir()
+        params, dicts, matrices = data[:2], data[2:5], data[5:]
+        for name, array in zip(self.PARAMS, params):
+            np.save(temp / name, array)
+        for name, mapping in zip(self.DICTS, dicts):
+            np.save(temp / name, np.array(list(mapping.items()), dtype=np.int64).reshape(-1, 2))
+        for name, matrix in zip(self.MATRICES, matrices):
+            matrix = matrix.tocsr()
+            np.save(temp / (name + "_data"), matrix.data)
+            np.save(temp / (name + "_indices"), matrix.indices)
+            np.save(temp / (name + "_indptr"), matrix.indptr)
+            np.save(temp / (name + "_shape"), np.array(matrix.shape))
+        try:
+            os.replace(temp, path)
+        except OSError:
+            # Another process stored the same entry in the meantime.
+            shutil.rmtree(temp, ignore_errors=True)
+        self.evict()
+
+    @staticmethod
+    def _size(path: Path) -> int:
+        return sum(p.stat().st_size for p in path.iterdir())
+
+    def evict(self) -> None:
+        """Remove the least recently used entries until the cache fits in
+        the size given by the settings.
+        """
+        if not self.directory.is_dir():
+            return
+        entries = sorted(
+            ((p.stat().st_mtime, self._size(p), p) for p in self.directory.iterdir()
+             if p.is_dir() and not p.suffix),
+            key=lambda x: x[0]
+        )
+        size = sum(x[1] for x in entries)
+        for _, entry_size, path in entries:
+            if size <= self.max_size:
+                break
+            shutil.rmtree(path, ignore_errors=True)
+            size -= entry_size
+
+    def clear(self) -> None:
+        """Remove all of the cached matrices of the current project."""
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+
+matrix_cache = MatrixCache()
@@ -1,11 +1,16 @@
 # -*- coding: utf-8 -*-
+import os
+from pathlib import Path
+import pickle
+import shutil
+from typing import Iterable, Optional, Union
+
 import brightway2 as bw
-from bw2data.errors import UnknownObject
 from bw2data.backends.peewee import ActivityDataset
 import pandas as pd
-import numpy as np
 
 from .commontasks import count_database_records
+from .result_cache import ResultCache
 
 
 # todo: extend store over several projects
@@ -26,16 +31,69 @@ class MetaDataStore(object):
     and can be indexed by (activity or biosphere key).
     The columns feature the metadata.
 
+    The metadata of every database is also stored in the directory of the
+    project, together with the `modified` timestamp of the database it was
+    read at. It is loaded from there as long as the database was not
+    modified since. Updates are merged into the metadata in memory only:
+    the timestamp can not tell whether every change since went through
+    `update_metadata`, so the metadata of a modified database is read
+    again the next time it is added.
+
+    Only the columns of the activity table are read when a database is
+    added. The `DATA_FIELDS` have to be unpickled from the data of every
+    activity, so they are read when they are first needed, and only for
+    the activities they are needed for when read through `get_labels` or
+    `get_metadata`.
+
     Properties
     ----------
     index
 
     """
+    # The columns of the activity table which are included in the metadata,
+    # and the names of their metadata columns.
+    COLUMNS = {
+        "database": "database",
+        "code": "code",
+        "name": "name",
+        "product": "reference product",
+        "location": "location",
+        "type": "type",
+    }
+    # The fields of the (pickled) activity data included in the metadata.
+    DATA_FIELDS = ("unit", "categories")
+    DIRECTORY = "ab_metadata"
+    # The amount of activities read in one query when merging updates.
+    QUERY_SIZE = 500
+
     def __init__(self):
+        self._labels = {}
+        self._pending = set()
+        # The keys of which the DATA_FIELDS were not read yet.
+        self._unread = set()
         self.dataframe = pd.DataFrame()
         self.databases = set()
         self.unpacked_columns = {}
 
+    @property
+    def dataframe(self) -> pd.DataFrame:
+        self._read_data()
+        return self._dataframe
+
+    @property
+    def _merged(self) -> pd.DataFrame:
+        """The metadata with the buffered updates merged, without reading
+        the data fields which were not read yet.
+        """
+        if self._pending:
+            self._merge_pending()
+        return self._dataframe
+
+    @dataframe.setter
+    def dataframe(self, df: pd.DataFrame) -> None:
+        self._dataframe = df
+        self._labels.clear()
+
     def add_metadata(self, db_names_list: list) -> None:
         """"Include data from the brightway databases.
 
@@ -54,8 +112,8 @@ class MetaDataStore(object):
 
         """
         dfs = list()
-        dfs.append(self.dataframe)
-        print('Current shape and databases in the MetaDataStore:', self.dataframe.shape, self.databases)
+        dfs.append(self._merged)
+        print('Current shape and databases in the MetaDataStore:', self._dataframe.shape, self.databases)
         for db_name in db_names_list:
             if db_name not in bw.databases:
                 raise ValueError('This database does not exist:', db_name)
@@ -64,79 +122,246 @@ class MetaDataStore(object):
 
             print('Adding:', db_name)
             self.databases.add(db_name)
-
-            # make a temporary DataFrame and index it by ('database', 'code') (like all brightway activities)
-            df_temp = pd.DataFrame(bw.Database(db_name))
-
-            # add keys and make MultiIndex from keys
-            keys = [k for k in zip(df_temp['database'], df_temp['code'])]
-            df_temp.index = pd.MultiIndex.from_tuples(keys)
-            df_temp['key'] = keys
-
-            # In a new 'biosphere3' database, some categories values are lists
-            if 'categories' in df_temp:
-                df_temp['categories'] = df_temp['categories'].apply(
-                    lambda x: tuple(x) if isinstance(x, list) else x)
-
+            df_temp = self.load_database(db_name)
+            if df_temp is None:
+                # Taken before the query, a change made during the query
+                # then invalidates the stored metadata.
+                modified = bw.databases[db_name].get("modified")
+                query = self._select_metadata(data=False).where(ActivityDataset.database == db_name)
+                df_temp = self._build_dataframe(list(query.tuples().iterator()), data=False)
+                self.save_database(db_name, df_temp, modified)
+            self._unread.update(df_temp.index)
             dfs.append(df_temp)
 
         # add this metadata to already existing metadata
-        self.dataframe = pd.concat(dfs, sort=False)
-        self.dataframe.replace(np.nan, '', regex=True, inplace=True)  # replace 'nan' values with emtpy string
+        dfs = [df for df in dfs if not df.empty]
+        if dfs:
+            self.dataframe = self._fill_missing(pd.concat(dfs, sort=False))
         # print('Dimensions of the Metadata:', self.dataframe.shape)
 
-    def update_metadata(self, key: tuple) -> None:
-        """Update metadata when an activity has changed.
+    @classmethod
+    def _select_metadata(cls, data: bool = True):
+        """Return the query selecting the metadata columns, and the data
+        if `data` is True, of activities from the activity table.
+        """
+        columns = [getattr(ActivityDataset, c) for c in cls.COLUMNS]
+        if data:
+            columns.append(ActivityDataset.data)
+        return ActivityDataset.select(*columns)
+
+    @classmethod
+    def _data_fields(cls, documents: list) -> dict:
+        """Return the values of the `DATA_FIELDS` in the activity data,
+        None where they are missing.
+        """
+        values = {
+            field: [d.get(field) for d in documents] for field in cls.DATA_FIELDS
+        }
+        # In a new 'biosphere3' database, some categories values are lists
+        if "categories" in values:
+            values["categories"] = [
+                tuple(x) if isinstance(x, list) else x for x in values["categories"]
+            ]
+        return values
+
+    @classmethod
+    def _build_dataframe(cls, rows: list, data: bool = True) -> pd.DataFrame:
+        """Build the metadata of the rows returned by `_select_metadata`,
+        indexed by the keys of the activities.
+
+        Only the `DATA_FIELDS` are taken from the activity data, the other
+        columns are read from the activity table as they are. Without the
+        data, the `DATA_FIELDS` are left empty.
+        """
+        df = pd.DataFrame.from_records(
+            rows, columns=list(cls.COLUMNS.values()) + (["data"] if data else [])
+        )
+        documents = df.pop("data").to_list() if data else [{}] * len(df)
+        for field, values in cls._data_fields(documents).items():
+            df[field] = pd.Series(values, index=df.index, dtype=object)
+        df.index = pd.MultiIndex.from_arrays(
+            [df["database"].to_numpy(), df["code"].to_numpy()]
+        )
+        df["key"] = df.index.to_flat_index()
+        return cls._fill_missing(df)
+
+    @property
+    def directory(self) -> Path:
+        return Path(bw.projects.dir, self.DIRECTORY)
+
+    def _path(self, db_name: str) -> Path:
+        # The columns and the pandas version are part of the name, so
+        # changing them invalidates the stored metadata.
+        name = ResultCache.hash(db_name, self.COLUMNS, self.DATA_FIELDS, pd.__version__)
+        return self.directory / "{}.pickle".format(name)
+
+    def load_database(self, db_name: str) -> Optional[pd.DataFrame]:
+        """Return the stored metadata of the database, or None if it is not
+        stored or the database was modified after it was stored.
+        """
+        path = self._path(db_name)
+        if not path.is_file():
+            return None
+        try:
+            with open(path, "rb") as f:
+                modified, df = pickle.load(f)
+        except Exception:
+            # The file is broken or was written by another version of
+            # pandas, remove it so the metadata is read again.
+            try:
+                path.unlink()
+            except OSError:
+                pass
+            return None
+        if modified != bw.databases[db_name].get("modified"):
+            return None
+        return df
+
+    def save_database(self, db_name: str, df: pd.DataFrame, modified: Optional[str]) -> None:
+        """Store the metadata of the database, read when the database had
+        the given `modified` timestamp.
+        """
+        if db_name not in bw.databases:
+            return
+        columns = list(self.COLUMNS.values()) + list(self.DATA_FIELDS) + ["key"]
+        df = df.reindex(columns, axis="columns")
+        self.directory.mkdir(exist_ok=True)
+        path = self._path(db_name)
+        # Write to a temporary file first, so an interrupted write never
+        # leaves a broken file behind.
+        temp = path.with_suffix(".tmp")
+        with open(temp, "wb") as f:
+            pickle.dump(
+                (modified, df), f,
+                protocol=pickle.HIGHEST_PROTOCOL
+            )
+        os.replace(temp, path)
+
+    def clear(self) -> None:
+        """Remove all of the stored metadata of the current project."""
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    @staticmethod
+    def _fill_missing(df: pd.DataFrame) -> pd.DataFrame:
+        """Replace the missing values with empty strings in the columns
+        that have them.
+        """
+        missing = df.columns[df.isna().any()]
+        for col in missing:
+            df[col] = df[col].astype(object).fillna('')
+        return df
+
+    def update_metadata(self, keys: Union[tuple, Iterable[tuple]]) -> None:
+        """Update metadata when one or more activities have changed.
 
         Three situations:
         1. An activity has been deleted.
         2. Activity data has been modified.
         3. An activity has been added.
 
+        The keys are collected in a buffer which is merged into the metadata
+        in one go the next time the metadata is read, so batches of changes
+        do not rebuild the dataframe for every activity.
+
         Parameters
         ----------
-        key : tuple
-            The specific activity to update in the MetaDataStore
+        keys : tuple or iterable of tuples
+            The specific activity, or activities, to update in the MetaDataStore
         """
-        try:
-            act = bw.get_activity(key)  # if this does not work, it has been deleted (see except:).
-        except (UnknownObject, ActivityDataset.DoesNotExist):
-            # Situation 1: activity has been deleted (metadata needs to be deleted)
-            print('Deleting activity from metadata:', key)
-            self.dataframe.drop(key, inplace=True)
-            # print('Dimensions of the Metadata:', self.dataframe.shape)
-            return
+        self._pending.update([keys] if isinstance(keys, tuple) else keys)
+
+    def _merge_pending(self) -> None:
+        """Merge the buffered updates into the metadata.
 
-        db = key[0]
-        if db not in self.databases:
-            # print('Database has not been added to metadata.')
-            self.add_metadata([db])
-        else:
-            if key in self.dataframe.index:  # Situation 2: activity has been modified (metadata needs to be updated)
-                print('Updating activity in metadata: ', act, key)
-                for col in self.dataframe.columns:
-                    self.dataframe.at[key, col] = act.get(col, '')
-                self.dataframe.at[key, 'key'] = act.key
-
-            else:  # Situation 3: Activity has been added to database (metadata needs to be generated)
-                print('Adding activity to metadata:', act, key)
-                df_new = pd.DataFrame([act.as_dict()], index=pd.MultiIndex.from_tuples([act.key]))
-                df_new['key'] = [act.key]
-                self.dataframe = pd.concat([self.dataframe, df_new], sort=False)
-                self.dataframe.replace(np.nan, '', regex=True, inplace=True)  # replace 'nan' values with emtpy string
-            # print('Dimensions of the Metadata:', self.dataframe.shape)
+        The metadata of the updated activities is read in bulk and replaces
+        their current metadata, activities which no longer exist (situation
+        1) are removed. Databases which are not in the metadata yet are
+        added completely. The stored metadata is not updated, see the
+        class docstring.
+        """
+        keys, self._pending = self._pending, set()
+        new_dbs = {key[0] for key in keys} - self.databases
+        keys = [key for key in keys if key[0] not in new_dbs]
+        if keys:
+            print('Updating {} activities in metadata.'.format(len(keys)))
+            codes = {}
+            for db, code in keys:
+                codes.setdefault(db, []).append(code)
+            rows = []
+            for db, db_codes in codes.items():
+                for start in range(0, len(db_codes), self.QUERY_SIZE):
+                    query = self._select_metadata().where(
+                        (ActivityDataset.database == db) &
+                        (ActivityDataset.code.in_(db_codes[start:start + self.QUERY_SIZE]))
+                    )
+                    rows.extend(query.tuples().iterator())
+            current = self._dataframe.drop(keys, errors="ignore")
+            new = self._build_dataframe(rows)
+            self._unread.difference_update(keys)
+            dfs = [df for df in (current, new) if not df.empty]
+            df = pd.concat(dfs, sort=False) if dfs else pd.DataFrame()
+            # Only the columns which are missing from one of the two frames
+            # have new missing values, the rest of the metadata is filled.
+            added = current.columns.symmetric_difference(new.columns)
+            if len(dfs) == 2 and len(added):
+                df[added] = self._fill_missing(df[added].copy())
+            self.dataframe = df
+        if new_dbs:
+            self.add_metadata(sorted(db for db in new_dbs if db in bw.databases))
+        # print('Dimensions of the Metadata:', self.dataframe.shape)
+
+    def _read_data(self, keys: Optional[Iterable[tuple]] = None) -> None:
+        """Read the `DATA_FIELDS` of the given keys, or of all keys, which
+        were not read yet into the metadata.
+        """
+        df = self._merged
+        unread = set(self._unread) if keys is None else self._unread.intersection(keys)
+        if not unread:
+            return
+        self._unread.difference_update(unread)
+        codes = {}
+        for db, code in unread:
+            codes.setdefault(db, set()).add(code)
+        columns = (ActivityDataset.database, ActivityDataset.code, ActivityDataset.data)
+        rows = []
+        for db, db_codes in codes.items():
+            if len(db_codes) > self.QUERY_SIZE:
+                # Reading the whole database in one query is faster than
+                # many queries for a large part of it.
+                query = ActivityDataset.select(*columns).where(ActivityDataset.database == db)
+                rows.extend(r for r in query.tuples().iterator() if r[1] in db_codes)
+                continue
+            db_codes = list(db_codes)
+            for start in range(0, len(db_codes), self.QUERY_SIZE):
+                query = ActivityDataset.select(*columns).where(
+                    (ActivityDataset.database == db) &
+                    (ActivityDataset.code.in_(db_codes[start:start + self.QUERY_SIZE]))
+                )
+                rows.extend(query.tuples().iterator())
+        positions = df.index.get_indexer([(db, code) for db, code, _ in rows])
+        found = positions >= 0
+        if not found.any():
+            return
+        documents = [r[2] for r, f in zip(rows, found) if f]
+        for field, values in self._data_fields(documents).items():
+            column = df[field].to_numpy(dtype=object, copy=True)
+            column[positions[found]] = ['' if v is None else v for v in values]
+            df[field] = column
+        self._labels.clear()
 
     def reset_metadata(self) -> None:
         """Deletes metadata when the project is changed."""
         # todo: metadata could be collected across projects...
         print('Reset metadata.')
+        self._pending = set()
+        self._unread = set()
         self.dataframe = pd.DataFrame()
         self.databases = set()
 
     def get_existing_fields(self, field_list: list) -> list:
         """Return a list of fieldnames that exist in the current dataframe.
         """
-        return [fn for fn in field_list if fn in self.dataframe.columns]
+        return [fn for fn in field_list if fn in self._merged.columns]
 
     def get_metadata(self, keys: list, columns: list) -> pd.DataFrame:
         """Return a slice of the dataframe matching row and column identifiers.
@@ -145,9 +370,35 @@ class MetaDataStore(object):
         From pandas version 1.0 and onwards, attempting to select a column
         with all NaN values will fail with a KeyError.
         """
-        df = self.dataframe.loc[pd.IndexSlice[keys], :]
+        if set(columns).intersection(self.DATA_FIELDS):
+            self._read_data(keys)
+        df = self._merged.loc[pd.IndexSlice[keys], :]
         return df.reindex(columns, axis="columns")
 
+    def get_labels(self, keys: Iterable, fields: list, separator: str = ' | ') -> list:
+        """Return the labels of the given keys, which join the given metadata
+        fields with the separator, or None for keys not in the dataframe.
+
+        The labels of every combination of fields and separator are built
+        once for all of the metadata, until the metadata changes.
+        """
+        keys = list(keys)
+        # Reading the metadata merges the buffered updates and reads the
+        # data fields of the keys, which clears the labels built before.
+        if set(fields).intersection(self.DATA_FIELDS):
+            self._read_data(k for k in keys if k is not None)
+        df = self._merged
+        cache_key = (tuple(fields), separator)
+        labels = self._labels.get(cache_key)
+        if labels is None:
+            df = df[~df.index.duplicated()]
+            strings = df.reindex(fields, axis="columns").fillna('').astype(str)
+            joined = strings.iloc[:, 0]
+            for i in range(1, len(fields)):
+                joined = joined + separator + strings.iloc[:, i]
+            labels = self._labels[cache_key] = dict(zip(df.index, joined))
+        return [labels.get(k) for k in keys]
+
     def get_database_metadata(self, db_name: str) -> pd.DataFrame:
         """Return a slice of the dataframe matching the database.
 
@@ -168,7 +419,10 @@ class MetaDataStore(object):
             if count_database_records(db_name) == 0:
                 return pd.DataFrame()
             self.add_metadata([db_name])
-        return self.dataframe.loc[self.dataframe['database'] == db_name]
+        df = self._merged
+        self._read_data(df.index[df['database'] == db_name])
+        df = self._dataframe
+        return df.loc[df['database'] == db_name]
 
     @property
     def index(self):
@@ -176,7 +430,7 @@ class MetaDataStore(object):
 
         This allows us to 'hide' the dataframe object in de AB_metadata
         """
-        return self.dataframe.index
+        return self._merged.index
 
     def get_locations(self, db_name: str) -> set:
         """ Returns a set of locations for the given database name.
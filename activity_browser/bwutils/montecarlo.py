@@ -10,11 +10,20 @@ from stats_arrays import MCRandomNumberGenerator
 from collections import defaultdict
 
 from .manager import MonteCarloParameterManager
+from .matrix_cache import matrix_cache
+from .profiling import profiler
+from .solvers import IterativeSolver
+from ..settings import ab_settings
 
 
 class MonteCarloLCA(object):
-    """A Monte Carlo LCA for multiple reference flows and methods loaded from a calculation setup."""
-    def __init__(self, cs_name):
+    """A Monte Carlo LCA for multiple reference flows and methods loaded from a calculation setup.
+
+    An LCA of the same calculation setup with the LCI data already loaded
+    (see `MLCA.copy_lca`) can be given, in which case the matrices are not
+    loaded again.
+    """
+    def __init__(self, cs_name, lca: Optional[bw.LCA] = None):
         if cs_name not in bw.calculation_setups:
             raise ValueError(
                 "{} is not a known `calculation_setup`.".format(cs_name)
@@ -75,7 +84,14 @@ class MonteCarloLCA(object):
 
         self.results = list()
 
-        self.lca = bw.LCA(demand=self.func_units_dict, method=self.methods[0])
+        if lca is None:
+            lca = bw.LCA(demand=self.func_units_dict, method=self.methods[0])
+        self.lca = lca
+        # The technosphere matrix is rebuilt for every iteration, a shared
+        # factorization is only kept to precondition iterative solves.
+        self._baseline_solver = getattr(self.lca, "solver", None)
+        if hasattr(self.lca, "solver"):
+            del self.lca.solver
 
     def unify_param_exchanges(self, data: np.ndarray) -> np.ndarray:
         """Convert an array of parameterized exchanges from input/output keys
@@ -103,6 +119,7 @@ class MonteCarloLCA(object):
         ])
         return unified
 
+    @profiler.profile("Load data", "MonteCarloLCA")
     def load_data(self) -> None:
         """Constructs the random number generators for all of the matrices that
         can be altered by uncertainty.
@@ -111,7 +128,8 @@ class MonteCarloLCA(object):
         amounts of the 'params' matrices are used in place of generating
         a vector
         """
-        self.lca.load_lci_data()
+        if not hasattr(self.lca, "tech_params"):
+            self.lca.load_lci_data(builder=matrix_cache)
 
         self.tech_rng = MCRandomNumberGenerator(self.lca.tech_params, seed=self.seed) \
             if self.include_technosphere else self.lca.tech_params["amount"].copy()
@@ -131,6 +149,7 @@ class MonteCarloLCA(object):
 
         self.lca.activity_dict_rev, self.lca.product_dict_rev, self.lca.biosphere_dict_rev = self.lca.reverse_dict()
 
+    @profiler.profile("Calculate", "MonteCarloLCA")
     def calculate(self, iterations=10, seed: int = None, **kwargs):
         """Main calculate method for the MC LCA class, allows fine-grained control
         over which uncertainties are included when running MC sampling.
@@ -161,6 +180,19 @@ class MonteCarloLCA(object):
             for k in self.parameter_data:
                 self.parameter_data[k]["values"] = []
 
+        # Solve the sampled technosphere matrices iteratively, preconditioned
+        # with the factorization of the static technosphere matrix. This is
+        # the factorization shared with the LCA, or the first one made here.
+        # Every iteration solves the demand of all reference flows and then
+        # each reference flow, each starts from its last solution.
+        solver = None
+        if ab_settings.solver_strategy != "direct":
+            solver = IterativeSolver.from_baseline(
+                self.lca.technosphere_matrix, ab_settings.solver_strategy,
+                self._baseline_solver, warm_starts=len(self.func_units) + 1
+            )
+            self._baseline_solver = solver.baseline
+
         for iteration in range(iterations):
             tech_vector = self.tech_rng.next() if self.include_technosphere else self.tech_rng
             bio_vector = self.bio_rng.next() if self.include_biosphere else self.bio_rng
@@ -201,6 +233,9 @@ class MonteCarloLCA(object):
 
             self.lca.rebuild_technosphere_matrix(tech_vector)
             self.lca.rebuild_biosphere_matrix(bio_vector)
+            if solver is not None:
+                solver.update(self.lca.technosphere_matrix)
+                self.lca.solver = solver
 
             # store matrices for GSA
             self.A_matrices.append(self.lca.technosphere_matrix)
@@ -1,15 +1,32 @@
 # -*- coding: utf-8 -*-
-from typing import Iterable, Optional, Union
+import copy
+import multiprocessing
+from typing import Callable, Iterable, List, Optional, Union
 
 import numpy as np
 import pandas as pd
 import brightway2 as bw
-from bw2analyzer import ContributionAnalysis
-
-ca = ContributionAnalysis()
+from scipy import sparse
+from scipy.sparse.linalg import splu
 
+from .background import ForegroundSystem, background_store
 from .commontasks import wrap_text
+from .matrix_cache import matrix_cache
 from .metadata import AB_metadata
+from .profiling import profiler
+from .pruning import ReducedSolver
+from .result_cache import ResultCache, result_cache
+from .solvers import IterativeSolver, LowRankSolver, solve_columns
+from .utils import LazyMapping, LRUCache, TopContributionArray
+from ..settings import ab_settings
+
+# The MLCA calculated by the worker processes, inherited by forking.
+_worker_mlca = None
+
+
+def _calculate_chunk(chunk: range) -> tuple:
+    """Calculate a chunk of the results in a worker process."""
+    return _worker_mlca._calculate_chunk(chunk)
 
 
 class MLCA(object):
@@ -58,6 +75,9 @@ class MLCA(object):
         calculations
     method_matrices: list
         Contains the characterization matrix for each impact category.
+    method_matrix: `scipy.sparse.csr_matrix`
+        The characterization factors of all impact categories stacked
+        into a single matrix of shape (`methods`, `biosphere`)
     lca_scores: `numpy.ndarray`
         2-dimensional array of shape (`func_units`, `methods`) holding the
         calculated LCA scores of each combination of reference flow and
@@ -74,16 +94,20 @@ class MLCA(object):
         Contains the calculated technosphere flows per reference flow
     inventory: dict
         Life cycle inventory (biosphere flows) per reference flow
-    inventories: dict
-        Biosphere flows per reference flow and impact category combination
-    characterized_inventories: dict
+    inventories: `LazyMapping`
+        Biosphere flows per reference flow, constructed on request
+    characterized_inventories: `LazyMapping`
         Inventory multiplied by scaling (relative impact on environment) per
-        reference flow and impact category combination
-    elementary_flow_contributions: `numpy.ndarray`
+        reference flow and impact category combination, constructed on request
+    inventory_cache: `LRUCache`
+        Holds the most recently requested (characterized) inventories and
+        top contribution tables, the size is limited by the
+        `inventory_cache_size` setting
+    elementary_flow_contributions: `numpy.ndarray` or `TopContributionArray`
         3-dimensional array of shape (`func_units`, `methods`, `biosphere`)
         which holds the characterized inventory results summed along the
         technosphere axis
-    process_contributions: `numpy.ndarray`
+    process_contributions: `numpy.ndarray` or `TopContributionArray`
         3-dimensional array of shape (`func_units`, `methods`, `technosphere`)
         which holds the characterized inventory results summed along the
         biosphere axis
@@ -101,6 +125,20 @@ class MLCA(object):
         If the given `cs_name` cannot be found in brightway calculation_setups
 
     """
+    # Set when the results were calculated with a pre-aggregated background
+    # and the full calculation has not been performed yet.
+    _pending_results = False
+    _activity_of_product = None
+    # The first factorization of the technosphere matrix and the solver of
+    # later (altered) technosphere matrices when solved iteratively.
+    _baseline_solver = None
+    _iterative_solver = None
+    # Whether technosphere matrices altered after the first factorization
+    # are solved with low-rank updates, which requires a copy of the first
+    # technosphere matrix.
+    _low_rank_updates = False
+    _baseline_matrix = None
+
     def __init__(self, cs_name: str):
         try:
             cs = bw.calculation_setups[cs_name]
@@ -119,13 +157,17 @@ class MLCA(object):
         self.method_index = {m: i for i, m in enumerate(self.methods)}
         self.rev_method_index = {v: k for k, v in self.method_index.items()}
 
-        # initial LCA and prepare method matrices
-        self.lca = self._construct_lca()
-        self.lca.lci(factorize=True)
-        self.method_matrices = []
-        for method in self.methods:
-            self.lca.switch_method(method)
-            self.method_matrices.append(self.lca.characterization_matrix)
+        # initial LCA and prepare method matrices, the technosphere matrix
+        # is factorized when the first calculation is performed.
+        with profiler.stage("Load LCI data", "MLCA"):
+            self.lca = self._construct_lca()
+            self.lca.load_lci_data(builder=matrix_cache)
+        with profiler.stage("Load characterization matrices", "MLCA"):
+            self.method_matrices = []
+            for method in self.methods:
+                self.lca.switch_method(method)
+                self.method_matrices.append(self.lca.characterization_matrix)
+            self.method_matrix = self._build_method_matrix()
 
         self.lca_scores = np.zeros((len(self.func_units), len(self.methods)))
 
@@ -139,15 +181,24 @@ class MLCA(object):
         self.technosphere_flows = dict()
         # Life cycle inventory (biosphere flows) by reference flow
         self.inventory = dict()
-        # Inventory (biosphere flows) for specific reference flow (e.g. 2000x15000) and impact category.
-        self.inventories = dict()
+        # The (characterized) inventories are very large sparse matrices
+        # (e.g. 2000x15000), these are only constructed when requested.
+        self.inventory_cache = LRUCache(ab_settings.inventory_cache_size * 1024 ** 2)
+        # Inventory (biosphere flows) for specific reference flow.
+        self.inventories = LazyMapping(
+            self._build_inventory_matrix, self.scaling_factors.keys,
+            self.inventory_cache, "inventory"
+        )
         # Inventory multiplied by scaling (relative impact on environment) per impact category.
-        self.characterized_inventories = dict()
+        self.characterized_inventories = LazyMapping(
+            self._build_characterized_inventory, lambda: np.ndindex(self.lca_scores.shape),
+            self.inventory_cache, "characterized_inventory"
+        )
 
         # Summarized contributions for EF and processes.
-        self.elementary_flow_contributions = np.zeros(
+        self.elementary_flow_contributions = self._contribution_array(
             (len(self.func_units), len(self.methods), self.lca.biosphere_matrix.shape[0]))
-        self.process_contributions = np.zeros(
+        self.process_contributions = self._contribution_array(
             (len(self.func_units), len(self.methods), self.lca.technosphere_matrix.shape[0]))
 
         # TODO: get rid of the below
@@ -165,45 +216,704 @@ class MLCA(object):
     def _construct_lca(self):
         return bw.LCA(demand=self.func_units_dict, method=self.methods[0])
 
-    def _perform_calculations(self):
-        """ Isolates the code which performs calculations to allow subclasses
-        to either alter the code or redo calculations after matrix substitution.
+    def _build_method_matrix(self) -> sparse.csr_matrix:
+        """Stack the diagonals of the characterization matrices into a single
+        (methods, biosphere) matrix.
         """
-        for row, func_unit in enumerate(self.func_units):
-            # Do the LCA for the current reference flow
-            self.lca.redo_lci(func_unit)
+        return sparse.vstack([
+            sparse.csr_matrix(cf_matrix.diagonal()) for cf_matrix in self.method_matrices
+        ], format="csr")
+
+    def _build_demand_matrix(self) -> np.ndarray:
+        """Construct a (products, reference flows) demand matrix which holds
+        the demand vector of every reference flow as a column.
+        """
+        demand = np.zeros((len(self.lca.product_dict), len(self.func_units)))
+        for col, func_unit in enumerate(self.func_units):
+            for key, amount in func_unit.items():
+                demand[self.lca.product_dict[key], col] = amount
+        return demand
+
+    def factorize(self) -> None:
+        """Factorize the technosphere matrix, unless it is already factorized.
+
+        If only part of the technosphere can be reached from the reference
+        flows, only that part is factorized, see `ReducedSolver`.
+
+        Technosphere matrices which were altered after the first
+        factorization (e.g. by scenarios) are only factorized again if they
+        cannot be solved with the first factorization, see `_update_solver`.
+        """
+        if hasattr(self.lca, "solver"):
+            return
+        if self._baseline_solver is not None:
+            solver = self._update_solver()
+            if solver is not None:
+                self.lca.solver = solver
+                return
+        technosphere = self.lca.technosphere_matrix
+        if self._baseline_solver is None and self._low_rank_updates:
+            # Kept to find the changes of later technosphere matrices, as
+            # these are altered in place.
+            technosphere = self._baseline_matrix = technosphere.tocsr(copy=True)
+        with profiler.stage("Factorize technosphere", "MLCA"):
+            solver = self._reduced_solver(technosphere)
+            if solver is None:
+                self.lca.decompose_technosphere()
+            else:
+                self.lca.solver = solver
+        if self._baseline_solver is None:
+            self._baseline_solver = self.lca.solver
+
+    def _update_solver(self) -> Optional[Callable]:
+        """Return the solver of a technosphere matrix which was altered after
+        the first factorization, or None if it has to be factorized.
+
+        If the matrix differs from the first matrix in at most
+        'low_rank_threshold' rows or columns, it is solved with a low-rank
+        update of the first factorization, see `LowRankSolver`. Otherwise,
+        unless the 'solver_strategy' setting is 'direct', it is solved
+        iteratively, see `IterativeSolver`.
+        """
+        if self._baseline_matrix is not None:
+            with profiler.stage("Low-rank update", "MLCA"):
+                solver = LowRankSolver.build(
+                    self._baseline_solver, self._baseline_matrix,
+                    self.lca.technosphere_matrix, ab_settings.low_rank_threshold
+                )
+            if solver is not None:
+                return solver
+        strategy = ab_settings.solver_strategy
+        if strategy == "direct":
+            return None
+        if self._iterative_solver is None:
+            self._iterative_solver = IterativeSolver(
+                self._baseline_solver, self.lca.technosphere_matrix, strategy,
+                warm_starts=len(self.func_units)
+            )
+        else:
+            self._iterative_solver.update(self.lca.technosphere_matrix)
+        return self._iterative_solver
+
+    def _reduced_solver(self, technosphere: sparse.spmatrix) -> Optional[ReducedSolver]:
+        """Build the solver of the part of the technosphere which can be
+        reached from the reference flows, if that is not the full system.
+
+        Requires every product to be produced by the activity of the same
+        key, which is the case for brightway databases.
+        """
+        if self._activity_of_product is None:
+            self._activity_of_product = np.array([
+                self.lca.activity_dict.get(self.rev_product_dict[i], -1)
+                for i in range(len(self.rev_product_dict))
+            ], dtype=np.int64)
+        activity_of_product = self._activity_of_product
+        if (activity_of_product < 0).any() or \
+                np.unique(activity_of_product).size != activity_of_product.size:
+            return None
+        return ReducedSolver.build(
+            technosphere, self._build_demand_matrix(), activity_of_product
+        )
+
+    def copy_lca(self, factorized: bool = True) -> bw.LCA:
+        """Return a shallow copy of the LCA, which shares the loaded matrices
+        (and the factorized technosphere matrix) with this MLCA.
 
+        This allows the Monte Carlo simulation and the graph traversal of
+        the same calculation setup to skip loading and factorizing the
+        matrices again. The copy must replace the shared matrices instead
+        of altering them in place.
+
+        Parameters
+        ----------
+        factorized : bool
+            Factorize the technosphere matrix and share the factorization,
+            otherwise the copy is returned without a factorization.
+        """
+        if factorized:
+            self.factorize()
+        lca = copy.copy(self.lca)
+        if not factorized and hasattr(lca, "solver"):
+            del lca.solver
+        return lca
+
+    def _solve_demand_matrix(self, demand: np.ndarray) -> np.ndarray:
+        """Solve all columns of the demand matrix against the factorized
+        technosphere matrix in a single pass.
+
+        If the factorization was removed (for example, after a scenario
+        altered the technosphere matrix), the matrix is solved again, see
+        `factorize`.
+        """
+        self.factorize()
+        supply = solve_columns(self.lca.solver, demand)
+        # Fortran-order makes the per reference flow columns contiguous.
+        return np.asfortranarray(supply.reshape(demand.shape))
+
+    def _store_results(self, supply: np.ndarray, scenario: Optional[int] = None,
+                       rows: slice = slice(None)) -> None:
+        """Fill the result attributes from the supply matrix, where each
+        column holds the supply array of one reference flow in `rows`.
+
+        The LCA scores and contributions of all reference flows and impact
+        categories are calculated at once through the stacked
+        `method_matrix`.
+
+        If a scenario index is given, the results are stored on the scenario
+        axis of the arrays and the dictionaries are keyed by both the
+        reference flow and the scenario.
+        """
+        extra = () if scenario is None else (scenario,)
+        diagonal = self.lca.technosphere_matrix.diagonal()
+        inventory = self.lca.biosphere_matrix * supply
+        for row, func_unit in enumerate(self.func_units[rows]):
+            key = str(func_unit) if scenario is None else (str(func_unit), scenario)
+            supply_array = supply[:, row]
             # Now update the:
             # - Scaling factors
             # - Technosphere flows
             # - Life cycle inventory
-            # - Life-cycle inventory (disaggregated by contributing process)
             # for current reference flow
-            self.scaling_factors.update({
-                str(func_unit): self.lca.supply_array
-            })
-            self.technosphere_flows.update({
-                str(func_unit): np.multiply(self.lca.supply_array, self.lca.technosphere_matrix.diagonal())
-            })
-            self.inventory.update({
-                str(func_unit): np.array(self.lca.inventory.sum(axis=1)).ravel()
-            })
-            self.inventories.update({
-                str(func_unit): self.lca.inventory
-            })
-
-            # Now, for each method, take the current reference flow and do inventory analysis
-            for col, cf_matrix in enumerate(self.method_matrices):
-                self.lca.characterization_matrix = cf_matrix
-                self.lca.lcia_calculation()
-                self.lca_scores[row, col] = self.lca.score
-                self.characterized_inventories[row, col] = self.lca.characterized_inventory.copy()
-                self.elementary_flow_contributions[row, col] = np.array(
-                    self.lca.characterized_inventory.sum(axis=1)).ravel()
-                self.process_contributions[row, col] = self.lca.characterized_inventory.sum(axis=0)
+            self.scaling_factors[key] = supply_array
+            self.technosphere_flows[key] = np.multiply(supply_array, diagonal)
+            self.inventory[key] = inventory[:, row]
+
+        # Scores and contributions for all reference flows and methods,
+        # shaped (reference flows, methods[, items]).
+        idx = (rows, slice(None)) + extra
+        self.lca_scores[idx] = (self.method_matrix * inventory).T
+        self._fill_contributions(
+            self.elementary_flow_contributions, idx,
+            self.method_matrix.toarray(), inventory
+        )
+        self._fill_contributions(
+            self.process_contributions, idx,
+            (self.method_matrix * self.lca.biosphere_matrix).toarray(), supply
+        )
+
+    @staticmethod
+    def _contribution_array(shape: tuple):
+        """Allocate a contribution array of the given shape, the storage
+        follows the `contribution_storage` setting.
+
+        - 'dense': a float64 `numpy.ndarray`
+        - 'float32': a float32 `numpy.ndarray`
+        - 'top-k': a `TopContributionArray` which only keeps the largest
+          `contribution_top_k` values of every row and a residual
+        """
+        storage = ab_settings.contribution_storage
+        if storage == "top-k":
+            return TopContributionArray(shape, ab_settings.contribution_top_k)
+        return np.zeros(shape, dtype=np.float32 if storage == "float32" else np.float64)
+
+    @staticmethod
+    def _fill_contributions(target, idx: tuple, factors: np.ndarray, amounts: np.ndarray) -> None:
+        """Store the product of the (methods, items) factors and the
+        (items, reference flows) amounts in the target contribution array.
 
+        Compact arrays are filled per reference flow, so the full dense
+        block never has to exist in memory.
+        """
+        if isinstance(target, np.ndarray):
+            np.multiply(
+                factors[np.newaxis, :, :], amounts.T[:, np.newaxis, :], out=target[idx]
+            )
+            return
+        rows = range(*idx[0].indices(target.shape[0]))
+        for col, row in enumerate(rows):
+            target[(row,) + idx[1:]] = factors * amounts[:, col]
+
+    def _perform_calculations(self):
+        """ Isolates the code which performs calculations to allow subclasses
+        to either alter the code or redo calculations after matrix substitution.
+
+        All reference flows are solved at once by stacking their demand
+        vectors into a single demand matrix.
+        """
+        supply = self._solve_demand_matrix(self._build_demand_matrix())
+        self._store_results(supply)
+
+    def _foreground_system(self) -> Optional[ForegroundSystem]:
+        """Partition the matrices into the foreground system, the databases
+        of the reference flows, and the background databases, which are
+        pre-aggregated in the `background_store`.
+
+        Returns None if background aggregation is disabled, if there is no
+        background or if the background uses products of the foreground.
+        """
+        if not background_store.enabled:
+            return None
+        foreground = set(key[0] for key in self.fu_activity_keys)
+        background = self.all_databases.difference(foreground)
+        products = np.array([
+            self.rev_product_dict[i][0] in foreground for i in range(len(self.rev_product_dict))
+        ], dtype=bool)
+        activities = np.array([
+            self.rev_activity_dict[i][0] in foreground for i in range(len(self.rev_activity_dict))
+        ], dtype=bool)
+        if products.all() or products.sum() != activities.sum() or not background:
+            return None
+        technosphere = self.lca.technosphere_matrix.tocsr()
+        if technosphere[products][:, ~activities].nnz:
+            return None
+
+        with profiler.stage("Load background", "MLCA"):
+            aggregated = background_store.get(background)
+        background_rows = np.flatnonzero(~products)
+        try:
+            background_products = np.array([
+                aggregated.product_index[bw.mapping[self.rev_product_dict[i]]]
+                for i in background_rows
+            ], dtype=np.int64)
+            flow_index = {bw.mapping[key]: i for key, i in self.lca.biosphere_dict.items()}
+            flows = np.array([flow_index[f] for f in aggregated.flows.tolist()], dtype=np.int64)
+        except KeyError:
+            return None
+        return ForegroundSystem(
+            np.flatnonzero(products), np.flatnonzero(activities),
+            background_rows, background_products, flows, aggregated,
+        )
+
+    def _perform_foreground_calculations(self, system: ForegroundSystem) -> None:
+        """Solve only the foreground system and attach the background
+        through its pre-aggregated inventory and scores.
+
+        The supply of the background activities is not known, so the
+        scaling factors, technosphere flows and process contributions are
+        calculated with the full system once they are requested.
+        """
+        technosphere = self.lca.technosphere_matrix.tocsr()
+        biosphere = self.lca.biosphere_matrix.tocsc()[:, system.activities]
+        demand = self._build_demand_matrix()[system.products]
+        supply = splu(technosphere[system.products][:, system.activities].tocsc()).solve(demand)
+        # The demand for background products, only the rows which are used
+        # are read from the (memory-mapped) cumulative inventory.
+        background_demand = -(technosphere[system.background_rows][:, system.activities] * supply)
+        used = np.flatnonzero(np.any(background_demand != 0, axis=1))
+        rows = system.background_products[used]
+        background_demand = background_demand[used]
+
+        foreground = biosphere * supply
+        inventory = foreground.copy()
+        inventory[system.flows] += system.background.cumulative[rows].T @ background_demand
+        scores = system.background.cumulative_scores(
+            self.methods, self.method_matrix[:, system.flows].toarray()
+        )
+        for row, func_unit in enumerate(self.func_units):
+            self.inventory[str(func_unit)] = inventory[:, row]
+        self.lca_scores[:] = (self.method_matrix * foreground).T + background_demand.T @ scores[rows]
+        self._fill_contributions(
+            self.elementary_flow_contributions, (slice(None), slice(None)),
+            self.method_matrix.toarray(), inventory
+        )
+        self._pending_results = True
+
+    @property
+    def complete(self) -> bool:
+        """Whether the full system was solved, which is not the case when
+        the results were calculated with a pre-aggregated background.
+        """
+        return not self._pending_results
+
+    def complete_results(self) -> None:
+        """Perform the full calculation if the results were calculated with
+        a pre-aggregated background.
+        """
+        if self._pending_results:
+            self._pending_results = False
+            with profiler.stage("Complete foreground calculation", "MLCA"):
+                self._perform_calculations()
+
+    @property
+    def scaling_factors(self) -> dict:
+        self.complete_results()
+        return self._scaling_factors
+
+    @scaling_factors.setter
+    def scaling_factors(self, value: dict) -> None:
+        self._scaling_factors = value
+
+    @property
+    def technosphere_flows(self) -> dict:
+        self.complete_results()
+        return self._technosphere_flows
+
+    @technosphere_flows.setter
+    def technosphere_flows(self, value: dict) -> None:
+        self._technosphere_flows = value
+
+    @property
+    def process_contributions(self):
+        self.complete_results()
+        return self._process_contributions
+
+    @process_contributions.setter
+    def process_contributions(self, value) -> None:
+        self._process_contributions = value
+
+    @profiler.profile("Calculate", "MLCA")
     def calculate(self):
-        self._perform_calculations()
+        """Calculate the results, or load them from the `result_cache` if
+        the same calculation was performed before.
+        """
+        self.inventory_cache.clear()
+        self._pending_results = False
+        key = self._result_cache_key() if result_cache.enabled else None
+        with profiler.stage("Load cached results", "MLCA"):
+            arrays = result_cache.load(*key) if key else None
+        if arrays is not None:
+            try:
+                self._load_result_arrays(arrays)
+                return
+            except (KeyError, ValueError):
+                pass
+        system = self._foreground_system()
+        if system is not None:
+            # The results are incomplete until the full calculation is
+            # requested, so they are not stored in the result cache.
+            with profiler.stage("Perform foreground calculations", "MLCA"):
+                self._perform_foreground_calculations(system)
+            return
+        chunks = self._chunks(ab_settings.calculation_processes)
+        with profiler.stage("Perform calculations", "MLCA"):
+            if len(chunks) > 1:
+                self._perform_parallel_calculations(chunks)
+            else:
+                self._perform_calculations()
+        if key:
+            with profiler.stage("Save cached results", "MLCA"):
+                result_cache.save(*key, self._result_arrays())
+
+    def _chunks(self, processes: int) -> List[range]:
+        """Split the calculation into chunks for the given amount of worker
+        processes, the reference flows are divided over the chunks.
+
+        Worker processes are forked from the current process, so no chunks
+        are made if the platform does not support forking.
+        """
+        if processes < 2 or "fork" not in multiprocessing.get_all_start_methods():
+            return []
+        return [
+            range(c[0], c[-1] + 1)
+            for c in np.array_split(np.arange(len(self.func_units)), processes) if c.size
+        ]
+
+    def _calculate_chunk(self, chunk: range) -> tuple:
+        """Calculate the results of the reference flows in the chunk and return
+        them as an (index, arrays, results) tuple, see `_gather_results`.
+        """
+        rows = slice(chunk.start, chunk.stop)
+        supply = self._solve_demand_matrix(self._build_demand_matrix()[:, rows])
+        self._store_results(supply, rows=rows)
+        keys = [str(fu) for fu in self.func_units[rows]]
+        return self._gather_results((rows, slice(None)), keys)
+
+    def _perform_parallel_calculations(self, chunks: List[range]) -> None:
+        """Calculate the chunks in worker processes and gather the results.
+
+        The workers are forked, so every worker shares the LCI matrices that
+        are already loaded and only factorizes the technosphere matrix once.
+        """
+        global _worker_mlca
+        _worker_mlca = self
+        try:
+            context = multiprocessing.get_context("fork")
+            with context.Pool(len(chunks)) as pool:
+                for index, arrays, results in pool.imap(_calculate_chunk, chunks):
+                    self._insert_results(index, arrays, results)
+        finally:
+            _worker_mlca = None
+
+    def _gather_results(self, index: tuple, keys: list) -> tuple:
+        """Collect the results at the index of the result arrays and the keys
+        of the result dictionaries.
+        """
+        arrays = {"lca_scores": self.lca_scores[index]}
+        for name in ("elementary_flow_contributions", "process_contributions"):
+            array = getattr(self, name)
+            if isinstance(array, TopContributionArray):
+                arrays[name] = tuple(
+                    getattr(array, attr)[index] for attr in ("indices", "values", "residual")
+                )
+            else:
+                arrays[name] = array[index]
+        results = {
+            name: {k: getattr(self, name)[k] for k in keys}
+            for name in ("scaling_factors", "technosphere_flows", "inventory")
+        }
+        return index, arrays, results
+
+    def _insert_results(self, index: tuple, arrays: dict, results: dict) -> None:
+        """Store results collected by `_gather_results` at the index."""
+        self.lca_scores[index] = arrays["lca_scores"]
+        for name in ("elementary_flow_contributions", "process_contributions"):
+            array = getattr(self, name)
+            if isinstance(array, TopContributionArray):
+                for attr, data in zip(("indices", "values", "residual"), arrays[name]):
+                    getattr(array, attr)[index] = data
+            else:
+                array[index] = arrays[name]
+        for name, data in results.items():
+            getattr(self, name).update(data)
+
+    def database_timestamps(self) -> list:
+        """Return the `modified` timestamp of every database linked to the
+        reference flows, sorted by database name.
+        """
+        return sorted(
+            (db, bw.databases[db].get("modified")) for db in self.all_databases
+        )
+
+    def update_methods(self, methods: list) -> None:
+        """Replace the impact categories of the calculated results in place.
+
+        The supply arrays and inventories do not depend on the impact
+        categories, so only the LCA scores and contributions of the newly
+        added impact categories are calculated. The results of the remaining
+        impact categories are kept, removed impact categories are dropped.
+        """
+        self.complete_results()
+        methods = list(methods)
+        columns = [self.method_index.get(m) for m in methods]
+        new = [col for col, old in enumerate(columns) if old is None]
+        matrices = []
+        for method, old in zip(methods, columns):
+            if old is None:
+                self.lca.switch_method(method)
+                matrices.append(self.lca.characterization_matrix)
+            else:
+                matrices.append(self.method_matrices[old])
+
+        self.methods = methods
+        self.method_index = {m: i for i, m in enumerate(self.methods)}
+        self.rev_method_index = {v: k for k, v in self.method_index.items()}
+        self.method_matrices = matrices
+        self.method_matrix = self._build_method_matrix()
+        # The characterized inventories are indexed by method.
+        self.inventory_cache.clear()
+
+        dst = [col for col, old in enumerate(columns) if old is not None]
+        src = [columns[col] for col in dst]
+        self.lca_scores = self._reorder_methods(self.lca_scores, len(methods), src, dst)
+        self.elementary_flow_contributions = self._reorder_methods(
+            self.elementary_flow_contributions, len(methods), src, dst
+        )
+        self.process_contributions = self._reorder_methods(
+            self.process_contributions, len(methods), src, dst
+        )
+        if new:
+            self._calculate_methods(new)
+
+        key = self._result_cache_key() if result_cache.enabled else None
+        if key:
+            result_cache.save(*key, self._result_arrays())
+
+    def can_rescale(self, func_units: list) -> bool:
+        """Determine if the results of the given reference flows can be found
+        by rescaling the current results, which is the case if only the
+        amounts of the reference flows differ.
+        """
+        if len(func_units) != len(self.func_units):
+            return False
+        if len(set(str(fu) for fu in func_units)) != len(func_units):
+            return False
+        return all(
+            len(old) == 1 and list(new) == list(old) and next(iter(old.values()))
+            for new, old in zip(func_units, self.func_units)
+        )
+
+    def rescale(self, func_units: list) -> None:
+        """Replace the amounts of the reference flows in place.
+
+        The results are linear in the demanded amount, so the stored supply
+        arrays, inventories, LCA scores and contributions are rescaled
+        instead of solving the system again.
+
+        Raises
+        ------
+        ValueError
+            If more than the amounts of the reference flows differ
+        """
+        if not self.can_rescale(func_units):
+            raise ValueError("Only the amounts of the reference flows can be rescaled.")
+        self.complete_results()
+        factors = np.array([
+            next(iter(new.values())) / next(iter(old.values()))
+            for new, old in zip(func_units, self.func_units)
+        ])
+        rows = {str(fu): i for i, fu in enumerate(self.func_units)}
+        keys = [str(fu) for fu in func_units]
+        for name in ("scaling_factors", "technosphere_flows", "inventory"):
+            data = getattr(self, name)
+            items = list(data.items())
+            data.clear()
+            for key, value in items:
+                fu, *scenario = key if isinstance(key, tuple) else (key,)
+                row = rows[fu]
+                data[(keys[row], *scenario) if scenario else keys[row]] = value * factors[row]
+
+        self.lca_scores = self._scale_rows(self.lca_scores, factors)
+        self.elementary_flow_contributions = self._scale_rows(
+            self.elementary_flow_contributions, factors
+        )
+        self.process_contributions = self._scale_rows(self.process_contributions, factors)
+        self.func_unit_translation_dict = {
+            k: func_units[rows[str(fu)]] for k, fu in self.func_unit_translation_dict.items()
+        }
+        self.func_units = func_units
+        self.inventory_cache.clear()
+
+        key = self._result_cache_key() if result_cache.enabled else None
+        if key:
+            result_cache.save(*key, self._result_arrays())
+
+    @staticmethod
+    def _scale_rows(array, factors: np.ndarray):
+        """Multiply every reference flow (the first axis) of the result array
+        with the given factors.
+        """
+        if isinstance(array, TopContributionArray):
+            array.values = array.values * factors.reshape((-1,) + (1,) * (array.values.ndim - 1))
+            array.residual = array.residual * factors.reshape((-1,) + (1,) * (array.residual.ndim - 1))
+            return array
+        return array * factors.reshape((-1,) + (1,) * (array.ndim - 1)).astype(array.dtype)
+
+    @staticmethod
+    def _reorder_methods(array, size: int, src: list, dst: list):
+        """Return a copy of the result array with `size` impact categories,
+        where the impact categories at `src` are moved to `dst`.
+        """
+        shape = array.shape[:1] + (size,) + array.shape[2:]
+        if isinstance(array, TopContributionArray):
+            result = TopContributionArray(shape, array.k, array.dtype)
+            for name in ("indices", "values", "residual"):
+                getattr(result, name)[:, dst] = getattr(array, name)[:, src]
+        else:
+            result = np.zeros(shape, dtype=array.dtype)
+            result[:, dst] = array[:, src]
+        return result
+
+    def _calculate_methods(self, columns: list) -> None:
+        """Calculate the LCA scores and contributions of the impact categories
+        at the given columns from the stored supply arrays and inventories.
+        """
+        scenarios = sorted(set(
+            k[1] for k in self.scaling_factors if isinstance(k, tuple)
+        )) or [None]
+        for scenario in scenarios:
+            keys = [
+                str(fu) if scenario is None else (str(fu), scenario)
+                for fu in self.func_units
+            ]
+            supply = np.column_stack([self.scaling_factors[k] for k in keys])
+            inventory = np.column_stack([self.inventory[k] for k in keys])
+            biosphere = self._biosphere_matrix(scenario)
+            extra = () if scenario is None else (scenario,)
+            for col in columns:
+                idx = (slice(None), slice(col, col + 1)) + extra
+                factors = self.method_matrix[col:col + 1]
+                self.lca_scores[idx] = (factors * inventory).T
+                self._fill_contributions(
+                    self.elementary_flow_contributions, idx, factors.toarray(), inventory
+                )
+                self._fill_contributions(
+                    self.process_contributions, idx, (factors * biosphere).toarray(), supply
+                )
+
+    def _scenario_data(self) -> Optional[tuple]:
+        """Return the scenario data which the results depend on, or None if
+        the results cannot be cached.
+        """
+        return ()
+
+    def _result_cache_key(self) -> Optional[tuple]:
+        """Construct the (setup, results) key used to store the results in
+        the `result_cache`.
+
+        The setup part is built from the reference flows, impact categories
+        and scenario data. The results part is built from the `modified`
+        timestamps of all linked databases, the characterization factors
+        and the contribution storage settings.
+        """
+        scenario_data = self._scenario_data()
+        if scenario_data is None:
+            return None
+        setup = ResultCache.hash(
+            type(self).__name__, self.func_units, self.methods, *scenario_data
+        )
+        results = ResultCache.hash(
+            self.database_timestamps(), self.method_matrix.data.tobytes(),
+            self.method_matrix.indices.tobytes(), self.method_matrix.indptr.tobytes(),
+            ab_settings.contribution_storage, ab_settings.contribution_top_k,
+        )
+        return setup, results
+
+    def _result_arrays(self) -> dict:
+        """Gather the calculated results as a dictionary of arrays."""
+        rows = {str(fu): i for i, fu in enumerate(self.func_units)}
+        keys = np.array([
+            (rows[k], -1) if isinstance(k, str) else (rows[k[0]], k[1])
+            for k in self.scaling_factors
+        ], dtype=np.int64).reshape(-1, 2)
+        arrays = {
+            "lca_scores": self.lca_scores,
+            "result_keys": keys,
+            "scaling_factors": np.array(list(self.scaling_factors.values())),
+            "technosphere_flows": np.array(list(self.technosphere_flows.values())),
+            "inventory": np.array(list(self.inventory.values())),
+        }
+        for name in ("elementary_flow_contributions", "process_contributions"):
+            array = getattr(self, name)
+            if isinstance(array, TopContributionArray):
+                arrays[name + "_indices"] = array.indices
+                arrays[name + "_values"] = array.values
+                arrays[name + "_residual"] = array.residual
+            else:
+                arrays[name] = array
+        return arrays
+
+    def _load_result_arrays(self, arrays: dict) -> None:
+        """Restore the results from arrays created by `_result_arrays`."""
+        if arrays["lca_scores"].shape != self.lca_scores.shape:
+            raise ValueError("Cached results do not match the calculation setup.")
+        keys = [
+            str(self.func_units[row]) if scenario < 0 else (str(self.func_units[row]), int(scenario))
+            for row, scenario in arrays["result_keys"]
+        ]
+        self.lca_scores[...] = arrays["lca_scores"]
+        for name in ("scaling_factors", "technosphere_flows", "inventory"):
+            data = getattr(self, name)
+            data.clear()
+            data.update(zip(keys, arrays[name]))
+        for name in ("elementary_flow_contributions", "process_contributions"):
+            array = getattr(self, name)
+            if isinstance(array, TopContributionArray):
+                array.indices = arrays[name + "_indices"]
+                array.values = arrays[name + "_values"]
+                array.residual = arrays[name + "_residual"]
+            else:
+                setattr(self, name, arrays[name])
+
+    def _biosphere_matrix(self, scenario: Optional[int] = None):
+        """Return the biosphere matrix used to calculate the given scenario.
+        """
+        return self.lca.biosphere_matrix
+
+    def _build_inventory_matrix(self, key) -> sparse.csr_matrix:
+        """Construct the life-cycle inventory (disaggregated by contributing
+        process) of a key in `scaling_factors`.
+        """
+        scenario = key[1] if isinstance(key, tuple) else None
+        return self._biosphere_matrix(scenario) * sparse.diags(self.scaling_factors[key])
+
+    def _build_characterized_inventory(self, index: tuple) -> sparse.csr_matrix:
+        """Construct the characterized inventory for the (reference flow,
+        method[, scenario]) index.
+        """
+        row, col, *scenario = index
+        key = str(self.func_units[row])
+        key = (key, scenario[0]) if scenario else key
+        return self.method_matrices[col] * self.inventories[key]
 
     @property
     def func_units_dict(self) -> dict:
@@ -308,7 +1018,8 @@ class Contributions(object):
             raise ValueError('Must pass an MLCA object. Passed:', type(mlca))
         self.mlca = mlca
         # Ensure MetaDataStore is updated.
-        self.mlca.get_all_metadata()
+        with profiler.stage("Get metadata", "Contributions"):
+            self.mlca.get_all_metadata()
 
         # Set default metadata keys (those not in the dataframe will be eliminated)
         self.act_fields = AB_metadata.get_existing_fields(self.DEFAULT_ACT_FIELDS)
@@ -316,10 +1027,12 @@ class Contributions(object):
 
         # Specific datastructures for retrieving relevant MLCA data
         # inventory: inventory, reverse index, metadata keys, metadata fields
+        # The technosphere flows are filled in place once the results are
+        # completed (see `inventory_df`), so they are not requested here.
         self.inventory_data = {
             "biosphere": (self.mlca.inventory, self.mlca.rev_biosphere_dict,
                           self.mlca.fu_activity_keys, self.ef_fields),
-            "technosphere": (self.mlca.technosphere_flows, self.mlca.rev_activity_dict,
+            "technosphere": (self.mlca._technosphere_flows, self.mlca.rev_activity_dict,
                              self.mlca.fu_activity_keys, self.act_fields),
         }
         # aggregation: reverse index, metadata keys, metadata fields
@@ -327,6 +1040,9 @@ class Contributions(object):
             "biosphere": (self.mlca.rev_biosphere_dict, self.mlca.lca.biosphere_dict, self.ef_fields),
             "technosphere": (self.mlca.rev_activity_dict, self.mlca.lca.activity_dict, self.act_fields),
         }
+        # (groups, items) indicator matrices and group labels per inventory
+        # and aggregation parameters, see `_aggregation_matrix`.
+        self._aggregation_matrices = {}
 
     def normalize(self, contribution_array):
         """Normalise the contribution array.
@@ -345,8 +1061,40 @@ class Contributions(object):
         scores = contribution_array.sum(axis=1, keepdims=True)
         return contribution_array / scores
 
-    def _build_dict(self, C, FU_M_index, rev_dict, limit, limit_type):
-        """Sort the given contribution array on method or reference flow column.
+    @staticmethod
+    def _top_indices(C: np.ndarray, limit, limit_type: str) -> (np.ndarray, np.ndarray):
+        """Find the top-contributing items of every row of the contribution
+        array at once, following `ContributionAnalysis.sort_array`.
+
+        Returns the (rows, k) column indices of the items sorted by absolute
+        contribution and a mask of which of these are part of the top of
+        their row, as the amount of items may differ per row in 'percent'
+        mode.
+        """
+        if limit_type not in ("number", "percent"):
+            raise ValueError("limit_type must be either 'percent' or 'number'.")
+        magnitude = np.abs(C)
+        if limit_type == "percent":
+            if not 0 < limit <= 1:
+                raise ValueError("Percentage limits > 0 and <= 1.")
+            total = magnitude.sum(axis=1, keepdims=True)
+            counts = (C >= total * limit).sum(axis=1)
+        else:
+            counts = np.full(C.shape[0], min(int(limit), C.shape[1]))
+        k = int(counts.max()) if counts.size else 0
+        if 0 < k < C.shape[1]:
+            top = np.argpartition(-magnitude, k - 1, axis=1)[:, :k]
+        else:
+            top = np.tile(np.arange(C.shape[1]), (C.shape[0], 1))[:, :k]
+        order = np.argsort(-np.take_along_axis(magnitude, top, axis=1), axis=1, kind="stable")
+        top = np.take_along_axis(top, order, axis=1)
+        return top, np.arange(k) < counts[:, np.newaxis]
+
+    @classmethod
+    def _build_top_contributions(cls, C, FU_M_index, rev_dict, limit, limit_type,
+                                 residual=None) -> pd.DataFrame:
+        """Select the top contributions of every method or reference flow
+        column of the contribution array.
 
         Parameters
         ----------
@@ -363,25 +1111,41 @@ class Contributions(object):
         limit_type : str
             Either "number" or "percent", ContributionAnalysis.sort_array
             for complete explanation
+        residual : `numpy.ndarray`, optional
+            Contributions per column not included in C, these are added
+            to the 'Total' and 'Rest'
 
         Returns
         -------
-        dict
-            Top-contributing flows per method or activity
-
-        """
-        topcontribution_dict = dict()
-        for fu_or_method, col in FU_M_index.items():
-            top_contribution = ca.sort_array(C[col, :], limit=limit, limit_type=limit_type)
-            cont_per = dict()
-            cont_per.update({
-                ('Total', ''): C[col, :].sum(),
-                ('Rest', ''): C[col, :].sum() - top_contribution[:, 0].sum(),
-                })
-            for value, index in top_contribution:
-                cont_per.update({rev_dict[index]: value})
-            topcontribution_dict.update({fu_or_method: cont_per})
-        return topcontribution_dict
+        `pandas.DataFrame`
+            The 'Total', 'Rest' and top-contributing flows (rows) per
+            method or reference flow (columns), flows which are not part of
+            the top of a column are NaN
+
+        """
+        keys, cols = list(FU_M_index.keys()), list(FU_M_index.values())
+        C = C[cols]
+        top, selected = cls._top_indices(C, limit, limit_type)
+        values = np.take_along_axis(C, top, axis=1)
+        total = C.sum(axis=1)
+        if residual is not None:
+            total = total + np.asarray(residual)[cols]
+        rest = total - np.where(selected, values, 0).sum(axis=1)
+
+        # Rows are ordered by the first column they are part of the top of.
+        flat = top[selected]
+        _, first = np.unique(flat, return_index=True)
+        rows = flat[np.sort(first)]
+        position = np.empty(C.shape[1], dtype=np.int64)
+        position[rows] = np.arange(rows.size)
+        data = np.full((rows.size + 2, len(cols)), np.nan)
+        data[0], data[1] = total, rest
+        data[position[flat] + 2, np.nonzero(selected)[0]] = values[selected]
+
+        index = [('Total', ''), ('Rest', '')] + [rev_dict[i] for i in rows.tolist()]
+        columns = pd.MultiIndex.from_tuples(keys) if keys and all(
+            isinstance(k, tuple) for k in keys) else keys
+        return pd.DataFrame(data, index=index, columns=columns)
 
     @staticmethod
     def get_labels(key_list, fields=None, separator=' | ',
@@ -413,15 +1177,19 @@ class Contributions(object):
 
         """
         fields = fields if fields else ['name', 'reference product', 'location', 'database']
-        keys = (k for k in key_list)  # need to do this as the keys come from a pd.Multiindex
+        keys = list(key_list)  # need to do this as the keys come from a pd.Multiindex
+        labels = AB_metadata.get_labels(
+            (None if mask and k in mask or isinstance(k, str) else k for k in keys),
+            fields, separator
+        )
         translated_keys = []
-        for k in keys:
+        for k, label in zip(keys, labels):
             if mask and k in mask:
                 translated_keys.append(k)
             elif isinstance(k, str):
                 translated_keys.append(k)
-            elif k in AB_metadata.index:
-                translated_keys.append(separator.join([str(l) for l in list(AB_metadata.get_metadata(k, fields))]))
+            elif label is not None:
+                translated_keys.append(label)
             else:
                 translated_keys.append(separator.join([i for i in k if i != '']))
         if max_length:
@@ -462,7 +1230,7 @@ class Contributions(object):
             df.index = pd.MultiIndex.from_tuples(df.index)
 
         # get metadata for rows
-        keys = [k for k in df.index if k in AB_metadata.index]
+        keys = list(df.index[df.index.isin(AB_metadata.index)])
         metadata = AB_metadata.get_metadata(keys, x_fields)
 
         # join data with metadata
@@ -509,6 +1277,13 @@ class Contributions(object):
         # If the cont_dict has tuples for keys, coerce df.columns into MultiIndex
         if all(isinstance(k, tuple) for k in cont_dict.keys()):
             df.columns = pd.MultiIndex.from_tuples(df.columns)
+        return self._label_contributions(df, x_fields, y_fields, mask)
+
+    def _label_contributions(self, df: pd.DataFrame, x_fields=None,
+                             y_fields=None, mask=None) -> pd.DataFrame:
+        """Annotate the dataframe of top contributions with metadata, see
+        `get_labelled_contribution_dict`.
+        """
         special_keys = [('Total', ''), ('Rest', '')]
 
         # replace all 0 values with NaN and drop all rows with only NaNs
@@ -564,6 +1339,9 @@ class Contributions(object):
                 "Type must be either 'biosphere' or 'technosphere', "
                 "'{}' given.".format(inventory_type)
             )
+        if inventory_type == "technosphere":
+            # The technosphere flows require the full system to be solved.
+            self.mlca.complete_results()
         return self._build_inventory(*data)
 
     def _build_lca_scores_df(self, scores: np.ndarray) -> pd.DataFrame:
@@ -596,26 +1374,43 @@ class Contributions(object):
     def _build_contributions(data: np.ndarray, index: int, axis: int) -> np.ndarray:
         return data.take(index, axis=axis)
 
+    def _contribution_array(self, contribution: str, residual: bool = False) -> np.ndarray:
+        """Return the contribution array of the given type, or the residual
+        of that array (the part not stored in a compact array).
+
+        Only the requested array is read from the MLCA. Reading the process
+        contributions completes results that were calculated with a
+        pre-aggregated background, the elementary flow contributions do not.
+        """
+        if contribution == self.ACT:
+            data = self.mlca.process_contributions
+        elif contribution == self.EF:
+            data = self.mlca.elementary_flow_contributions
+        else:
+            raise KeyError(contribution)
+        if residual:
+            return data.residual if hasattr(data, "residual") else np.zeros(data.shape[:-1])
+        return data
+
     def get_contributions(self, contribution, functional_unit=None,
-                          method=None) -> np.ndarray:
+                          method=None, residual: bool = False) -> np.ndarray:
         """Return a contribution matrix given the type and fu / method
+
+        If residual is True, return the matching residual vector instead.
         """
         if all([functional_unit, method]) or not any([functional_unit, method]):
             raise ValueError(
                 "It must be either by reference flow or by impact category. Provided:"
                 "\n Reference flow: {} \n Impact Category: {}".format(functional_unit, method)
             )
-        dataset = {
-            'process': self.mlca.process_contributions,
-            'elementary_flow': self.mlca.elementary_flow_contributions,
-        }
+        data = self._contribution_array(contribution, residual)
         if method:
             return self._build_contributions(
-                dataset[contribution], self.mlca.method_index[method], 1
+                data, self.mlca.method_index[method], 1
             )
         elif functional_unit:
             return self._build_contributions(
-                dataset[contribution], self.mlca.func_key_dict[functional_unit], 0
+                data, self.mlca.func_key_dict[functional_unit], 0
             )
 
     def aggregate_by_parameters(self, C: np.ndarray, inventory: str,
@@ -646,22 +1441,38 @@ class Contributions(object):
         -------
 
         """
-        rev_index, keys, fields = self.aggregate_data[inventory]
         if not parameters:
-            return C, rev_index, None
+            return C, self.aggregate_data[inventory][0], None
 
-        df = pd.DataFrame(C).T
-        columns = list(range(C.shape[0]))
-        df.index = pd.MultiIndex.from_tuples(rev_index.values())
-        metadata = AB_metadata.get_metadata(list(keys), fields)
+        matrix, labels = self._aggregation_matrix(inventory, parameters)
+        mask_index = {i: m for i, m in enumerate(labels)}
+        return (matrix @ np.asarray(C).T).T, mask_index, mask_index.values()
 
-        joined = metadata.join(df)
-        joined.reset_index(inplace=True, drop=True)
-        grouped = joined.groupby(parameters)
-        aggregated = grouped[columns].sum()
-        mask_index = {i: m for i, m in enumerate(aggregated.index)}
+    def _aggregation_matrix(self, inventory: str,
+                            parameters: Union[str, list]) -> (sparse.csr_matrix, list):
+        """Return the sparse (groups, items) indicator matrix which sums the
+        items of the given inventory into the groups of the given metadata
+        parameters, and the labels of the groups.
 
-        return aggregated.T.values, mask_index, mask_index.values()
+        The matrix is built once per inventory and parameters.
+        """
+        cache_key = (inventory, tuple(parameters) if isinstance(parameters, list) else parameters)
+        if cache_key not in self._aggregation_matrices:
+            rev_index = self.aggregate_data[inventory][0]
+            columns = parameters if isinstance(parameters, list) else [parameters]
+            metadata = AB_metadata.get_metadata(list(rev_index.values()), columns)
+            grouped = metadata.reset_index(drop=True).groupby(parameters)
+            groups = grouped.ngroup().to_numpy()
+            labels = list(grouped.size().index)
+            # Items without a value for the parameters are not part of any group.
+            items = np.fromiter(rev_index.keys(), dtype=np.int64, count=len(rev_index))
+            valid = groups >= 0
+            matrix = sparse.csr_matrix(
+                (np.ones(valid.sum()), (groups[valid], items[valid])),
+                shape=(len(labels), len(rev_index))
+            )
+            self._aggregation_matrices[cache_key] = (matrix, labels)
+        return self._aggregation_matrices[cache_key]
 
     def _contribution_rows(self, contribution: str, aggregator=None):
         if aggregator is None:
@@ -673,6 +1484,48 @@ class Contributions(object):
             return self.mlca.fu_index, self.act_fields
         return self.mlca.method_index, None
 
+    def _top_contributions(self, contribution: str, inventory: str,
+                           functional_unit=None, method=None, aggregator=None,
+                           limit=5, normalize=False, limit_type="number") -> pd.DataFrame:
+        """Shared implementation of the top EF and process contributions.
+
+        The tables are kept in the `inventory_cache` of the MLCA, which is
+        cleared whenever the results are recalculated.
+        """
+        key = (
+            "top_contributions", contribution, functional_unit, method,
+            getattr(self.mlca, "current", None),
+            tuple(aggregator) if isinstance(aggregator, list) else aggregator,
+            limit, limit_type, normalize,
+        )
+        cached = self.mlca.inventory_cache.get(key)
+        if cached is not None:
+            return cached.copy()
+
+        C = self.get_contributions(contribution, functional_unit, method)
+        residual = self.get_contributions(contribution, functional_unit, method, residual=True)
+
+        x_fields = self._contribution_rows(contribution, aggregator)
+        index, y_fields = self._contribution_index_cols(
+            functional_unit=functional_unit, method=method
+        )
+        C, rev_index, mask = self.aggregate_by_parameters(C, inventory, aggregator)
+
+        # Normalise if required, the residual is part of the total score
+        if normalize:
+            normalized = self.normalize(np.column_stack([C, residual]))
+            C, residual = normalized[:, :-1], normalized[:, -1]
+
+        top_contributions = self._build_top_contributions(
+            C, index, rev_index, limit, limit_type, residual
+        )
+        labelled_df = self._label_contributions(
+            top_contributions, x_fields=x_fields, y_fields=y_fields, mask=mask
+        )
+        self.adjust_table_unit(labelled_df, method)
+        self.mlca.inventory_cache[key] = labelled_df
+        return labelled_df.copy()
+
     def top_elementary_flow_contributions(self, functional_unit=None, method=None,
                                           aggregator=None, limit=5, normalize=False,
                                           limit_type="number", **kwargs):
@@ -704,24 +1557,10 @@ class Contributions(object):
             Annotated top-contribution dataframe
 
         """
-        C = self.get_contributions(self.EF, functional_unit, method)
-
-        x_fields = self._contribution_rows(self.EF, aggregator)
-        index, y_fields = self._contribution_index_cols(
-            functional_unit=functional_unit, method=method
+        return self._top_contributions(
+            self.EF, self.BIOS, functional_unit, method, aggregator, limit,
+            normalize, limit_type
         )
-        C, rev_index, mask = self.aggregate_by_parameters(C, self.BIOS, aggregator)
-
-        # Normalise if required
-        if normalize:
-            C = self.normalize(C)
-
-        top_cont_dict = self._build_dict(C, index, rev_index, limit, limit_type)
-        labelled_df = self.get_labelled_contribution_dict(
-            top_cont_dict, x_fields=x_fields, y_fields=y_fields, mask=mask
-        )
-        self.adjust_table_unit(labelled_df, method)
-        return labelled_df
 
     def top_process_contributions(self, functional_unit=None, method=None,
                                   aggregator=None, limit=5, normalize=False,
@@ -753,21 +1592,59 @@ class Contributions(object):
             Annotated top-contribution dataframe
 
         """
-        C = self.get_contributions(self.ACT, functional_unit, method)
-
-        x_fields = self._contribution_rows(self.ACT, aggregator)
-        index, y_fields = self._contribution_index_cols(
-            functional_unit=functional_unit, method=method
+        return self._top_contributions(
+            self.ACT, self.TECH, functional_unit, method, aggregator, limit,
+            normalize, limit_type
         )
-        C, rev_index, mask = self.aggregate_by_parameters(C, self.TECH, aggregator)
 
-        # Normalise if required
-        if normalize:
-            C = self.normalize(C)
+    def top_scenario_contributions(self, contribution: str, functional_unit,
+                                   method, aggregator=None, limit=5,
+                                   normalize=False, limit_type="number") -> pd.DataFrame:
+        """Return the top contributions of the reference flow and method in
+        every scenario as a tidy dataframe.
+
+        The contributions of all scenarios are selected at once from the
+        scenario axis of the contribution arrays, so this requires the
+        results of a scenario calculation.
 
-        top_cont_dict = self._build_dict(C, index, rev_index, limit, limit_type)
-        labelled_df = self.get_labelled_contribution_dict(
-            top_cont_dict, x_fields=x_fields, y_fields=y_fields, mask=mask
+        Parameters
+        ----------
+        contribution : str
+            Either 'process' or 'elementary_flow'
+        functional_unit : str
+            The reference flow of the contributions
+        method : tuple
+            The method of the contributions
+        aggregator : str or list, optional
+            Used to aggregate the contributions over certain columns
+        limit : int
+            The number of top contributions to consider per scenario
+        normalize : bool
+            Determines whether or not to normalize the contribution values
+        limit_type : str
+            The type of limit, either 'number' or 'percent'
+
+        Returns
+        -------
+        `pandas.DataFrame`
+            One row per scenario and top-contributing item (including the
+            'Total' and 'Rest' of every scenario) with the metadata of the
+            item, the 'scenario' and the 'amount'
+
+        """
+        if contribution not in (self.ACT, self.EF):
+            raise ValueError("Unknown contribution type: {}".format(contribution))
+        inventory = self.TECH if contribution == self.ACT else self.BIOS
+        df = self._top_contributions(
+            contribution, inventory, functional_unit, method, aggregator, limit,
+            normalize, limit_type
         )
-        self.adjust_table_unit(labelled_df, method)
-        return labelled_df
+        index, _ = self._contribution_index_cols(
+            functional_unit=functional_unit, method=method
+        )
+        scenarios = self.get_labels(list(index))
+        tidy = df.melt(
+            id_vars=[c for c in df.columns if c not in scenarios], value_vars=scenarios,
+            var_name="scenario", value_name="amount",
+        )
+        return tidy.dropna(subset=["amount"]).reset_index(drop=True)
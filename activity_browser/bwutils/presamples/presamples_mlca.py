@@ -20,6 +20,9 @@ class PresamplesMLCA(MLCA):
     After this, each call to `calculate_scenario` will update the inventory
      matrices and recalculate the results.
     """
+    # Presamples usually alter only a few exchanges.
+    _low_rank_updates = True
+
     def __init__(self, cs_name: str, ps_name: str):
         self.package = ps.PresamplesPackage(get_package_path(ps_name))
         self.resource = ps.PresampleResource.get_or_none(name=self.package.name)
@@ -31,14 +34,19 @@ class PresamplesMLCA(MLCA):
 
         # Construct an index dictionary similar to fu_index and method_index
         self.presamples_index = {k: i for i, k in enumerate(self.scenario_names)}
+        # The biosphere matrix of the first presamples array and the values
+        # which differ from it in the other arrays, used to reconstruct the
+        # inventories of each presamples array.
+        self.base_biosphere = None
+        self.biosphere_changes = dict()
 
         # Rebuild numpy arrays with presample dimension included.
         self.lca_scores = np.zeros((len(self.func_units), len(self.methods), self.total))
-        self.elementary_flow_contributions = np.zeros((
+        self.elementary_flow_contributions = self._contribution_array((
             len(self.func_units), len(self.methods), self.total,
             self.lca.biosphere_matrix.shape[0]
         ))
-        self.process_contributions = np.zeros((
+        self.process_contributions = self._contribution_array((
             len(self.func_units), len(self.methods), self.total,
             self.lca.technosphere_matrix.shape[0]
         ))
@@ -71,38 +79,71 @@ class PresamplesMLCA(MLCA):
             presamples=[self.package.path]
         )
 
+    def _scenario_data(self) -> None:
+        """The biosphere matrices of the presamples arrays are reconstructed
+        from the calculation, so these results are never cached.
+        """
+        return None
+
+    def _foreground_system(self) -> None:
+        """The presamples may alter the background, so it is never
+        pre-aggregated.
+        """
+        return None
+
+    def _chunks(self, processes: int) -> list:
+        """The presamples arrays can only be walked through in order, so these
+        calculations are never split over worker processes.
+        """
+        return []
+
     def _perform_calculations(self):
         """ Near copy of `MLCA` class, but includes a loop for all presample
         arrays.
         """
+        demand = self._build_demand_matrix()
+        self.base_biosphere = None
+        self.biosphere_changes = dict()
         for ps_col in range(self.total):
-            for row, func_unit in enumerate(self.func_units):
-                self.lca.redo_lci(func_unit)
-                self.scaling_factors.update({
-                    (str(func_unit), ps_col): self.lca.supply_array
-                })
-                self.technosphere_flows.update({
-                    (str(func_unit), ps_col): np.multiply(
-                        self.lca.supply_array, self.lca.technosphere_matrix.diagonal()
-                    )
-                })
-                self.inventory.update({
-                    (str(func_unit), ps_col): np.array(self.lca.inventory.sum(axis=1)).ravel()
-                })
-                self.inventories.update({
-                    (str(func_unit), ps_col): self.lca.inventory
-                })
-
-                for col, cf_matrix in enumerate(self.method_matrices):
-                    self.lca.characterization_matrix = cf_matrix
-                    self.lca.lcia_calculation()
-                    self.lca_scores[row, col, ps_col] = self.lca.score
-                    self.characterized_inventories[(row, col, ps_col)] = self.lca.characterized_inventory.copy()
-                    self.elementary_flow_contributions[row, col, ps_col] = np.array(
-                        self.lca.characterized_inventory.sum(axis=1)).ravel()
-                    self.process_contributions[row, col, ps_col] = self.lca.characterized_inventory.sum(axis=0)
+            supply = self._solve_demand_matrix(demand)
+            self._store_results(supply, ps_col)
+            self._store_biosphere(ps_col)
             self.next_scenario()
 
+    def _store_biosphere(self, ps_col: int) -> None:
+        """Keep the values of the current biosphere matrix which differ from
+        the biosphere matrix of the first presamples array.
+
+        Only if the presamples add entries to the matrix is it copied.
+        """
+        matrix = self.lca.biosphere_matrix
+        base = self.base_biosphere
+        if base is None:
+            self.base_biosphere = matrix.copy()
+            return
+        if not (np.array_equal(matrix.indptr, base.indptr) and
+                np.array_equal(matrix.indices, base.indices)):
+            self.biosphere_changes[ps_col] = matrix.copy()
+            return
+        changed = np.flatnonzero(matrix.data != base.data)
+        if changed.size:
+            self.biosphere_changes[ps_col] = (changed, matrix.data[changed])
+
+    def _biosphere_matrix(self, scenario: Optional[int] = None):
+        """Reconstruct the biosphere matrix of the given presamples array
+        from the biosphere matrix of the first array.
+        """
+        if scenario is None or self.base_biosphere is None:
+            return self.lca.biosphere_matrix
+        change = self.biosphere_changes.get(scenario)
+        if change is None:
+            return self.base_biosphere
+        if not isinstance(change, tuple):
+            return change
+        matrix = self.base_biosphere.copy()
+        matrix.data[change[0]] = change[1]
+        return matrix
+
     def get_results_for_method(self, index: int = 0) -> pd.DataFrame:
         """ Overrides the parent and returns a dataframe with the scenarios
          as columns
@@ -202,7 +243,7 @@ class PresamplesContributions(Contributions):
         return data[fu_index, m_index, :]
 
     def get_contributions(self, contribution, functional_unit=None,
-                          method=None) -> np.ndarray:
+                          method=None, residual: bool = False) -> np.ndarray:
         """Return a contribution matrix given the type and fu / method
 
         Allow for both fu and method to exist.
@@ -212,16 +253,13 @@ class PresamplesContributions(Contributions):
                 "Either reference flow, method or both should be given. Provided:"
                 "\n Reference flow: {} \n Impact Category: {}".format(functional_unit, method)
             )
-        dataset = {
-            'process': self.mlca.process_contributions,
-            'elementary_flow': self.mlca.elementary_flow_contributions,
-        }
         if method and functional_unit:
             return self._build_scenario_contributions(
-                dataset[contribution], self.mlca.func_key_dict[functional_unit],
+                self._contribution_array(contribution, residual),
+                self.mlca.func_key_dict[functional_unit],
                 self.mlca.method_index[method]
             )
-        return super().get_contributions(contribution, functional_unit, method)
+        return super().get_contributions(contribution, functional_unit, method, residual)
 
     def _contribution_index_cols(self, **kwargs) -> (dict, Optional[Iterable]):
         # If both functional_unit and method are given, return presamples index.
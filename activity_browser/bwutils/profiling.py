@@ -0,0 +1,143 @@
+# -*- coding: utf-8 -*-
+from contextlib import contextmanager
+from functools import wraps
+import json
+import os
+import threading
+import time
+import tracemalloc
+from typing import Callable, List, NamedTuple, Optional
+
+
+class Stage(NamedTuple):
+    """A single timed stage of a calculation."""
+    name: str
+    category: str
+    start: float
+    duration: float
+    depth: int
+    peak_memory: Optional[int] = None
+    pid: int = 0
+    tid: int = 0
+
+
+class Profiler(object):
+    """Records the wall time and (optionally) the peak memory of the stages
+    of the LCA calculations.
+
+    Stages are recorded with the `stage` context manager or the `profile`
+    decorator and can be nested. Peak memory is only measured when
+    `trace_memory` is enabled, as tracing all allocations with `tracemalloc`
+    slows down the calculations considerably. It requires Python 3.9 or
+    later to reset the peak at the start of each stage, on older versions
+    the peak memory of the stages is not available (None).
+
+    The recorded stages can be exported as JSON or in the Chrome trace
+    event format, which can be opened in 'chrome://tracing' or Perfetto.
+    """
+
+    def __init__(self, max_records: int = 10000):
+        self.max_records = max_records
+        self.records: List[Stage] = []
+        self._origin = time.perf_counter()
+        self._local = threading.local()
+
+    @property
+    def trace_memory(self) -> bool:
+        return tracemalloc.is_tracing()
+
+    @trace_memory.setter
+    def trace_memory(self, trace: bool) -> None:
+        if trace and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        elif not trace and tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+    @property
+    def measures_peaks(self) -> bool:
+        """Whether the peak memory of the stages can be measured."""
+        return hasattr(tracemalloc, "reset_peak")
+
+    @property
+    def _stack(self) -> list:
+        if not hasattr(self._local, "stack"):
+            self._local.stack = []
+        return self._local.stack
+
+    def _update_peaks(self) -> int:
+        """Store the peak memory since the last reset in all open stages."""
+        current, peak = tracemalloc.get_traced_memory()
+        for entry in self._stack:
+            entry["peak"] = max(entry["peak"], peak)
+        return current
+
+    @contextmanager
+    def stage(self, name: str, category: str = ""):
+        """Record the wall time (and peak memory) of the wrapped code."""
+        # Without resetting the peak, only the peak since tracing started
+        # is known, which is not the peak of the stage.
+        tracing = self.trace_memory and self.measures_peaks
+        memory = None
+        if tracing:
+            memory = self._update_peaks()
+            tracemalloc.reset_peak()
+        entry = {"memory": memory, "peak": memory or 0}
+        stack = self._stack
+        stack.append(entry)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            duration = time.perf_counter() - start
+            peak = None
+            if tracing and self.trace_memory:
+                self._update_peaks()
+                peak = entry["peak"] - entry["memory"]
+            stack.pop()
+            self.records.append(Stage(
+                name, category, start - self._origin, duration, len(stack), peak,
+                os.getpid(), threading.get_ident(),
+            ))
+            if len(self.records) > self.max_records:
+                del self.records[:len(self.records) - self.max_records]
+
+    def profile(self, name: str = None, category: str = "") -> Callable:
+        """Decorator which records every call of the function as a stage."""
+        def decorator(func: Callable) -> Callable:
+            stage_name = name or func.__qualname__
+
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.stage(stage_name, category):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def clear(self) -> None:
+        self.records = []
+
+    def to_json(self) -> str:
+        return json.dumps([s._asdict() for s in self.records], indent=2)
+
+    def to_chrome_trace(self) -> str:
+        """Format the records as 'complete' events of the Chrome trace event
+        format, timestamps are given in microseconds.
+        """
+        events = [
+            {
+                "name": s.name, "cat": s.category, "ph": "X",
+                "ts": s.start * 1e6, "dur": s.duration * 1e6,
+                "pid": s.pid, "tid": s.tid,
+                "args": {} if s.peak_memory is None else {"peak_memory": s.peak_memory},
+            }
+            for s in self.records
+        ]
+        return json.dumps({"traceEvents": events, "displayTimeUnit": "ms"})
+
+    def export(self, path: str, chrome_trace: bool = False) -> None:
+        """Write the records to the given path as JSON or as Chrome trace."""
+        with open(path, "w") as file:
+            file.write(self.to_chrome_trace() if chrome_trace else self.to_json())
+
+
+profiler = Profiler()
@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+from typing import Optional
+
+import numpy as np
+from scipy import sparse
+
+try:
+    from pypardiso import factorized
+except ImportError:
+    from scipy.sparse.linalg import factorized
+
+
+def reachable_activities(technosphere: sparse.spmatrix, start: np.ndarray,
+                         activity_of_product: np.ndarray) -> np.ndarray:
+    """Return the (sorted) columns of the technosphere matrix which can be
+    reached from the activities in `start`, following the products every
+    activity uses to the activities which produce them.
+
+    `activity_of_product` gives the column of the activity producing the
+    product of every row.
+    """
+    technosphere = technosphere.tocsc()
+    reached = np.zeros(technosphere.shape[1], dtype=bool)
+    reached[start] = True
+    frontier = np.unique(start)
+    while frontier.size:
+        rows = np.unique(technosphere[:, frontier].indices)
+        cols = np.unique(activity_of_product[rows])
+        frontier = cols[~reached[cols]]
+        reached[frontier] = True
+    return np.flatnonzero(reached)
+
+
+class ReducedSolver(object):
+    """Solves the technosphere matrix restricted to the activities which are
+    reachable from the demand, the supply of all other activities is zero.
+
+    The solver is called like the factorized technosphere matrix of
+    `bw.LCA`, with and returning arrays on the full indices. Demand for
+    products outside of the reduced system is solved against the full
+    technosphere matrix, which is only factorized when that happens.
+    `precondition` approximates the full solve without factorizing it.
+    """
+    def __init__(self, technosphere: sparse.spmatrix, rows: np.ndarray, cols: np.ndarray,
+                 activity_of_product: np.ndarray):
+        self.technosphere = technosphere
+        self.rows = rows
+        self.cols = cols
+        self.outside = np.ones(technosphere.shape[0], dtype=bool)
+        self.outside[rows] = False
+        self.solver = factorized(technosphere.tocsr()[rows][:, cols])
+        self._full_solver = None
+        # The activities producing the products outside of the reduced
+        # system, and their production amounts.
+        self.outside_rows = np.flatnonzero(self.outside)
+        self.outside_cols = activity_of_product[self.outside_rows]
+        diagonal = np.asarray(
+            technosphere.tocsr()[self.outside_rows, self.outside_cols]
+        ).ravel()
+        self.outside_diagonal = np.where(diagonal != 0, diagonal, 1.0)
+
+    @classmethod
+    def build(cls, technosphere: sparse.spmatrix, demand: np.ndarray,
+              activity_of_product: np.ndarray) -> Optional["ReducedSolver"]:
+        """Return the solver of the system reachable from the demand, or
+        None if the full system is reachable.
+
+        Products and activities are matched through `activity_of_product`,
+        the column of the activity producing the product of every row.
+        """
+        demand_rows = np.flatnonzero(np.any(demand.reshape(demand.shape[0], -1) != 0, axis=1))
+        cols = reachable_activities(technosphere, activity_of_product[demand_rows], activity_of_product)
+        if cols.size == technosphere.shape[1]:
+            return None
+        row_of_activity = np.empty(technosphere.shape[1], dtype=np.int64)
+        row_of_activity[activity_of_product] = np.arange(technosphere.shape[0])
+        return cls(technosphere, row_of_activity[cols], cols, activity_of_product)
+
+    @property
+    def size(self) -> int:
+        return self.cols.size
+
+    def __call__(self, demand: np.ndarray) -> np.ndarray:
+        demand = np.asarray(demand)
+        if np.any(demand.reshape(demand.shape[0], -1)[self.outside] != 0):
+            if self._full_solver is None:
+                self._full_solver = factorized(self.technosphere.tocsr())
+            return self._full_solver(demand)
+        supply = np.zeros(demand.shape)
+        supply[self.cols] = self.solver(demand[self.rows])
+        return supply
+
+    def precondition(self, demand: np.ndarray) -> np.ndarray:
+        """Approximate the solution of the full technosphere matrix without
+        factorizing it. The reduced system is solved exactly, the demand for
+        products outside of it is divided by their production amount.
+
+        This is the preconditioner of iterative solves of the full matrix
+        (see `IterativeSolver`), whose dense vectors would otherwise have
+        the full technosphere matrix factorized.
+        """
+        demand = np.asarray(demand)
+        supply = np.zeros(demand.shape)
+        supply[self.cols] = self.solver(demand[self.rows])
+        supply[self.outside_cols] = demand[self.outside_rows] / self.outside_diagonal
+        return supply
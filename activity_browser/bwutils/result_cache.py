@@ -0,0 +1,130 @@
+# -*- coding: utf-8 -*-
+import hashlib
+import os
+from pathlib import Path
+from typing import Optional
+import zipfile
+
+import brightway2 as bw
+import numpy as np
+
+from ..settings import ab_settings
+
+
+class ResultCache(object):
+    """Stores the results of LCA calculations as compressed numpy archives
+    in the directory of the current project.
+
+    Every entry is stored as a '<setup>_<results>.npz' file, where 'setup'
+    is a hash of the calculation setup contents (and scenario data) and
+    'results' is a hash of everything else the results depend on, like the
+    `modified` timestamps of the databases. Saving new results for a setup
+    removes the older (stale) results of that setup.
+
+    The total size of the cache is limited by the `result_cache_size`
+    setting, the least recently used entries are removed first. Results
+    which do not fit in the cache by themselves are never stored. The
+    cache is disabled by default, as the results are written after every
+    calculation.
+    """
+    DIRECTORY = "ab_results"
+
+    @property
+    def directory(self) -> Path:
+        return Path(bw.projects.dir, self.DIRECTORY)
+
+    @property
+    def max_size(self) -> int:
+        return ab_settings.result_cache_size * 1024 ** 2
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_size > 0
+
+    @staticmethod
+    def hash(*data) -> str:
+        """Build a hash from the given bytes or (the representation of) python
+        objects.
+        """
+        digest = hashlib.sha256()
+        for item in data:
+            digest.update(item if isinstance(item, bytes) else repr(item).encode("utf-8"))
+        return digest.hexdigest()[:32]
+
+    def _path(self, setup: str, results: str) -> Path:
+        return self.directory / "{}_{}.npz".format(setup, results)
+
+    def load(self, setup: str, results: str) -> Optional[dict]:
+        """Return the arrays stored under the given key or None if the
+        results are not cached.
+        """
+        path = self._path(setup, results)
+        if not self.enabled or not path.is_file():
+            return None
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                arrays = {name: data[name] for name in data.files}
+        except (OSError, ValueError, zipfile.BadZipFile):
+            # Remove the broken file, the results are calculated again.
+            path.unlink()
+            return None
+        # Mark the entry as recently used.
+        os.utime(path)
+        return arrays
+
+    def save(self, setup: str, results: str, arrays: dict) -> None:
+        """Store the arrays under the given key and remove the stale results
+        of the same calculation setup.
+
+        Arrays which (uncompressed) exceed the size of the cache are not
+        stored, storing them would evict every other entry.
+        """
+        if not self.enabled or sum(a.nbytes for a in arrays.values()) > self.max_size:
+            return
+        self.directory.mkdir(exist_ok=True)
+        path = self._path(setup, results)
+        for stale in self.directory.glob("{}_*.npz".format(setup)):
+            if stale != path:
+                stale.unlink()
+        # Write to a temporary file first, so an interrupted write never
+        # leaves a broken entry behind.
+        temp = path.with_suffix(".tmp")
+        with open(temp, "wb") as file:
+            np.savez_compressed(file, **arrays)
+        os.replace(temp, path)
+        self.evict(keep=path)
+
+    def evict(self, keep: Path = None) -> None:
+        """Remove the least recently used entries until the cache fits in
+        the size given by the settings.
+
+        The `keep` entry (the entry just stored) is never evicted for older
+        entries, it is removed itself if it does not fit in the cache.
+        """
+        if not self.directory.is_dir():
+            return
+        files = sorted(
+            ((p.stat().st_mtime, p.stat().st_size, p) for p in self.directory.glob("*.npz")
+             if p != keep),
+            key=lambda x: x[0]
+        )
+        size = sum(x[1] for x in files)
+        if keep is not None and keep.is_file():
+            if keep.stat().st_size > self.max_size:
+                keep.unlink()
+            else:
+                size += keep.stat().st_size
+        for _, file_size, path in files:
+            if size <= self.max_size:
+                break
+            path.unlink()
+            size -= file_size
+
+    def clear(self) -> None:
+        """Remove all of the cached results of the current project."""
+        if self.directory.is_dir():
+            for path in self.directory.glob("*.npz"):
+                path.unlink()
+
+
+result_cache = ResultCache()
@@ -15,6 +15,7 @@ from SALib.analyze import delta
 import os
 
 from .montecarlo import MonteCarloLCA, perform_MonteCarlo_LCA
+from .profiling import profiler
 from ..settings import ab_settings
 
 
@@ -280,6 +281,7 @@ class GlobalSensitivityAnalysis(object):
                 "mc should be an instance of MonteCarloLCA, but instead it is a {}.".format(type(mc))
             )
 
+    @profiler.profile("Perform GSA", "GlobalSensitivityAnalysis")
     def perform_GSA(self, act_number=0, method_number=0,
                     cutoff_technosphere=0.01, cutoff_biosphere=0.01):
         """Perform GSA for specific reference flow and impact category."""
@@ -380,7 +382,8 @@ class GlobalSensitivityAnalysis(object):
 
         # perform delta analysis
         time_delta = time()
-        self.Si = delta.analyze(self.problem, self.X, self.Y, print_to_console=False)
+        with profiler.stage("Delta analysis", "GlobalSensitivityAnalysis"):
+            self.Si = delta.analyze(self.problem, self.X, self.Y, print_to_console=False)
         print('Delta analysis took {} seconds'.format(np.round(time() - time_delta, 2), ))
 
         # put GSA results in to dataframe
@@ -0,0 +1,180 @@
+# -*- coding: utf-8 -*-
+from collections import OrderedDict
+from typing import Callable, Optional
+
+import numpy as np
+from scipy import sparse
+from scipy.linalg import lu_factor, lu_solve
+from scipy.sparse.linalg import LinearOperator, bicgstab, gmres
+
+try:
+    from pypardiso import factorized
+except ImportError:
+    from scipy.sparse.linalg import factorized
+
+
+def solve_columns(solver: Callable, rhs: np.ndarray) -> np.ndarray:
+    """Solve all columns of the right-hand side with the given solver.
+
+    Not every solver accepts a 2-dimensional right-hand side (UMFPACK does
+    not), in which case the columns are solved one by one.
+    """
+    try:
+        solution = np.asarray(solver(rhs))
+    except (TypeError, ValueError):
+        solution = None
+    if solution is None or solution.size != rhs.size:
+        solution = np.column_stack([solver(rhs[:, i]) for i in range(rhs.shape[1])])
+    return solution.reshape(rhs.shape)
+
+
+class LowRankSolver(object):
+    """Solves a technosphere matrix which differs from a factorized baseline
+    matrix in only a few rows or columns, without factorizing it.
+
+    The difference between the matrices is written as U V^T, where the rank
+    k is the smaller of the amount of changed rows and changed columns. The
+    Woodbury identity then gives the solution from the baseline solution x:
+
+        (A + U V^T)^-1 b = x - Z (I + V^T Z)^-1 V^T x, with Z = A^-1 U
+
+    which requires k solves with the baseline factorization and the
+    factorization of the (k, k) capacitance matrix.
+    """
+    def __init__(self, baseline_solver: Callable, rows: np.ndarray, cols: np.ndarray,
+                 difference: sparse.spmatrix):
+        size = difference.shape[0]
+        if rows.size <= cols.size:
+            u = sparse.csc_matrix(
+                (np.ones(rows.size), (rows, np.arange(rows.size))), shape=(size, rows.size)
+            )
+            self.vt = difference.tocsr()[rows]
+        else:
+            u = difference.tocsc()[:, cols]
+            self.vt = sparse.csr_matrix(
+                (np.ones(cols.size), (np.arange(cols.size), cols)), shape=(cols.size, size)
+            )
+        self.solver = baseline_solver
+        self.z = self.capacitance = None
+        if self.rank:
+            self.z = solve_columns(baseline_solver, u.toarray())
+            self.capacitance = lu_factor(np.eye(self.rank) + self.vt @ self.z)
+
+    @classmethod
+    def build(cls, baseline_solver: Callable, baseline: sparse.spmatrix,
+              technosphere: sparse.spmatrix, max_rank: int) -> Optional["LowRankSolver"]:
+        """Return the solver of the technosphere matrix, or None if its
+        difference from the baseline matrix has a rank above `max_rank`.
+        """
+        difference = (technosphere - baseline).tocoo()
+        nonzero = difference.data != 0
+        rows = np.unique(difference.row[nonzero])
+        cols = np.unique(difference.col[nonzero])
+        if min(rows.size, cols.size) > max_rank:
+            return None
+        return cls(baseline_solver, rows, cols, difference)
+
+    @property
+    def rank(self) -> int:
+        return self.vt.shape[0]
+
+    def __call__(self, demand: np.ndarray) -> np.ndarray:
+        demand = np.asarray(demand, dtype=np.float64)
+        supply = self.solver(demand) if demand.ndim == 1 else solve_columns(self.solver, demand)
+        if not self.rank:
+            return supply
+        return supply - self.z @ lu_solve(self.capacitance, self.vt @ supply)
+
+
+class IterativeSolver(object):
+    """Solves technosphere matrices which differ slightly from a baseline
+    matrix, e.g. the matrices of scenarios or Monte Carlo iterations,
+    without factorizing them.
+
+    The systems are solved with BiCGSTAB or GMRES, preconditioned with the
+    factorized baseline matrix. The solutions of the last `warm_starts`
+    demands are kept, a demand which was solved before starts from its
+    last solution. If the iterative solver does not converge the current
+    matrix is factorized and solved directly.
+
+    The solver is called like the factorized technosphere matrix of
+    `bw.LCA`, `update` sets the matrix to solve.
+    """
+    METHODS = {"bicgstab": bicgstab, "gmres": gmres}
+
+    def __init__(self, preconditioner: Callable, technosphere: sparse.spmatrix,
+                 method: str = "bicgstab", tol: float = 1e-10, maxiter: int = 100,
+                 warm_starts: int = 1):
+        if method not in self.METHODS:
+            raise ValueError("Unknown iterative solver: {}".format(method))
+        self.method = self.METHODS[method]
+        self.baseline = preconditioner
+        # Solvers of part of the system (see `ReducedSolver`) provide an
+        # approximation of the full system, as solving it would factorize
+        # the full matrix for the dense vectors of the iteration.
+        self.preconditioner = LinearOperator(
+            technosphere.shape, matvec=getattr(preconditioner, "precondition", preconditioner),
+            dtype=np.float64
+        )
+        self.tol = tol
+        self.maxiter = maxiter
+        # The solutions of the last solved demands, by demand.
+        self.previous = OrderedDict()
+        self.warm_starts = max(warm_starts, 1)
+        self.hits = 0
+        self.fallbacks = 0
+        self.update(technosphere)
+
+    @classmethod
+    def from_baseline(cls, technosphere: sparse.spmatrix, method: str = "bicgstab",
+                      baseline_solver: Optional[Callable] = None,
+                      warm_starts: int = 1) -> "IterativeSolver":
+        """Return the solver preconditioned with the given solver of the
+        baseline technosphere matrix, the given technosphere matrix is
+        factorized if there is none.
+        """
+        technosphere = technosphere.tocsr()
+        if baseline_solver is None:
+            baseline_solver = factorized(technosphere)
+        return cls(baseline_solver, technosphere, method, warm_starts=warm_starts)
+
+    def update(self, technosphere: sparse.spmatrix) -> None:
+        """Set the technosphere matrix which is solved."""
+        self.technosphere = technosphere.tocsr()
+        self._direct_solver = None
+
+    @staticmethod
+    def _key(demand: np.ndarray) -> bytes:
+        nonzero = np.flatnonzero(demand)
+        return nonzero.tobytes() + demand[nonzero].tobytes()
+
+    def _iterate(self, demand: np.ndarray, x0: np.ndarray) -> tuple:
+        kwargs = {"x0": x0, "M": self.preconditioner, "maxiter": self.maxiter, "atol": 0.0}
+        try:
+            return self.method(self.technosphere, demand, rtol=self.tol, **kwargs)
+        except TypeError:
+            # Older versions of scipy name the relative tolerance 'tol'.
+            return self.method(self.technosphere, demand, tol=self.tol, **kwargs)
+
+    def solve(self, demand: np.ndarray) -> np.ndarray:
+        """Solve a single demand vector."""
+        key = self._key(demand)
+        x0 = self.previous.pop(key, None)
+        if x0 is not None:
+            self.hits += 1
+        supply, info = self._iterate(demand, x0)
+        if info != 0 or not np.all(np.isfinite(supply)):
+            self.fallbacks += 1
+            if self._direct_solver is None:
+                self._direct_solver = factorized(self.technosphere)
+            supply = self._direct_solver(demand)
+        self.previous[key] = supply
+        while len(self.previous) > self.warm_starts:
+            self.previous.popitem(last=False)
+        return supply
+
+    def __call__(self, demand: np.ndarray) -> np.ndarray:
+        demand = np.asarray(demand, dtype=np.float64)
+        if demand.ndim == 1:
+            return self.solve(demand)
+        return np.column_stack([self.solve(demand[:, i]) for i in range(demand.shape[1])])
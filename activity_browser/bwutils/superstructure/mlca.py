@@ -1,5 +1,6 @@
 # -*- coding: utf-8 -*-
-from typing import Iterable, Optional
+import multiprocessing
+from typing import Iterable, List, Optional
 
 from bw2calc.matrices import TechnosphereBiosphereMatrixBuilder as MB
 import numpy as np
@@ -23,6 +24,8 @@ class SuperstructureMLCA(MLCA):
         "technosphere": "technosphere_matrix",
         "production": "technosphere_matrix",
     }
+    # Scenarios usually alter only a few exchanges.
+    _low_rank_updates = True
 
     def __init__(self, cs_name: str, df: pd.DataFrame):
         assert not df.empty, "Cannot run analysis without data."
@@ -45,6 +48,12 @@ class SuperstructureMLCA(MLCA):
             ('row', np.uint32), ('col', np.uint32), ('type', np.uint8),
         ])
         self.indices_to_matrix()
+        # Keep the original biosphere matrix if the scenarios alter it, this
+        # allows the inventories of each scenario to be reconstructed.
+        self.biosphere_types = np.array([
+            self.matrices.get(idx[2]) == "biosphere_matrix" for idx in self.indices
+        ], dtype=bool)
+        self.base_biosphere = self.lca.biosphere_matrix.copy() if self.biosphere_types.any() else None
 
         # Construct an index dictionary similar to fu_index and method_index
         self._current_index = 0
@@ -52,11 +61,11 @@ class SuperstructureMLCA(MLCA):
 
         # Rebuild numpy arrays with scenario dimension included.
         self.lca_scores = np.zeros((len(self.func_units), len(self.methods), self.total))
-        self.elementary_flow_contributions = np.zeros((
+        self.elementary_flow_contributions = self._contribution_array((
             len(self.func_units), len(self.methods), self.total,
             self.lca.biosphere_matrix.shape[0]
         ))
-        self.process_contributions = np.zeros((
+        self.process_contributions = self._contribution_array((
             len(self.func_units), len(self.methods), self.total,
             self.lca.technosphere_matrix.shape[0]
         ))
@@ -100,11 +109,37 @@ class SuperstructureMLCA(MLCA):
         In this case, we expect to only replace technosphere and biosphere
         values, leaving out characterization factor values.
         """
+        self._set_values(self.values[:, self.current])
+
+    def _apply_scenario(self, index: int) -> None:
+        """Set the matrices to the given scenario as if all of the scenarios
+        up to it were applied in order, the next scenario follows it.
+
+        Missing (NaN) values keep the value of the scenarios before them, so
+        every exchange is given the last value set up to the scenario.
+        """
+        self._set_values(self._scenario_values(index))
+        self.current = index + 1
+
+    def _scenario_values(self, index: int, rows=slice(None)) -> np.ndarray:
+        """Return the values of the (given rows of the) scenario indices in
+        the given scenario, with the last value set up to that scenario for
+        missing (NaN) values. Values missing up to the scenario remain NaN.
+        """
+        values = self.values[rows, :index + 1]
+        given = ~np.isnan(values)
+        last = index - np.argmax(given[:, ::-1], axis=1)
+        return np.where(given.any(axis=1), values[np.arange(last.size), last], np.nan)
+
+    def _set_values(self, values: np.ndarray) -> None:
+        """Replace the matrix values of the scenario indices with the given
+        values, NaN values are skipped.
+        """
         kinds = set([idx[2] for idx in self.indices])
         types = np.array([idx[2] for idx in self.indices])
         for kind in kinds:
             idx = self.matrix_indices[types == kind]
-            sample = self.values[types == kind, self.current]
+            sample = values[types == kind]
             # Filter sample and idx for NaN values in samples.
             idx = idx[~np.isnan(sample)]
             sample = sample[~np.isnan(sample)]
@@ -124,37 +159,74 @@ class SuperstructureMLCA(MLCA):
                 MB.fix_supply_use(idx, sample)
             matrix[idx["row"], idx["col"], ] = sample
 
+    def _biosphere_matrix(self, scenario: Optional[int] = None):
+        """Reconstruct the biosphere matrix of the given scenario from the
+        original biosphere matrix, with the same values as the calculation
+        of the scenario used.
+        """
+        if scenario is None or self.base_biosphere is None:
+            return self.lca.biosphere_matrix
+        idx = self.matrix_indices[self.biosphere_types]
+        sample = self._scenario_values(scenario, self.biosphere_types)
+        idx = idx[~np.isnan(sample)]
+        sample = sample[~np.isnan(sample)]
+        matrix = self.base_biosphere.copy()
+        matrix[idx["row"], idx["col"]] = sample
+        return matrix
+
+    def _scenario_data(self) -> tuple:
+        return (
+            self.scenario_names, [tuple(idx) for idx in self.indices],
+            self.values.tobytes(),
+        )
+
+    def _foreground_system(self) -> None:
+        """The scenarios may alter the background, so it is never
+        pre-aggregated.
+        """
+        return None
+
+    def _chunks(self, processes: int) -> List[range]:
+        """Divide the scenarios over the chunks instead of the reference flows."""
+        if processes < 2 or "fork" not in multiprocessing.get_all_start_methods():
+            return []
+        return [
+            range(c[0], c[-1] + 1)
+            for c in np.array_split(np.arange(self.total), processes) if c.size
+        ]
+
+    def _calculate_chunk(self, chunk: range) -> tuple:
+        """Calculate the scenarios in the chunk.
+
+        The worker starts at the first scenario of the chunk, with the same
+        matrices as that scenario has in a serial calculation.
+        """
+        demand = self._build_demand_matrix()
+        self._apply_scenario(chunk.start)
+        for ps_col in chunk:
+            if ps_col != chunk.start:
+                self.next_scenario()
+            self._store_results(self._solve_demand_matrix(demand), ps_col)
+        keys = [(str(fu), ps_col) for ps_col in chunk for fu in self.func_units]
+        index = (slice(None), slice(None), slice(chunk.start, chunk.stop))
+        return self._gather_results(index, keys)
+
+    def _perform_parallel_calculations(self, chunks: List[range]) -> None:
+        """Calculate the chunks in worker processes, then leave the matrices
+        and scenario index as they are after a serial calculation.
+        """
+        super()._perform_parallel_calculations(chunks)
+        self._apply_scenario(self.total - 1)
+
     def _perform_calculations(self):
         """ Near copy of `MLCA` class, but includes a loop for all presample
         arrays.
         """
+        demand = self._build_demand_matrix()
         for ps_col in range(self.total):
             self.next_scenario()
-            for row, func_unit in enumerate(self.func_units):
-                self.lca.redo_lci(func_unit)
-                self.scaling_factors.update({
-                    (str(func_unit), ps_col): self.lca.supply_array
-                })
-                self.technosphere_flows.update({
-                    (str(func_unit), ps_col): np.multiply(
-                        self.lca.supply_array, self.lca.technosphere_matrix.diagonal()
-                    )
-                })
-                self.inventory.update({
-                    (str(func_unit), ps_col): np.array(self.lca.inventory.sum(axis=1)).ravel()
-                })
-                self.inventories.update({
-                    (str(func_unit), ps_col): self.lca.inventory
-                })
-
-                for col, cf_matrix in enumerate(self.method_matrices):
-                    self.lca.characterization_matrix = cf_matrix
-                    self.lca.lcia_calculation()
-                    self.lca_scores[row, col, ps_col] = self.lca.score
-                    self.characterized_inventories[(row, col, ps_col)] = self.lca.characterized_inventory.copy()
-                    self.elementary_flow_contributions[row, col, ps_col] = np.array(
-                        self.lca.characterized_inventory.sum(axis=1)).ravel()
-                    self.process_contributions[row, col, ps_col] = self.lca.characterized_inventory.sum(axis=0)
+            supply = self._solve_demand_matrix(demand)
+            self._store_results(supply, ps_col)
 
     def get_results_for_method(self, index: int = 0) -> pd.DataFrame:
         """ Overrides the parent and returns a dataframe with the scenarios
@@ -236,7 +308,7 @@ class SuperstructureContributions(Contributions):
         return data[fu_index, m_index, :]
 
     def get_contributions(self, contribution, functional_unit=None,
-                          method=None) -> np.ndarray:
+                          method=None, residual: bool = False) -> np.ndarray:
         """Return a contribution matrix given the type and fu / method
 
         Allow for both fu and method to exist.
@@ -246,16 +318,13 @@ class SuperstructureContributions(Contributions):
                 "Either reference flow, impact category or both should be given. Provided:"
                 "\n Reference flow: {} \n Impact Category: {}".format(functional_unit, method)
             )
-        dataset = {
-            'process': self.mlca.process_contributions,
-            'elementary_flow': self.mlca.elementary_flow_contributions,
-        }
         if method and functional_unit:
             return self._build_scenario_contributions(
-                dataset[contribution], self.mlca.func_key_dict[functional_unit],
+                self._contribution_array(contribution, residual),
+                self.mlca.func_key_dict[functional_unit],
                 self.mlca.method_index[method]
             )
-        return super().get_contributions(contribution, functional_unit, method)
+        return super().get_contributions(contribution, functional_unit, method, residual)
 
     def _contribution_index_cols(self, **kwargs) -> (dict, Optional[Iterable]):
         # If both functional_unit and method are given, return presamples index.
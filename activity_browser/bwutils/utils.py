@@ -1,7 +1,9 @@
 # -*- coding: utf-8 -*-
-from collections import UserList
+from collections import OrderedDict, UserList
+from collections.abc import Mapping
 from itertools import chain
-from typing import Iterable, List, NamedTuple, Optional
+import sys
+from typing import Callable, Iterable, List, NamedTuple, Optional
 
 import brightway2 as bw
 from bw2data import config
@@ -12,6 +14,7 @@ from bw2data.parameters import (
 )
 from bw2data.utils import TYPE_DICTIONARY
 import numpy as np
+from scipy import sparse
 
 
 """
@@ -243,3 +246,171 @@ class StaticParameters(object):
     @staticmethod
     def prune_result_data(data: dict) -> dict:
         return {k: v.get("amount") for k, v in data.items()}
+
+
+def get_nbytes(obj) -> int:
+    """Return the approximate memory footprint in bytes of numpy arrays,
+    scipy sparse matrices and pandas objects.
+    """
+    if isinstance(obj, np.ndarray):
+        return obj.nbytes
+    if sparse.issparse(obj):
+        return sum(
+            getattr(obj, attr).nbytes for attr in ("data", "indices", "indptr", "row", "col")
+            if hasattr(obj, attr)
+        )
+    if hasattr(obj, "memory_usage"):
+        return int(np.sum(obj.memory_usage(deep=True)))
+    return sys.getsizeof(obj)
+
+
+class LRUCache(object):
+    """A dictionary-like container which holds on to the most recently used
+    values until their combined size exceeds `max_size` bytes, at which
+    point the least recently used values are dropped.
+
+    Values that are larger than the entire budget are never stored.
+    """
+
+    def __init__(self, max_size: int, sizeof: Callable[[object], int] = get_nbytes):
+        self.max_size = max_size
+        self.sizeof = sizeof
+        self.size = 0
+        self._data = OrderedDict()
+
+    def __contains__(self, key) -> bool:
+        return key in self._data
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __getitem__(self, key):
+        value, _ = self._data[key]
+        self._data.move_to_end(key)
+        return value
+
+    def __setitem__(self, key, value) -> None:
+        self.pop(key)
+        nbytes = self.sizeof(value)
+        if nbytes > self.max_size:
+            return
+        self._data[key] = (value, nbytes)
+        self.size += nbytes
+        while self.size > self.max_size:
+            _, (_, freed) = self._data.popitem(last=False)
+            self.size -= freed
+
+    def get(self, key, default=None):
+        return self[key] if key in self._data else default
+
+    def pop(self, key, default=None):
+        if key not in self._data:
+            return default
+        value, nbytes = self._data.pop(key)
+        self.size -= nbytes
+        return value
+
+    def clear(self) -> None:
+        self._data.clear()
+        self.size = 0
+
+
+class LazyMapping(Mapping):
+    """A read-only mapping which only constructs a value when it is
+    requested, the constructed values are kept in a (shared) `LRUCache`.
+
+    Parameters
+    ----------
+    build : callable
+        Constructs the value for the given key
+    keys : callable
+        Returns an iterable of all the valid keys of the mapping
+    cache : `LRUCache`
+        Cache in which the constructed values are stored
+    name : str
+        Namespace used for the keys in the cache, allowing multiple
+        mappings to share the same cache
+    """
+
+    def __init__(self, build: Callable, keys: Callable[[], Iterable],
+                 cache: LRUCache, name: str = ""):
+        self.build = build
+        self._keys = keys
+        self.cache = cache
+        self.name = name
+
+    def __getitem__(self, key):
+        cache_key = (self.name, key)
+        if cache_key in self.cache:
+            return self.cache[cache_key]
+        value = self.build(key)
+        self.cache[cache_key] = value
+        return value
+
+    def __contains__(self, key) -> bool:
+        return key in self._keys()
+
+    def __iter__(self):
+        return iter(self._keys())
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self._keys())
+
+
+class TopContributionArray(object):
+    """Compact storage of a contribution array where only the `k` largest
+    (absolute) values along the last axis are kept. The remainder of each
+    row is summed into an explicit `residual` array.
+
+    Assigning a dense array to the leading axes compresses the data,
+    indexing (or `take`) returns a dense `numpy.ndarray` with zeros for the
+    discarded values.
+
+    Parameters
+    ----------
+    shape : tuple
+        Shape of the full (dense) contribution array
+    k : int
+        Amount of values to keep for each row
+    dtype : `numpy.dtype`
+        Data type used to store the values and residual
+    """
+
+    def __init__(self, shape: tuple, k: int, dtype=np.float64):
+        self.shape = tuple(shape)
+        self.k = max(1, min(k, self.shape[-1]))
+        self.dtype = np.dtype(dtype)
+        self.indices = np.zeros(self.shape[:-1] + (self.k,), dtype=np.int32)
+        self.values = np.zeros(self.shape[:-1] + (self.k,), dtype=self.dtype)
+        self.residual = np.zeros(self.shape[:-1], dtype=self.dtype)
+
+    @property
+    def ndim(self) -> int:
+        return len(self.shape)
+
+    @property
+    def nbytes(self) -> int:
+        return self.indices.nbytes + self.values.nbytes + self.residual.nbytes
+
+    def __setitem__(self, index, data) -> None:
+        """Compress the given dense rows into the leading axes at `index`."""
+        data = np.asarray(data)
+        top = np.argpartition(np.abs(data), -self.k, axis=-1)[..., -self.k:]
+        values = np.take_along_axis(data, top, axis=-1)
+        self.indices[index] = top
+        self.values[index] = values
+        self.residual[index] = data.sum(axis=-1) - values.sum(axis=-1)
+
+    def __getitem__(self, index) -> np.ndarray:
+        index = index if isinstance(index, tuple) else (index,)
+        lead, last = index[:self.ndim - 1], index[self.ndim - 1:]
+        indices, values = self.indices[lead], self.values[lead]
+        dense = np.zeros(indices.shape[:-1] + (self.shape[-1],), dtype=self.dtype)
+        np.put_along_axis(dense, indices, values, axis=-1)
+        return dense[(Ellipsis,) + last] if last else dense
+
+    def take(self, indices, axis: int) -> np.ndarray:
+        """Mirrors `numpy.ndarray.take` for the leading axes."""
+        if axis < 0 or axis >= self.ndim - 1:
+            raise ValueError("Can only take along the leading axes, not axis {}".format(axis))
+        return self[(slice(None),) * axis + (indices,)]
@@ -1,5 +1,5 @@
 # -*- coding: utf-8 -*-
-from typing import Iterator, Optional, Union
+from typing import Iterable, Iterator, List, Optional, Union
 import uuid
 
 import brightway2 as bw
@@ -69,37 +69,54 @@ class ActivityController(QObject):
             QtWidgets.QMessageBox.warning(self.window, "Not possible.", text)
             return
 
+        # Mark the database as modified first, so the metadata is stored
+        # with the new timestamp.
+        db = next(iter(activities)).get("database")
+        bw.databases.set_modified(db)
+
         # Iterate through the activities and:
         # - Close any open activity tabs,
         # - Delete any related parameters
         # - Delete the activity
-        # - Clean the activity from the metadata.
+        # Then clean all of the activities from the metadata at once.
         for act in activities:
             signals.close_activity_tab.emit(act.key)
             ParameterController.delete_activity_parameter(act.key)
             act.delete()
-            AB_metadata.update_metadata(act.key)
+        AB_metadata.update_metadata([act.key for act in activities])
 
         # After deletion, signal that the database has changed
-        db = next(iter(activities)).get("database")
-        bw.databases.set_modified(db)
         signals.database_changed.emit(db)
         signals.databases_changed.emit()
         signals.calculation_setup_changed.emit()
 
     @staticmethod
     def generate_copy_code(key: tuple) -> str:
-        db, code = key
-        metadata = AB_metadata.get_database_metadata(db)
-        if '_copy' in code:
-            code = code.split('_copy')[0]
-        copies = metadata["key"].apply(
-            lambda x: x[1] if code in x[1] and "_copy" in x[1] else None
-        ).dropna().to_list() if not metadata.empty else []
-        if not copies:
-            return "{}_copy1".format(code)
-        n = max((int(c.split('_copy')[1]) for c in copies))
-        return "{}_copy{}".format(code, n + 1)
+        return ActivityController.generate_copy_codes([key])[0]
+
+    @staticmethod
+    def generate_copy_codes(keys: Iterable[tuple]) -> List[str]:
+        """Return a new '<code>_copy<n>' code for each of the keys.
+
+        The existing codes of each database are read from the metadata once,
+        codes handed out earlier in the batch are taken into account so
+        copies of the same activity get their own number.
+        """
+        copies = {}
+        new_codes = []
+        for db, code in keys:
+            if db not in copies:
+                metadata = AB_metadata.get_database_metadata(db)
+                db_copies = copies[db] = {}
+                existing = metadata["key"] if not metadata.empty else []
+                for _, existing_code in existing:
+                    base, _, n = existing_code.partition("_copy")
+                    if n.isdigit():
+                        db_copies[base] = max(db_copies.get(base, 0), int(n))
+            base = code.split("_copy")[0]
+            n = copies[db][base] = copies[db].get(base, 0) + 1
+            new_codes.append("{}_copy{}".format(base, n))
+        return new_codes
 
     @Slot(tuple, name="copyActivity")
     @Slot(list, name="copyActivities")
@@ -108,9 +125,12 @@ class ActivityController(QObject):
         # todo: add "copy of" (or similar) to name of activity for easy identification in new db
         # todo: some interface feedback so user knows the copy has succeeded
         activities = self._retrieve_activities(data)
+        db = next(iter(activities)).get("database")
+        bw.databases.set_modified(db)
 
-        for act in activities:
-            new_code = self.generate_copy_code(act.key)
+        new_codes = self.generate_copy_codes([act.key for act in activities])
+        new_keys = []
+        for act, new_code in zip(activities, new_codes):
             new_act = act.copy(new_code)
             # Update production exchanges
             for exc in new_act.production():
@@ -122,11 +142,11 @@ class ActivityController(QObject):
                 if product.get('input') == act.key:
                     product['input'] = new_act.key
             new_act.save()
-            AB_metadata.update_metadata(new_act.key)
-            signals.open_activity_tab.emit(new_act.key)
+            new_keys.append(new_act.key)
+        AB_metadata.update_metadata(new_keys)
 
-        db = next(iter(activities)).get("database")
-        bw.databases.set_modified(db)
+        for key in new_keys:
+            signals.open_activity_tab.emit(key)
         signals.database_changed.emit(db)
         signals.databases_changed.emit()
 
@@ -152,10 +172,10 @@ class ActivityController(QObject):
             available_target_dbs, 0, False
         )
         if target_db and ok:
-            new_keys = [self._copy_activity(target_db, act) for act in activities]
+            bw.databases.set_modified(target_db)
+            new_keys = self._copy_activities(target_db, activities)
             if bc.count_database_records(target_db) < 50:
                 bw.databases.clean()
-            bw.databases.set_modified(target_db)
             signals.database_changed.emit(target_db)
             signals.databases_changed.emit()
             for key in new_keys:
@@ -163,22 +183,25 @@ class ActivityController(QObject):
 
     @Slot(str, object, name="copyActivityToDb")
     def duplicate_activity_to_db(self, target_db: str, activity: Activity):
-        new_key = self._copy_activity(target_db, activity)
+        bw.databases.set_modified(target_db)
+        new_key = self._copy_activities(target_db, [activity])[0]
         # only process database immediately if small
         if bc.count_database_records(target_db) < 50:
             bw.databases.clean()
-        bw.databases.set_modified(target_db)
         signals.database_changed.emit(target_db)
         signals.databases_changed.emit()
         signals.open_activity_tab.emit(new_key)
 
     @staticmethod
-    def _copy_activity(target: str, act: Activity) -> tuple:
-        new_code = ActivityController.generate_copy_code((target, act['code']))
-        new_key = (target, new_code)
-        act.copy(code=new_code, database=target)
-        AB_metadata.update_metadata(new_key)
-        return new_key
+    def _copy_activities(target: str, activities: Iterable[Activity]) -> List[tuple]:
+        new_codes = ActivityController.generate_copy_codes(
+            [(target, act['code']) for act in activities]
+        )
+        for act, new_code in zip(activities, new_codes):
+            act.copy(code=new_code, database=target)
+        new_keys = [(target, new_code) for new_code in new_codes]
+        AB_metadata.update_metadata(new_keys)
+        return new_keys
 
     @staticmethod
     @Slot(tuple, str, object, name="modifyActivity")
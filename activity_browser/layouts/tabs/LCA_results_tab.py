@@ -54,6 +54,13 @@ class LCAResultsTab(ABTab):
             name = "{}[Scenarios]".format(cs_name)
         else:
             name = cs_name
+        if name in self.tabs and self.tabs[name].can_update(presamples):
+            # Only the impact categories or reference flow amounts changed,
+            # update the results in place.
+            self.tabs[name].update_results()
+            self.select_tab(self.tabs[name])
+            signals.show_tab.emit("LCA results")
+            return
         self.remove_setup(name)
 
         try:
@@ -9,6 +9,8 @@ import traceback
 from typing import List, Optional, Union
 
 from bw2calc.errors import BW2CalcError
+import brightway2 as bw
+import pandas as pd
 from PySide2.QtWidgets import (
     QWidget, QTabWidget, QVBoxLayout, QHBoxLayout, QScrollArea, QRadioButton,
     QLabel, QLineEdit, QCheckBox, QPushButton, QComboBox, QTableView,
@@ -20,9 +22,11 @@ from stats_arrays.errors import InvalidParamsError
 from ...bwutils import (
     Contributions, MonteCarloLCA, MLCA, PresamplesMLCA,
     PresamplesContributions, SuperstructureContributions,
-    SuperstructureMLCA, GlobalSensitivityAnalysis,
+    SuperstructureMLCA, GlobalSensitivityAnalysis, SharedGraphTraversal,
     commontasks as bc
 )
+from ...bwutils.profiling import profiler
+from ...settings import ab_settings
 from ...signals import signals
 from ...ui.figures import (
     LCAResultsPlot, ContributionPlot, CorrelationPlot, LCAResultsBarChart, MonteCarloPlot
@@ -89,8 +93,10 @@ class LCAResultsSubTab(QTabWidget):
         self.presamples = presamples
         self.mlca: Optional[Union[MLCA, PresamplesMLCA, SuperstructureMLCA]] = None
         self.contributions: Optional[Contributions] = None
-        self.mc: Optional[MonteCarloLCA] = None
+        self._mc: Optional[MonteCarloLCA] = None
         self.method_dict = dict()
+        self.database_timestamps = []
+        self.process_tab_outdated = False
         self.single_func_unit = False
         self.single_method = False
 
@@ -98,13 +104,23 @@ class LCAResultsSubTab(QTabWidget):
         self.setVisible(False)
         self.visible = False
 
-        self.do_calculations()
+        with profiler.stage("Calculations", "LCAResultsSubTab"):
+            self.do_calculations()
+        with profiler.stage("Build tabs", "LCAResultsSubTab"):
+            self._build_tabs()
+        self.setCurrentWidget(self.tabs.results)
+        self.currentChanged.connect(self.generate_content_on_click)
+
+    def _build_tabs(self):
+        """Construct the sub-tabs and have them pull in their data."""
         self.tabs = Tabs(
             inventory=InventoryTab(self),
             results=LCAResultsTab(self),
             ef=ElementaryFlowContributionTab(self),
             process=ProcessContributionsTab(self),
-            sankey=SankeyNavigatorWidget(self.cs_name, parent=self),
+            sankey=SankeyNavigatorWidget(
+                self.cs_name, graph_traversal=self.graph_traversal(), parent=self
+            ),
             mc=MonteCarloTab(self),  # mc=None if self.mc is None else MonteCarloTab(self),
             gsa=GSATab(self),
         )
@@ -118,8 +134,6 @@ class LCAResultsSubTab(QTabWidget):
             gsa="Sensitivity Analysis",
         )
         self.setup_tabs()
-        self.setCurrentWidget(self.tabs.results)
-        self.currentChanged.connect(self.generate_content_on_click)
 
     def do_calculations(self):
         """Perform the MLCA calculation."""
@@ -158,16 +172,74 @@ class LCAResultsSubTab(QTabWidget):
             except KeyError as e:
                 raise BW2CalcError("LCA Failed", str(e)).with_traceback(e.__traceback__)
         self.mlca.calculate()
-        self.mc = MonteCarloLCA(self.cs_name)
-
-        # self.mct = CSMonteCarloLCAThread()
-        # self.mct.start()
-        # self.mct.initialize(self.cs_name)
+        self.database_timestamps = self.mlca.database_timestamps()
 
         self.method_dict = bc.get_LCIA_method_name_dict(self.mlca.methods)
         self.single_func_unit = True if len(self.mlca.func_units) == 1 else False
         self.single_method = True if len(self.mlca.methods) == 1 else False
 
+    def can_update(self, presamples=None) -> bool:
+        """Determine if the results can be updated in place, which is the case
+        if only the impact categories or the amounts of the reference flows
+        in the calculation setup have changed.
+        """
+        if isinstance(presamples, pd.DataFrame) or isinstance(self.presamples, pd.DataFrame):
+            same_scenarios = (
+                isinstance(presamples, pd.DataFrame) and isinstance(self.presamples, pd.DataFrame)
+                and presamples.equals(self.presamples)
+            )
+        else:
+            same_scenarios = presamples == self.presamples
+        cs = bw.calculation_setups.get(self.cs_name)
+        if not cs or not self.mlca.can_rescale(cs["inv"]):
+            return False
+        return all([
+            same_scenarios,
+            cs["inv"] != self.mlca.func_units or cs["ia"] != self.mlca.methods,
+            self.database_timestamps == self.mlca.database_timestamps(),
+        ])
+
+    def update_results(self) -> None:
+        """Update the results in place: changed reference flow amounts are
+        rescaled and only newly added impact categories are calculated.
+        """
+        cs = bw.calculation_setups[self.cs_name]
+        if cs["inv"] != self.mlca.func_units:
+            self.mlca.rescale(cs["inv"])
+        if cs["ia"] != self.mlca.methods:
+            self.mlca.update_methods(cs["ia"])
+        self._mc = None
+        self.method_dict = bc.get_LCIA_method_name_dict(self.mlca.methods)
+        self.single_method = True if len(self.mlca.methods) == 1 else False
+        for tab in (self.tabs.ef, self.tabs.process):
+            tab.combobox_menu.method.blockSignals(True)
+            tab.combobox_menu.method.clear()
+            tab.combobox_menu.method.addItems(list(self.method_dict.keys()))
+            tab.combobox_menu.method.blockSignals(False)
+        self._update_tabs()
+
+    @property
+    def mc(self) -> MonteCarloLCA:
+        """The Monte Carlo LCA is only constructed once it is needed and
+        draws the loaded matrices from the MLCA.
+
+        When the sampled matrices are solved iteratively, the factorized
+        technosphere matrix is shared as well, unless scenarios have altered
+        the matrices of the MLCA.
+        """
+        if self._mc is None:
+            factorized = ab_settings.solver_strategy != "direct" and not self.using_presamples
+            self._mc = MonteCarloLCA(self.cs_name, lca=self.mlca.copy_lca(factorized=factorized))
+        return self._mc
+
+    def graph_traversal(self) -> Optional[SharedGraphTraversal]:
+        """Share the factorized technosphere matrix with the Sankey tab,
+        unless scenarios have altered the matrices of the MLCA.
+        """
+        if self.using_presamples:
+            return None
+        return SharedGraphTraversal(self.mlca)
+
     @property
     def using_presamples(self) -> bool:
         """Used to determine if a Scenario Analysis is performed."""
@@ -186,9 +258,17 @@ class LCAResultsSubTab(QTabWidget):
                     tab.configure_scenario()
 
     def _update_tabs(self):
-        """Update each sub-tab that can be updated."""
+        """Update each sub-tab that can be updated.
+
+        The process contributions require the full system to be solved if
+        the background was pre-aggregated, so that tab is only updated once
+        it is opened.
+        """
         for tab in self.tabs:
-            if tab and hasattr(tab, "update_tab"):
+            if tab is self.tabs.process and not self.mlca.complete \
+                    and self.currentWidget() is not tab:
+                self.process_tab_outdated = True
+            elif tab and hasattr(tab, "update_tab"):
                 tab.update_tab()
         self.tabs.sankey.update_calculation_setup(cs_name=self.cs_name)
 
@@ -207,6 +287,11 @@ class LCAResultsSubTab(QTabWidget):
             if not self.tabs.sankey.has_sankey:
                 print('Generating Sankey Tab')
                 self.tabs.sankey.new_sankey()
+        elif index == self.indexOf(self.tabs.process) and self.process_tab_outdated:
+            self.process_tab_outdated = False
+            self.tabs.process.update_tab()
+        elif index == self.indexOf(self.tabs.mc) and self._mc is None:
+            print('Preparing Monte Carlo LCA for:', self.mc.cs_name)
 
     @QtCore.Slot(name="lciaScenarioExport")
     def generate_lcia_scenario_export(self):
@@ -749,6 +834,7 @@ class ContributionTab(NewAnalysisTab):
         self.plot = ContributionPlot()
         self.table = ContributionTable(self)
         self.contribution_fn = None
+        self.contribution_type = None
         self.has_method, self.has_func = False, False
         self.unit = None
 
@@ -788,6 +874,60 @@ class ContributionTab(NewAnalysisTab):
         self.has_func = has_func
         return menu
 
+    def build_export(self, has_table: bool = True, has_plot: bool = True) -> QHBoxLayout:
+        """Add the export of the contributions of all scenarios if presamples-
+        or scenario-type LCA is performed.
+        """
+        layout = super().build_export(has_table, has_plot)
+        if self.using_presamples:
+            stretch = layout.takeAt(layout.count() - 1)
+            exp_layout = QHBoxLayout()
+            exp_layout.addWidget(QLabel("Export all scenarios:"))
+            for text, extension in ((".csv", ".csv"), ("Excel", ".xlsx")):
+                btn = QPushButton(text)
+                btn.setToolTip(
+                    "Export the top contributions of the selected reference flow and"
+                    " impact category in every scenario as one table"
+                )
+                btn.clicked.connect(
+                    lambda checked=False, ext=extension: self.export_scenario_contributions(ext)
+                )
+                exp_layout.addWidget(btn)
+            layout.addWidget(vertical_line())
+            layout.addLayout(exp_layout)
+            layout.addSpacerItem(stretch)
+        return layout
+
+    def scenario_contributions(self) -> pd.DataFrame:
+        """Return the top contributions of the selected reference flow and
+        impact category in every scenario as a tidy dataframe.
+        """
+        aggregator = self.combobox_menu.agg.currentText()
+        return self.parent.contributions.top_scenario_contributions(
+            self.contribution_type, self.combobox_menu.func.currentText(),
+            self.parent.method_dict[self.combobox_menu.method.currentText()],
+            aggregator=aggregator if aggregator != 'none' else None,
+            limit=self.cutoff_menu.cutoff_value,
+            limit_type=self.cutoff_menu.limit_type, normalize=self.relative
+        )
+
+    @QtCore.Slot(str, name="exportScenarioContributions")
+    def export_scenario_contributions(self, extension: str) -> None:
+        """Store the top contributions of all scenarios in a csv or excel file."""
+        file_filter = self.table.CSV_FILTER if extension == ".csv" else self.table.EXCEL_FILTER
+        filepath = self.table.savefilepath(
+            "{}_scenarios".format(self.table.table_name), file_filter=file_filter
+        )
+        if not filepath:
+            return
+        if not filepath.endswith(extension):
+            filepath += extension
+        df = self.scenario_contributions()
+        if extension == ".csv":
+            df.to_csv(filepath, index=False)
+        else:
+            df.to_excel(filepath, index=False)
+
     def configure_scenario(self):
         """Supplement the superclass method because there are more things to hide in these tabs."""
         super().configure_scenario()
@@ -928,6 +1068,7 @@ class ElementaryFlowContributionTab(ContributionTab):
         self.layout.addLayout(self.build_export(True, True))
 
         self.contribution_fn = 'EF contributions'
+        self.contribution_type = self.parent.contributions.EF
         self.switches.configure(self.has_func, self.has_method)
         self.connect_signals()
         self.toggle_comparisons(self.switches.indexes.func)
@@ -977,6 +1118,7 @@ class ProcessContributionsTab(ContributionTab):
         self.layout.addLayout(self.build_export(True, True))
 
         self.contribution_fn = 'Process contributions'
+        self.contribution_type = self.parent.contributions.ACT
         self.switches.configure(self.has_func, self.has_method)
         self.connect_signals()
         self.toggle_comparisons(self.switches.indexes.func)
@@ -1255,7 +1397,7 @@ class MonteCarloTab(NewAnalysisTab):
         self.scenario_label.setVisible(self.using_presamples)
 
     def update_tab(self):
-        self.update_combobox(self.combobox_methods, [str(m) for m in self.parent.mc.methods])
+        self.update_combobox(self.combobox_methods, [str(m) for m in self.parent.mlca.methods])
         # self.update_combobox(self.combobox_methods, [str(m) for m in self.parent.mct.mc.methods])
 
     def update_mc(self, cs_name=None):
@@ -1303,7 +1445,7 @@ class GSATab(NewAnalysisTab):
         super(GSATab, self).__init__(parent)
         self.parent = parent
 
-        self.GSA = GlobalSensitivityAnalysis(self.parent.mc)
+        self.GSA: Optional[GlobalSensitivityAnalysis] = None
 
         self.layout.addLayout(get_header_layout('Global Sensitivity Analysis'))
         self.scenario_box = None
@@ -1405,7 +1547,7 @@ class GSATab(NewAnalysisTab):
         # self.label_monte_carlo_first.hide()
 
     def update_tab(self):
-        self.update_combobox(self.combobox_methods, [str(m) for m in self.parent.mc.methods])
+        self.update_combobox(self.combobox_methods, [str(m) for m in self.parent.mlca.methods])
         self.update_combobox(self.combobox_fu, list(self.parent.mlca.func_unit_translation_dict.keys()))
 
     def monte_carlo_finished(self):
@@ -1421,6 +1563,10 @@ class GSATab(NewAnalysisTab):
         # print('Calculating GSA for: ', act_number, method_number, cutoff_technosphere, cutoff_biosphere)
 
         try:
+            if self.GSA is None:
+                self.GSA = GlobalSensitivityAnalysis(self.parent.mc)
+            else:
+                self.GSA.update_mc(self.parent.mc)
             self.GSA.perform_GSA(act_number=act_number, method_number=method_number,
                                  cutoff_technosphere=cutoff_technosphere, cutoff_biosphere=cutoff_biosphere)
             # self.update_mc()
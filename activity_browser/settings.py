@@ -8,8 +8,6 @@ from typing import Optional
 import appdirs
 import brightway2 as bw
 
-from .signals import signals
-
 
 class BaseSettings(object):
     """ Base Class for handling JSON settings files.
@@ -57,6 +55,22 @@ class ABSettings(BaseSettings):
     Interface to the json settings file. Will create a userdata directory via appdirs if not
     already present.
     """
+    # Defaults for the optional settings which tune the LCA calculations
+    CALCULATION_DEFAULTS = {
+        "inventory_cache_size": 512,
+        "contribution_storage": "dense",
+        "contribution_top_k": 100,
+        "result_cache_size": 0,
+        "matrix_cache_size": 2048,
+        "calculation_processes": 1,
+        "background_aggregation": False,
+        "background_cache_size": 4096,
+        "solver_strategy": "direct",
+        "low_rank_threshold": 50,
+    }
+    CONTRIBUTION_STORAGE = ("dense", "float32", "top-k")
+    SOLVER_STRATEGIES = ("direct", "bicgstab", "gmres")
+
     def __init__(self, filename: str):
         ab_dir = appdirs.AppDirs("ActivityBrowser", "ActivityBrowser")
         if not os.path.isdir(ab_dir.user_data_dir):
@@ -115,6 +129,162 @@ class ABSettings(BaseSettings):
         """
         self.settings.update({"startup_project": project})
 
+    @property
+    def inventory_cache_size(self) -> int:
+        """ Returns the memory budget (in MB) for keeping characterized
+        inventories and contribution tables of LCA calculations in memory
+        """
+        return self.settings.get(
+            "inventory_cache_size", self.CALCULATION_DEFAULTS["inventory_cache_size"]
+        )
+
+    @inventory_cache_size.setter
+    def inventory_cache_size(self, size: int) -> None:
+        """ Sets the memory budget (in MB) for characterized inventories
+        """
+        self.settings.update({"inventory_cache_size": size})
+
+    @property
+    def contribution_storage(self) -> str:
+        """ Returns how the contribution arrays of LCA calculations are stored,
+        one of 'dense', 'float32' or 'top-k'
+        """
+        storage = self.settings.get(
+            "contribution_storage", self.CALCULATION_DEFAULTS["contribution_storage"]
+        )
+        if storage not in self.CONTRIBUTION_STORAGE:
+            return self.CALCULATION_DEFAULTS["contribution_storage"]
+        return storage
+
+    @contribution_storage.setter
+    def contribution_storage(self, storage: str) -> None:
+        """ Sets how the contribution arrays are stored
+        """
+        self.settings.update({"contribution_storage": storage})
+
+    @property
+    def contribution_top_k(self) -> int:
+        """ Returns the amount of contributions kept per row when the
+        contributions are stored as 'top-k'
+        """
+        return self.settings.get(
+            "contribution_top_k", self.CALCULATION_DEFAULTS["contribution_top_k"]
+        )
+
+    @contribution_top_k.setter
+    def contribution_top_k(self, k: int) -> None:
+        """ Sets the amount of contributions kept per row for 'top-k' storage
+        """
+        self.settings.update({"contribution_top_k": k})
+
+    @property
+    def result_cache_size(self) -> int:
+        """ Returns the size (in MB) of the on-disk cache which holds the
+        results of LCA calculations, 0 disables the cache
+        """
+        return self.settings.get(
+            "result_cache_size", self.CALCULATION_DEFAULTS["result_cache_size"]
+        )
+
+    @result_cache_size.setter
+    def result_cache_size(self, size: int) -> None:
+        """ Sets the size (in MB) of the on-disk result cache
+        """
+        self.settings.update({"result_cache_size": size})
+
+    @property
+    def matrix_cache_size(self) -> int:
+        """ Returns the size (in MB) of the on-disk cache which holds the
+        technosphere and biosphere matrices, 0 disables the cache
+        """
+        return self.settings.get(
+            "matrix_cache_size", self.CALCULATION_DEFAULTS["matrix_cache_size"]
+        )
+
+    @matrix_cache_size.setter
+    def matrix_cache_size(self, size: int) -> None:
+        """ Sets the size (in MB) of the on-disk matrix cache
+        """
+        self.settings.update({"matrix_cache_size": size})
+
+    @property
+    def calculation_processes(self) -> int:
+        """ Returns the amount of worker processes used to calculate the LCA
+        results, 1 performs the calculations in the current process
+        """
+        return self.settings.get(
+            "calculation_processes", self.CALCULATION_DEFAULTS["calculation_processes"]
+        )
+
+    @calculation_processes.setter
+    def calculation_processes(self, processes: int) -> None:
+        """ Sets the amount of worker processes used for LCA calculations
+        """
+        self.settings.update({"calculation_processes": processes})
+
+    @property
+    def background_aggregation(self) -> bool:
+        """ Returns whether background databases are pre-aggregated, so that
+        calculations only solve the foreground system
+        """
+        return self.settings.get(
+            "background_aggregation", self.CALCULATION_DEFAULTS["background_aggregation"]
+        )
+
+    @background_aggregation.setter
+    def background_aggregation(self, aggregate: bool) -> None:
+        """ Sets whether background databases are pre-aggregated
+        """
+        self.settings.update({"background_aggregation": aggregate})
+
+    @property
+    def background_cache_size(self) -> int:
+        """ Returns the size (in MB) of the on-disk store which holds the
+        pre-aggregated background databases
+        """
+        return self.settings.get(
+            "background_cache_size", self.CALCULATION_DEFAULTS["background_cache_size"]
+        )
+
+    @background_cache_size.setter
+    def background_cache_size(self, size: int) -> None:
+        """ Sets the size (in MB) of the on-disk background store
+        """
+        self.settings.update({"background_cache_size": size})
+
+    @property
+    def solver_strategy(self) -> str:
+        """ Returns how altered technosphere matrices of scenarios and Monte Carlo
+        iterations are solved, one of 'direct', 'bicgstab' or 'gmres'
+        """
+        strategy = self.settings.get(
+            "solver_strategy", self.CALCULATION_DEFAULTS["solver_strategy"]
+        )
+        if strategy not in self.SOLVER_STRATEGIES:
+            return self.CALCULATION_DEFAULTS["solver_strategy"]
+        return strategy
+
+    @solver_strategy.setter
+    def solver_strategy(self, strategy: str) -> None:
+        """ Sets how altered technosphere matrices are solved
+        """
+        self.settings.update({"solver_strategy": strategy})
+
+    @property
+    def low_rank_threshold(self) -> int:
+        """ Returns the largest amount of rows or columns in which scenarios may
+        alter the technosphere matrix to be solved with a low-rank update
+        """
+        return self.settings.get(
+            "low_rank_threshold", self.CALCULATION_DEFAULTS["low_rank_threshold"]
+        )
+
+    @low_rank_threshold.setter
+    def low_rank_threshold(self, rank: int) -> None:
+        """ Sets the largest rank of scenario changes solved with a low-rank update
+        """
+        self.settings.update({"low_rank_threshold": rank})
+
     @staticmethod
     def get_default_directory() -> str:
         """ Returns the default brightway application directory
@@ -154,7 +324,6 @@ class ProjectSettings(BaseSettings):
         # on selection of a project (signal?), find the settings file for that project if it exists
         # it can be a custom location, based on ABsettings. So check that, and if not, use default?
         # once found, load the settings or just an empty dict.
-        self.connect_signals()
         super().__init__(bw.projects.dir, filename)
 
         # https://github.com/LCA-ActivityBrowser/activity-browser/issues/235
@@ -165,7 +334,11 @@ class ProjectSettings(BaseSettings):
 
     def connect_signals(self):
         """ Reload the project settings whenever a project switch occurs.
+
+        Called by the `Application`, the settings themselves can be used
+        without the Qt signals.
         """
+        from .signals import signals
         signals.project_selected.connect(self.reset_for_project_selection)
         signals.delete_project.connect(self.reset_for_project_selection)
 
@@ -5,6 +5,7 @@ from PySide2.QtCore import QSize, QUrl, Slot
 
 from ..info import __version__ as ab_version
 from .icons import qicons
+from .widgets import DiagnosticsDialog
 from ..signals import signals
 
 
@@ -98,6 +99,10 @@ class MenuBar(QtWidgets.QMenuBar):
             '&About Qt',
             lambda: QtWidgets.QMessageBox.aboutQt(self.window)
         )
+        self.help_menu.addAction(
+            '&Calculation diagnostics...',
+            self.diagnostics
+        )
         self.help_menu.addAction(
             qicons.issue,
             '&Report an idea/issue on GitHub',
@@ -131,6 +136,10 @@ You should have received a copy of the GNU Lesser General Public License along w
         msgBox.setText(text.format(ab_version))
         msgBox.exec_()
 
+    def diagnostics(self):
+        dialog = DiagnosticsDialog(parent=self.window)
+        dialog.exec_()
+
     def raise_issue_github(self):
         url = QUrl('https://github.com/LCA-ActivityBrowser/activity-browser/issues/new')
         QtGui.QDesktopServices.openUrl(url)
@@ -36,10 +36,12 @@ class SankeyNavigatorWidget(BaseNavigatorWidget):
         os.path.abspath(os.path.dirname(__file__)), '../../static/sankey_navigator.html'
     )
 
-    def __init__(self, cs_name, parent=None):
+    def __init__(self, cs_name, graph_traversal: bw.GraphTraversal = None, parent=None):
         super().__init__(parent)
 
         self.cs = cs_name
+        # Allows the results tab to share its (factorized) LCA matrices.
+        self.graph_traversal = graph_traversal or bw.GraphTraversal()
         self.selected_db = None
         self.has_sankey = False
         self.func_units = []
@@ -183,7 +185,7 @@ class SankeyNavigatorWidget(BaseNavigatorWidget):
         print("Demand / Method: {} {}".format(demand, method))
         start = time.time()
         try:
-            data = bw.GraphTraversal().calculate(demand, method, cutoff=cut_off, max_calc=max_calc)
+            data = self.graph_traversal.calculate(demand, method, cutoff=cut_off, max_calc=max_calc)
         except ValueError as e:
             QtWidgets.QMessageBox.information(None, "Not possible.", str(e))
         print("Completed graph traversal ({:.2g} seconds, {} iterations)".format(time.time() - start, data["counter"]))
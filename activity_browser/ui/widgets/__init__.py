@@ -4,6 +4,7 @@ from .biosphere_update import BiosphereUpdater
 from .comparison_switch import SwitchComboBox
 from .cutoff_menu import CutoffMenu
 from .database_copy import CopyDatabaseDialog
+from .diagnostics import DiagnosticsDialog
 from .dialog import (
     ForceInputDialog, TupleNameDialog, ExcelReadDialog, ChoiceSelectionDialog,
     DatabaseLinkingDialog, DefaultBiosphereDialog
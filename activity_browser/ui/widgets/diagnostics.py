@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+from PySide2 import QtWidgets
+from PySide2.QtCore import Slot
+
+from ...bwutils.profiling import profiler
+
+
+class DiagnosticsDialog(QtWidgets.QDialog):
+    """Shows the wall time and peak memory of the recorded calculation
+    stages, which can be exported as JSON or as a Chrome trace.
+    """
+    COLUMNS = ["Stage", "Category", "Start (s)", "Duration (s)", "Peak memory (MB)"]
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Calculation diagnostics")
+        self.resize(700, 500)
+
+        self.table = QtWidgets.QTableWidget(0, len(self.COLUMNS), self)
+        self.table.setHorizontalHeaderLabels(self.COLUMNS)
+        self.table.setEditTriggers(QtWidgets.QAbstractItemView.NoEditTriggers)
+        self.table.horizontalHeader().setSectionResizeMode(
+            0, QtWidgets.QHeaderView.Stretch
+        )
+        self.trace_memory = QtWidgets.QCheckBox("Trace peak memory (slower calculations)")
+        self.trace_memory.setChecked(profiler.trace_memory)
+        if not profiler.measures_peaks:
+            self.trace_memory.setEnabled(False)
+            self.trace_memory.setToolTip("Measuring the peak memory requires Python 3.9 or later")
+
+        self.refresh_button = QtWidgets.QPushButton("Refresh")
+        self.clear_button = QtWidgets.QPushButton("Clear")
+        self.json_button = QtWidgets.QPushButton("Export JSON")
+        self.trace_button = QtWidgets.QPushButton("Export Chrome trace")
+        self.buttons = QtWidgets.QDialogButtonBox(QtWidgets.QDialogButtonBox.Close)
+
+        button_layout = QtWidgets.QHBoxLayout()
+        button_layout.addWidget(self.refresh_button)
+        button_layout.addWidget(self.clear_button)
+        button_layout.addStretch()
+        button_layout.addWidget(self.json_button)
+        button_layout.addWidget(self.trace_button)
+
+        layout = QtWidgets.QVBoxLayout()
+        layout.addWidget(self.trace_memory)
+        layout.addWidget(self.table)
+        layout.addLayout(button_layout)
+        layout.addWidget(self.buttons)
+        self.setLayout(layout)
+
+        self.trace_memory.toggled.connect(self.toggle_trace_memory)
+        self.refresh_button.clicked.connect(self.sync)
+        self.clear_button.clicked.connect(self.clear)
+        self.json_button.clicked.connect(lambda: self.export(chrome_trace=False))
+        self.trace_button.clicked.connect(lambda: self.export(chrome_trace=True))
+        self.buttons.rejected.connect(self.reject)
+        self.sync()
+
+    @Slot(name="syncTable")
+    def sync(self) -> None:
+        records = profiler.records
+        self.table.setRowCount(len(records))
+        for row, stage in enumerate(records):
+            peak = "" if stage.peak_memory is None else "{:.1f}".format(stage.peak_memory / 1024 ** 2)
+            values = [
+                "    " * stage.depth + stage.name, stage.category,
+                "{:.3f}".format(stage.start), "{:.3f}".format(stage.duration), peak,
+            ]
+            for col, value in enumerate(values):
+                self.table.setItem(row, col, QtWidgets.QTableWidgetItem(value))
+
+    @Slot(name="clearRecords")
+    def clear(self) -> None:
+        profiler.clear()
+        self.sync()
+
+    @Slot(bool, name="toggleTraceMemory")
+    def toggle_trace_memory(self, trace: bool) -> None:
+        profiler.trace_memory = trace
+
+    def export(self, chrome_trace: bool = False) -> None:
+        path, _ = QtWidgets.QFileDialog.getSaveFileName(
+            parent=self, caption="Export calculation diagnostics",
+            filter="JSON (*.json);; All Files (*.*)",
+        )
+        if path:
+            if not path.endswith(".json"):
+                path += ".json"
+            profiler.export(path, chrome_trace=chrome_trace)
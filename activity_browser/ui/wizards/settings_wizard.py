@@ -1,6 +1,7 @@
 # -*- coding: utf-8 -*-
 import brightway2 as bw
 from PySide2 import QtWidgets
+import multiprocessing
 import os
 
 from ...settings import ab_settings
@@ -36,6 +37,38 @@ class SettingsWizard(QtWidgets.QWizard):
             ab_settings.startup_project = new_startup_project
             print("Saved startup project as: ", new_startup_project)
 
+        # calculation
+        if self.field('inventory_cache_size') != ab_settings.inventory_cache_size:
+            ab_settings.inventory_cache_size = self.field('inventory_cache_size')
+            print("Saved inventory cache size as: ", ab_settings.inventory_cache_size)
+        if self.field('contribution_storage') != ab_settings.contribution_storage:
+            ab_settings.contribution_storage = self.field('contribution_storage')
+            print("Saved contribution storage as: ", ab_settings.contribution_storage)
+        if self.field('contribution_top_k') != ab_settings.contribution_top_k:
+            ab_settings.contribution_top_k = self.field('contribution_top_k')
+            print("Saved contribution top-k as: ", ab_settings.contribution_top_k)
+        if self.field('result_cache_size') != ab_settings.result_cache_size:
+            ab_settings.result_cache_size = self.field('result_cache_size')
+            print("Saved result cache size as: ", ab_settings.result_cache_size)
+        if self.field('matrix_cache_size') != ab_settings.matrix_cache_size:
+            ab_settings.matrix_cache_size = self.field('matrix_cache_size')
+            print("Saved matrix cache size as: ", ab_settings.matrix_cache_size)
+        if self.field('calculation_processes') != ab_settings.calculation_processes:
+            ab_settings.calculation_processes = self.field('calculation_processes')
+            print("Saved calculation processes as: ", ab_settings.calculation_processes)
+        if self.field('background_aggregation') != ab_settings.background_aggregation:
+            ab_settings.background_aggregation = self.field('background_aggregation')
+            print("Saved background aggregation as: ", ab_settings.background_aggregation)
+        if self.field('background_cache_size') != ab_settings.background_cache_size:
+            ab_settings.background_cache_size = self.field('background_cache_size')
+            print("Saved background cache size as: ", ab_settings.background_cache_size)
+        if self.field('solver_strategy') != ab_settings.solver_strategy:
+            ab_settings.solver_strategy = self.field('solver_strategy')
+            print("Saved solver strategy as: ", ab_settings.solver_strategy)
+        if self.field('low_rank_threshold') != ab_settings.low_rank_threshold:
+            ab_settings.low_rank_threshold = self.field('low_rank_threshold')
+            print("Saved low-rank threshold as: ", ab_settings.low_rank_threshold)
+
         ab_settings.write_settings()
 
     def cancel(self):
@@ -62,6 +95,105 @@ class SettingsPage(QtWidgets.QWizardPage):
         self.registerField('custom_bw_dir', self.bwdir_edit)
         self.bwdir_browse_button = QtWidgets.QPushButton('Browse')
 
+        self.inventory_cache_spinbox = QtWidgets.QSpinBox()
+        self.inventory_cache_spinbox.setRange(0, 1024 ** 2)
+        self.inventory_cache_spinbox.setSuffix(" MB")
+        self.inventory_cache_spinbox.setValue(ab_settings.inventory_cache_size)
+        self.inventory_cache_spinbox.setToolTip(
+            "Memory used to keep characterized inventories and contribution tables of"
+            " LCA results in memory"
+        )
+        self.registerField('inventory_cache_size', self.inventory_cache_spinbox)
+
+        self.contribution_storage_combobox = QtWidgets.QComboBox()
+        self.contribution_storage_combobox.addItems(ab_settings.CONTRIBUTION_STORAGE)
+        self.contribution_storage_combobox.setCurrentText(ab_settings.contribution_storage)
+        self.contribution_storage_combobox.setToolTip(
+            "'float32' halves the memory of the contribution results, 'top-k' only"
+            " keeps the largest contributions\nof each reference flow and impact"
+            " category, the remainder is kept as a single residual value"
+        )
+        self.registerField(
+            'contribution_storage', self.contribution_storage_combobox, 'currentText'
+        )
+        self.contribution_top_k_spinbox = QtWidgets.QSpinBox()
+        self.contribution_top_k_spinbox.setRange(1, 100000)
+        self.contribution_top_k_spinbox.setValue(ab_settings.contribution_top_k)
+        self.contribution_top_k_spinbox.setEnabled(ab_settings.contribution_storage == "top-k")
+        self.registerField('contribution_top_k', self.contribution_top_k_spinbox)
+
+        self.result_cache_spinbox = QtWidgets.QSpinBox()
+        self.result_cache_spinbox.setRange(0, 1024 ** 2)
+        self.result_cache_spinbox.setSuffix(" MB")
+        self.result_cache_spinbox.setValue(ab_settings.result_cache_size)
+        self.result_cache_spinbox.setToolTip(
+            "Disk space used to store the results of calculation setups in the project,"
+            " set to 0 to disable"
+        )
+        self.registerField('result_cache_size', self.result_cache_spinbox)
+
+        self.matrix_cache_spinbox = QtWidgets.QSpinBox()
+        self.matrix_cache_spinbox.setRange(0, 1024 ** 2)
+        self.matrix_cache_spinbox.setSuffix(" MB")
+        self.matrix_cache_spinbox.setValue(ab_settings.matrix_cache_size)
+        self.matrix_cache_spinbox.setToolTip(
+            "Disk space used to store the technosphere and biosphere matrices of the"
+            " databases in the project,\nset to 0 to disable"
+        )
+        self.registerField('matrix_cache_size', self.matrix_cache_spinbox)
+
+        self.processes_spinbox = QtWidgets.QSpinBox()
+        self.processes_spinbox.setRange(1, os.cpu_count() or 1)
+        self.processes_spinbox.setValue(ab_settings.calculation_processes)
+        self.processes_spinbox.setToolTip(
+            "Amount of worker processes used to calculate reference flows or scenarios"
+            " in parallel,\nonly available on platforms which support forking processes"
+        )
+        self.processes_spinbox.setEnabled("fork" in multiprocessing.get_all_start_methods())
+        self.registerField('calculation_processes', self.processes_spinbox)
+
+        self.background_checkbox = QtWidgets.QCheckBox("Pre-aggregate background databases")
+        self.background_checkbox.setChecked(ab_settings.background_aggregation)
+        self.background_checkbox.setToolTip(
+            "Store the cumulative inventory of databases which do not contain reference flows,"
+            "\nso calculations only solve the foreground system. Process contributions"
+            " require a full calculation."
+        )
+        self.registerField('background_aggregation', self.background_checkbox)
+
+        self.background_cache_spinbox = QtWidgets.QSpinBox()
+        self.background_cache_spinbox.setRange(0, 1024 ** 2)
+        self.background_cache_spinbox.setSuffix(" MB")
+        self.background_cache_spinbox.setValue(ab_settings.background_cache_size)
+        self.background_cache_spinbox.setEnabled(ab_settings.background_aggregation)
+        self.background_cache_spinbox.setToolTip(
+            "Disk space used to store the pre-aggregated background databases of the project,"
+            "\nthe least recently used backgrounds are removed first"
+        )
+        self.registerField('background_cache_size', self.background_cache_spinbox)
+
+        self.solver_strategy_combobox = QtWidgets.QComboBox()
+        self.solver_strategy_combobox.addItems(ab_settings.SOLVER_STRATEGIES)
+        self.solver_strategy_combobox.setCurrentText(ab_settings.solver_strategy)
+        self.solver_strategy_combobox.setToolTip(
+            "How the altered technosphere matrices of scenarios and Monte Carlo iterations"
+            " are solved,\n'bicgstab' and 'gmres' solve iteratively, starting from the"
+            " previous solution, instead of factorizing every matrix"
+        )
+        self.registerField(
+            'solver_strategy', self.solver_strategy_combobox, 'currentText'
+        )
+
+        self.low_rank_spinbox = QtWidgets.QSpinBox()
+        self.low_rank_spinbox.setRange(0, 10000)
+        self.low_rank_spinbox.setValue(ab_settings.low_rank_threshold)
+        self.low_rank_spinbox.setToolTip(
+            "Scenarios which alter at most this many rows or columns of the technosphere"
+            " matrix are solved\nwith a low-rank update of the first factorization instead"
+            " of factorizing the matrix again"
+        )
+        self.registerField('low_rank_threshold', self.low_rank_spinbox)
+
         self.restore_defaults_button = QtWidgets.QPushButton('Restore defaults')
 
         # Startup options
@@ -75,8 +207,33 @@ class SettingsPage(QtWidgets.QWizardPage):
 
         self.startup_groupbox.setLayout(self.startup_layout)
 
+        # Calculation options
+        self.calculation_groupbox = QtWidgets.QGroupBox('Calculation Options')
+        self.calculation_layout = QtWidgets.QGridLayout()
+        self.calculation_layout.addWidget(QtWidgets.QLabel('Inventory cache: '), 0, 0)
+        self.calculation_layout.addWidget(self.inventory_cache_spinbox, 0, 1)
+        self.calculation_layout.addWidget(QtWidgets.QLabel('Contribution storage: '), 1, 0)
+        self.calculation_layout.addWidget(self.contribution_storage_combobox, 1, 1)
+        self.calculation_layout.addWidget(QtWidgets.QLabel('Contributions kept (top-k): '), 2, 0)
+        self.calculation_layout.addWidget(self.contribution_top_k_spinbox, 2, 1)
+        self.calculation_layout.addWidget(QtWidgets.QLabel('Result cache: '), 3, 0)
+        self.calculation_layout.addWidget(self.result_cache_spinbox, 3, 1)
+        self.calculation_layout.addWidget(QtWidgets.QLabel('Matrix cache: '), 4, 0)
+        self.calculation_layout.addWidget(self.matrix_cache_spinbox, 4, 1)
+        self.calculation_layout.addWidget(QtWidgets.QLabel('Calculation processes: '), 5, 0)
+        self.calculation_layout.addWidget(self.processes_spinbox, 5, 1)
+        self.calculation_layout.addWidget(QtWidgets.QLabel('Solver strategy: '), 6, 0)
+        self.calculation_layout.addWidget(self.solver_strategy_combobox, 6, 1)
+        self.calculation_layout.addWidget(QtWidgets.QLabel('Low-rank update limit: '), 7, 0)
+        self.calculation_layout.addWidget(self.low_rank_spinbox, 7, 1)
+        self.calculation_layout.addWidget(self.background_checkbox, 8, 0, 1, 2)
+        self.calculation_layout.addWidget(QtWidgets.QLabel('Background cache: '), 9, 0)
+        self.calculation_layout.addWidget(self.background_cache_spinbox, 9, 1)
+        self.calculation_groupbox.setLayout(self.calculation_layout)
+
         self.layout = QtWidgets.QVBoxLayout()
         self.layout.addWidget(self.startup_groupbox)
+        self.layout.addWidget(self.calculation_groupbox)
         self.layout.addStretch()
         self.layout.addWidget(self.restore_defaults_button)
         self.setLayout(self.layout)
@@ -88,11 +245,55 @@ class SettingsPage(QtWidgets.QWizardPage):
         self.startup_project_combobox.currentIndexChanged.connect(self.changed)
         self.bwdir_browse_button.clicked.connect(self.bwdir_browse)
         self.bwdir_edit.textChanged.connect(self.changed)
+        self.inventory_cache_spinbox.valueChanged.connect(self.changed)
+        self.contribution_storage_combobox.currentIndexChanged.connect(self.changed)
+        self.contribution_storage_combobox.currentTextChanged.connect(
+            lambda text: self.contribution_top_k_spinbox.setEnabled(text == "top-k")
+        )
+        self.contribution_top_k_spinbox.valueChanged.connect(self.changed)
+        self.result_cache_spinbox.valueChanged.connect(self.changed)
+        self.matrix_cache_spinbox.valueChanged.connect(self.changed)
+        self.processes_spinbox.valueChanged.connect(self.changed)
+        self.background_checkbox.toggled.connect(self.changed)
+        self.background_checkbox.toggled.connect(self.background_cache_spinbox.setEnabled)
+        self.background_cache_spinbox.valueChanged.connect(self.changed)
+        self.solver_strategy_combobox.currentIndexChanged.connect(self.changed)
+        self.low_rank_spinbox.valueChanged.connect(self.changed)
         self.restore_defaults_button.clicked.connect(self.restore_defaults)
 
     def restore_defaults(self):
         self.change_bw_dir(ab_settings.get_default_directory())
         self.startup_project_combobox.setCurrentText(ab_settings.get_default_project_name())
+        self.inventory_cache_spinbox.setValue(
+            ab_settings.CALCULATION_DEFAULTS["inventory_cache_size"]
+        )
+        self.contribution_storage_combobox.setCurrentText(
+            ab_settings.CALCULATION_DEFAULTS["contribution_storage"]
+        )
+        self.contribution_top_k_spinbox.setValue(
+            ab_settings.CALCULATION_DEFAULTS["contribution_top_k"]
+        )
+        self.result_cache_spinbox.setValue(
+            ab_settings.CALCULATION_DEFAULTS["result_cache_size"]
+        )
+        self.matrix_cache_spinbox.setValue(
+            ab_settings.CALCULATION_DEFAULTS["matrix_cache_size"]
+        )
+        self.processes_spinbox.setValue(
+            ab_settings.CALCULATION_DEFAULTS["calculation_processes"]
+        )
+        self.background_checkbox.setChecked(
+            ab_settings.CALCULATION_DEFAULTS["background_aggregation"]
+        )
+        self.background_cache_spinbox.setValue(
+            ab_settings.CALCULATION_DEFAULTS["background_cache_size"]
+        )
+        self.solver_strategy_combobox.setCurrentText(
+            ab_settings.CALCULATION_DEFAULTS["solver_strategy"]
+        )
+        self.low_rank_spinbox.setValue(
+            ab_settings.CALCULATION_DEFAULTS["low_rank_threshold"]
+        )
 
     def bwdir_browse(self):
         path = QtWidgets.QFileDialog.getExistingDirectory(
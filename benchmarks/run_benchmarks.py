@@ -0,0 +1,171 @@
+# -*- coding: utf-8 -*-
+"""Benchmark the calculation engine on synthetic databases.
+
+Every benchmark is timed on synthetic databases of each of the given sizes,
+built in a temporary brightway project. The results are written as JSON,
+which can be used as a baseline for later runs:
+
+    python benchmarks/run_benchmarks.py --output baseline.json
+    python benchmarks/run_benchmarks.py --compare baseline.json
+
+When comparing, the script exits with a non-zero status if any benchmark is
+slower than the baseline by more than the given tolerance.
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import time
+
+import brightway2 as bw
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from activity_browser.bwutils import (  # noqa: E402
+    Contributions, MLCA, MonteCarloLCA, SuperstructureMLCA
+)
+from activity_browser.bwutils.metadata import MetaDataStore  # noqa: E402
+from activity_browser.settings import ab_settings  # noqa: E402
+
+from synthetic import BIOSPHERE, METHODS, build_project  # noqa: E402
+
+SIZES = [1000, 10000, 20000]
+
+
+def bench_mlca(data: dict) -> None:
+    MLCA(data["setup"]).calculate()
+
+
+def bench_top_process_contributions(data: dict) -> None:
+    data["contributions"].top_process_contributions(method=METHODS[0], limit=5)
+
+
+def bench_monte_carlo(data: dict) -> None:
+    MonteCarloLCA(data["setup"]).calculate(iterations=10, seed=42)
+
+
+def bench_superstructure_mlca(data: dict) -> None:
+    SuperstructureMLCA(data["setup"], data["scenarios"]).calculate()
+
+
+def bench_add_metadata(data: dict) -> None:
+    MetaDataStore().add_metadata(data["databases"])
+
+
+BENCHMARKS = {
+    "MLCA": bench_mlca,
+    "Contributions.top_process_contributions": bench_top_process_contributions,
+    "MonteCarloLCA.calculate": bench_monte_carlo,
+    "SuperstructureMLCA": bench_superstructure_mlca,
+    "MetaDataStore.add_metadata": bench_add_metadata,
+}
+
+
+def measure(func, data: dict, repeat: int) -> dict:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(data)
+        timings.append(time.perf_counter() - start)
+    return {"min": min(timings), "median": statistics.median(timings)}
+
+
+def run(sizes: list, repeat: int, selected: list) -> dict:
+    """Build a synthetic project for every size and time the benchmarks."""
+    # Never load results from the result cache and always run serially.
+    ab_settings.settings["result_cache_size"] = 0
+    ab_settings.settings["calculation_processes"] = 1
+    bw.config.dont_warn = True
+    tempdir = bw.projects._use_temp_directory()
+    original_biosphere = bw.config.biosphere
+    bw.config.biosphere = BIOSPHERE
+    results = {}
+    try:
+        for size in sizes:
+            bw.projects.set_current("benchmark {}".format(size))
+            start = time.perf_counter()
+            data = build_project(size)
+            print("Built synthetic project with {} activities in {:.1f} seconds".format(
+                size, time.perf_counter() - start
+            ))
+            mlca = MLCA(data["setup"])
+            mlca.calculate()
+            data["contributions"] = Contributions(mlca)
+
+            results[str(size)] = {}
+            for name in selected:
+                timing = measure(BENCHMARKS[name], data, repeat)
+                results[str(size)][name] = timing
+                print("  {:<45} {:>10.4f} s".format(name, timing["min"]))
+    finally:
+        bw.config.biosphere = original_biosphere
+        bw.projects._restore_orig_directory()
+        shutil.rmtree(tempdir, ignore_errors=True)
+    return {
+        "meta": {
+            "date": datetime.datetime.now().isoformat(),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "repeat": repeat,
+        },
+        "results": results,
+    }
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list:
+    """Return the benchmarks which are slower than the baseline."""
+    regressions = []
+    for size, timings in results["results"].items():
+        for name, timing in timings.items():
+            base = baseline.get("results", {}).get(size, {}).get(name)
+            if base is None:
+                continue
+            ratio = timing["min"] / base["min"] if base["min"] else 1.0
+            if ratio > 1 + tolerance:
+                regressions.append((size, name, base["min"], timing["min"], ratio))
+    return regressions
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=SIZES,
+        help="Amount of activities in the synthetic databases"
+    )
+    parser.add_argument("--repeat", type=int, default=3, help="Repetitions per benchmark")
+    parser.add_argument(
+        "--benchmarks", nargs="+", choices=list(BENCHMARKS), default=list(BENCHMARKS),
+        help="Benchmarks to run, all by default"
+    )
+    parser.add_argument("--output", help="Write the results to this JSON file")
+    parser.add_argument("--compare", help="Compare the results against this baseline")
+    parser.add_argument(
+        "--tolerance", type=float, default=0.25,
+        help="Allowed relative slowdown compared to the baseline"
+    )
+    args = parser.parse_args(argv)
+
+    results = run(args.sizes, args.repeat, args.benchmarks)
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(results, file, indent=2)
+    if args.compare:
+        with open(args.compare) as file:
+            baseline = json.load(file)
+        regressions = compare(results, baseline, args.tolerance)
+        for size, name, base, new, ratio in regressions:
+            print("REGRESSION {} ({} activities): {:.4f} s -> {:.4f} s ({:.0%})".format(
+                name, size, base, new, ratio - 1
+            ))
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+"""Generate synthetic brightway databases, methods, calculation setups and
+scenario data of a configurable size for the benchmarks.
+
+The technosphere is built as a lower-triangular system where every activity
+only takes inputs from activities with a lower index, which guarantees the
+technosphere matrix can be solved regardless of the random amounts.
+"""
+import brightway2 as bw
+import numpy as np
+import pandas as pd
+
+TECHNOSPHERE = "synthetic technosphere"
+BIOSPHERE = "synthetic biosphere"
+METHODS = [("synthetic", "method {}".format(i)) for i in range(3)]
+SETUP = "synthetic setup"
+
+
+def write_biosphere(flows: int) -> list:
+    data = {
+        (BIOSPHERE, "flow {}".format(i)): {
+            "name": "flow {}".format(i), "unit": "kilogram", "type": "emission",
+            "categories": ("air",),
+        }
+        for i in range(flows)
+    }
+    bw.Database(BIOSPHERE).write(data)
+    return list(data)
+
+
+def write_technosphere(activities: int, flows: list, inputs: int = 5,
+                       emissions: int = 3, seed: int = 42) -> list:
+    rng = np.random.RandomState(seed)
+    keys = [(TECHNOSPHERE, "activity {}".format(i)) for i in range(activities)]
+    data = {}
+    for i, key in enumerate(keys):
+        exchanges = [{"input": key, "amount": 1, "type": "production"}]
+        if i > 0:
+            for j in rng.choice(i, size=min(inputs, i), replace=False):
+                exchanges.append({
+                    "input": keys[j], "amount": float(rng.uniform(0.01, 0.1)),
+                    "type": "technosphere",
+                })
+        for j in rng.choice(len(flows), size=min(emissions, len(flows)), replace=False):
+            exchanges.append({
+                "input": flows[j], "amount": float(rng.uniform(0.1, 10)),
+                "type": "biosphere",
+            })
+        data[key] = {
+            "name": "activity {}".format(i), "reference product": "product {}".format(i),
+            "unit": "kilogram", "location": "GLO", "type": "process",
+            "exchanges": exchanges,
+        }
+    bw.Database(TECHNOSPHERE).write(data)
+    return keys
+
+
+def write_methods(flows: list, seed: int = 42) -> list:
+    rng = np.random.RandomState(seed)
+    for method in METHODS:
+        bw.Method(method).write([(flow, float(rng.uniform(0, 100))) for flow in flows])
+    return METHODS
+
+
+def write_calculation_setup(keys: list, reference_flows: int = 10) -> str:
+    """Use the last (most connected) activities as reference flows."""
+    bw.calculation_setups[SETUP] = {
+        "inv": [{key: 1} for key in keys[-reference_flows:]],
+        "ia": list(METHODS),
+    }
+    return SETUP
+
+
+def scenario_dataframe(keys: list, exchanges: int = 50, scenarios: int = 3,
+                       seed: int = 42) -> pd.DataFrame:
+    """Build a superstructure dataframe which alters the production amount
+    of a number of activities in each scenario.
+    """
+    rng = np.random.RandomState(seed)
+    selected = rng.choice(len(keys), size=min(exchanges, len(keys)), replace=False)
+    index = pd.MultiIndex.from_tuples(
+        [(keys[i], keys[i]) for i in selected], names=["input", "output"]
+    )
+    return pd.DataFrame(
+        rng.uniform(0.8, 1.2, size=(len(index), scenarios)), index=index,
+        columns=["scenario {}".format(i) for i in range(scenarios)],
+    )
+
+
+def build_project(activities: int, flows: int = None) -> dict:
+    """Write all of the synthetic data to the current project and return
+    the names required by the benchmarks.
+    """
+    flows = write_biosphere(flows or max(100, activities // 10))
+    keys = write_technosphere(activities, flows)
+    write_methods(flows)
+    return {
+        "setup": write_calculation_setup(keys),
+        "databases": [TECHNOSPHERE, BIOSPHERE],
+        "scenarios": scenario_dataframe(keys),
+    }
@@ -0,0 +1,7 @@
+# -*- coding: utf-8 -*-
+import sys
+
+from activity_browser.batch import main
+
+
+sys.exit(main())
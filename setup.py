@@ -26,12 +26,14 @@ setup(
     author_email="b.steubing@cml.leidenuniv.nl",
     license=open('LICENSE.txt').read(),
     install_requires=[], # dependency management in conda recipe
+    extras_require={'batch': ['pyarrow']},
     url="https://github.com/LCA-ActivityBrowser/activity-browser",
     long_description=open('README.md').read(),
     description='A graphical user interface for brightway2',
     entry_points={
         'console_scripts': [
             'activity-browser = activity_browser.app:run_activity_browser',
+            'activity-browser-batch = activity_browser.batch:main',
         ]
     },
     classifiers=[
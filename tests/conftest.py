@@ -5,6 +5,7 @@ import brightway2 as bw
 import pytest
 
 from activity_browser import Application
+from activity_browser.bwutils.result_cache import result_cache
 
 
 @pytest.fixture(scope='session')
@@ -54,3 +55,66 @@ def bw2test():
     if "pytest_project" in bw.projects:
         bw.projects.set_current("pytest_project", update=False)
     shutil.rmtree(tempdir)
+
+
+@pytest.fixture
+def calculation_setup(bw2test):
+    """ Construct a very small technosphere and biosphere with two methods
+    and a calculation setup that uses all of them.
+    """
+    bw.Database("biosphere3").write({
+        ("biosphere3", "co2"): {
+            "name": "carbon dioxide", "unit": "kilogram", "type": "emission",
+            "categories": ("air",),
+        },
+        ("biosphere3", "ch4"): {
+            "name": "methane", "unit": "kilogram", "type": "emission",
+            "categories": ("air",),
+        },
+    })
+    bw.Database("testdb").write({
+        ("testdb", "a"): {
+            "name": "process a", "reference product": "a", "unit": "kilogram",
+            "location": "GLO", "type": "process",
+            "exchanges": [
+                {"input": ("testdb", "a"), "amount": 1, "type": "production"},
+                {"input": ("testdb", "b"), "amount": 2, "type": "technosphere"},
+                {"input": ("biosphere3", "co2"), "amount": 1, "type": "biosphere"},
+            ],
+        },
+        ("testdb", "b"): {
+            "name": "process b", "reference product": "b", "unit": "kilogram",
+            "location": "GLO", "type": "process",
+            "exchanges": [
+                {"input": ("testdb", "b"), "amount": 1, "type": "production"},
+                {"input": ("biosphere3", "co2"), "amount": 0.5, "type": "biosphere"},
+                {"input": ("biosphere3", "ch4"), "amount": 0.1, "type": "biosphere"},
+            ],
+        },
+        ("testdb", "c"): {
+            "name": "process c", "reference product": "c", "unit": "kilogram",
+            "location": "NL", "type": "process",
+            "exchanges": [
+                {"input": ("testdb", "c"), "amount": 1, "type": "production"},
+                {"input": ("testdb", "a"), "amount": 0.5, "type": "technosphere"},
+                {"input": ("biosphere3", "ch4"), "amount": 1, "type": "biosphere"},
+            ],
+        },
+    })
+    bw.Method(("test", "gwp")).write([
+        (("biosphere3", "co2"), 1), (("biosphere3", "ch4"), 28),
+    ])
+    bw.Method(("test", "methane")).write([(("biosphere3", "ch4"), 1)])
+    bw.calculation_setups["test_cs"] = {
+        "inv": [{("testdb", "a"): 1}, {("testdb", "c"): 2}],
+        "ia": [("test", "gwp"), ("test", "methane")],
+    }
+    return "test_cs"
+
+
+@pytest.fixture()
+def no_result_cache(monkeypatch):
+    """ Disable the result cache, so calculations are always performed
+    instead of being loaded from an earlier test.
+    """
+    monkeypatch.setattr(type(result_cache), "max_size", 0)
@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+import os
+
+import brightway2 as bw
+import numpy as np
+
+from activity_browser.bwutils import Contributions, MLCA
+from activity_browser.bwutils.background import background_store
+from activity_browser.settings import ab_settings
+
+
+def test_mlca_background_aggregation(calculation_setup, monkeypatch, no_result_cache):
+    """ Solving only the foreground system against a pre-aggregated
+    background gives the same results as solving the full system.
+    """
+    bw.Database("foreground").write({
+        ("foreground", "f"): {
+            "name": "process f", "reference product": "f", "unit": "kilogram",
+            "location": "GLO", "type": "process",
+            "exchanges": [
+                {"input": ("foreground", "f"), "amount": 1, "type": "production"},
+                {"input": ("testdb", "a"), "amount": 2, "type": "technosphere"},
+                {"input": ("testdb", "c"), "amount": 0.5, "type": "technosphere"},
+                {"input": ("biosphere3", "co2"), "amount": 0.3, "type": "biosphere"},
+            ],
+        },
+    })
+    bw.calculation_setups["foreground_cs"] = {
+        "inv": [{("foreground", "f"): 2}],
+        "ia": [("test", "gwp"), ("test", "methane")],
+    }
+    full = MLCA("foreground_cs")
+    full.calculate()
+
+    monkeypatch.setattr(type(ab_settings), "background_aggregation", True)
+    mlca = MLCA("foreground_cs")
+    mlca.calculate()
+    assert not mlca.complete
+    assert np.allclose(mlca.lca_scores, full.lca_scores)
+    assert np.allclose(mlca.elementary_flow_contributions, full.elementary_flow_contributions)
+
+    # Elementary flow contributions do not need the full system.
+    contributions = Contributions(mlca)
+    contributions.top_elementary_flow_contributions(method=("test", "gwp"))
+    contributions.top_elementary_flow_contributions(functional_unit=mlca.func_key_list[0])
+    contributions.inventory_df("biosphere")
+    assert mlca._pending_results
+    assert np.allclose(
+        contributions.get_contributions("elementary_flow", method=("test", "gwp")),
+        Contributions(full).get_contributions("elementary_flow", method=("test", "gwp"))
+    )
+    assert not mlca.complete
+
+    assert np.allclose(mlca.process_contributions, full.process_contributions)
+    assert mlca.complete
+
+
+def test_background_store_eviction(bw2test, monkeypatch):
+    """ The least recently used backgrounds are removed when the store grows
+    beyond its size, the background in use is kept.
+    """
+    monkeypatch.setattr(type(background_store), "max_size", 1500)
+    background_store.directory.mkdir()
+    entries = []
+    for i, name in enumerate(("in_use", "old", "new")):
+        path = background_store.directory / name
+        path.mkdir()
+        np.save(path / "cumulative", np.zeros(64))
+        os.utime(path, (i, i))
+        entries.append(path)
+    background_store.evict(keep=entries[0])
+    assert [p.is_dir() for p in entries] == [True, False, True]
+    background_store.clear()
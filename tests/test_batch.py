@@ -0,0 +1,37 @@
+# -*- coding: utf-8 -*-
+import sys
+
+import brightway2 as bw
+import numpy as np
+import pandas as pd
+import pytest
+
+from activity_browser.batch import check_format, default_format, main, run_setup
+from activity_browser.bwutils import MLCA
+
+
+def test_batch_run_setup(calculation_setup, tmp_path):
+    """ The headless runner writes tidy score and contribution files. """
+    run_setup(bw.projects.current, calculation_setup, str(tmp_path), fmt="csv", limit=1)
+    directory = tmp_path / calculation_setup
+    scores = pd.read_csv(directory / "scores.csv")
+    assert len(scores) == 4
+    assert list(scores.columns) == ["reference flow", "method", "scenario", "score"]
+    mlca = MLCA(calculation_setup)
+    mlca.calculate()
+    assert np.allclose(np.sort(scores["score"]), np.sort(mlca.lca_scores.ravel()))
+    contributions = pd.read_csv(directory / "process_contributions.csv")
+    assert len(contributions) <= 4
+
+
+def test_batch_format_check(monkeypatch):
+    """ Columnar formats are refused before calculating when pyarrow is not
+    available, the results are then written as csv by default.
+    """
+    monkeypatch.setitem(sys.modules, "pyarrow", None)
+    assert default_format() == "csv"
+    check_format("csv")
+    with pytest.raises(ValueError):
+        check_format("parquet")
+    with pytest.raises(SystemExit):
+        main(["--project", "unused", "--format", "feather"])
@@ -0,0 +1,118 @@
+# -*- coding: utf-8 -*-
+import brightway2 as bw
+import numpy as np
+import pandas as pd
+import pytest
+
+from activity_browser.bwutils import (
+    Contributions, MLCA, SuperstructureContributions, SuperstructureMLCA,
+)
+from activity_browser.bwutils.metadata import AB_metadata
+
+
+def test_top_contributions():
+    """ The top contributions of all columns are selected at once, items
+    outside of the top of a column are NaN.
+    """
+    C = np.array([[4., -1., 2., 0.5], [0., 3., -5., 1.]])
+    index = {("m", "1"): 0, ("m", "2"): 1}
+    rev_index = {i: ("db", str(i)) for i in range(4)}
+    df = Contributions._build_top_contributions(
+        C, index, rev_index, limit=2, limit_type="number", residual=np.array([1., 0.])
+    )
+    assert list(df.index) == [("Total", ""), ("Rest", ""), ("db", "0"), ("db", "2"), ("db", "1")]
+    assert np.allclose(df[("m", "1")], [6.5, 0.5, 4, 2, np.nan], equal_nan=True)
+    assert np.allclose(df[("m", "2")], [-1, 1, np.nan, -5, 3], equal_nan=True)
+
+    # 'percent' keeps the items of at least the given share of the total.
+    top, selected = Contributions._top_indices(C, 0.4, "percent")
+    assert [list(t[s]) for t, s in zip(top, selected)] == [[0], []]
+    with pytest.raises(ValueError):
+        Contributions._top_indices(C, 5, "percent")
+
+
+def test_contribution_labels(calculation_setup):
+    """ Labels are built from the metadata once and rebuilt when the metadata
+    changes.
+    """
+    AB_metadata.reset_metadata()
+    AB_metadata.add_metadata(["testdb"])
+    keys = [("testdb", "a"), "Total", ("unknown", "key"), ("Rest", "")]
+    assert Contributions.get_labels(keys) == [
+        "process a | a | GLO | testdb", "Total", "unknown | key", "Rest"
+    ]
+    assert Contributions.get_labels(keys[:1], fields=["name", "location"], separator=", ") == [
+        "process a, GLO"
+    ]
+
+    act = bw.get_activity(("testdb", "a"))
+    act["name"] = "renamed a"
+    act.save()
+    AB_metadata.update_metadata(act.key)
+    assert Contributions.get_labels(keys[:1]) == ["renamed a | a | GLO | testdb"]
+    AB_metadata.reset_metadata()
+
+
+def test_aggregate_by_parameters(calculation_setup, no_result_cache):
+    """ Contributions are aggregated with an indicator matrix which is built
+    once per aggregation parameter.
+    """
+    mlca = MLCA(calculation_setup)
+    mlca.calculate()
+    contributions = Contributions(mlca)
+    C = contributions.get_contributions("process", method=("test", "gwp"))
+    aggregated, mask_index, _ = contributions.aggregate_by_parameters(
+        C, "technosphere", "location"
+    )
+    assert list(mask_index.values()) == ["GLO", "NL"]
+    locations = np.array([
+        bw.get_activity(mlca.rev_activity_dict[i])["location"] for i in range(C.shape[1])
+    ])
+    expected = np.column_stack([C[:, locations == loc].sum(axis=1) for loc in ("GLO", "NL")])
+    assert np.allclose(aggregated, expected)
+    matrix, _ = contributions._aggregation_matrix("technosphere", "location")
+    assert contributions._aggregation_matrix("technosphere", "location")[0] is matrix
+
+
+def test_top_contributions_cache(calculation_setup, monkeypatch, no_result_cache):
+    """ Top contribution tables are kept until the MLCA is recalculated."""
+    mlca = MLCA(calculation_setup)
+    mlca.calculate()
+    contributions = Contributions(mlca)
+    df = contributions.top_process_contributions(method=("test", "gwp"), limit=2)
+
+    def fail(*args, **kwargs):
+        raise AssertionError("Top contributions should be cached")
+    with monkeypatch.context() as m:
+        m.setattr(contributions, "_build_top_contributions", fail)
+        cached = contributions.top_process_contributions(method=("test", "gwp"), limit=2)
+        pd.testing.assert_frame_equal(df, cached)
+        with pytest.raises(AssertionError):
+            contributions.top_process_contributions(method=("test", "gwp"), limit=3)
+        mlca.calculate()
+        with pytest.raises(AssertionError):
+            contributions.top_process_contributions(method=("test", "gwp"), limit=2)
+
+
+def test_top_scenario_contributions(calculation_setup, no_result_cache):
+    """ The top contributions of all scenarios are returned as one tidy
+    dataframe.
+    """
+    df = pd.DataFrame(
+        {"low": [2.0], "high": [4.0]},
+        index=pd.MultiIndex.from_tuples([(("testdb", "b"), ("testdb", "a"))]),
+    )
+    mlca = SuperstructureMLCA(calculation_setup, df)
+    mlca.calculate()
+    contributions = SuperstructureContributions(mlca)
+    fu = mlca.func_key_list[0]
+    tidy = contributions.top_scenario_contributions(
+        contributions.ACT, fu, ("test", "gwp"), limit=5
+    )
+    assert {"scenario", "amount"} <= set(tidy.columns)
+    assert set(tidy["scenario"]) == {"low", "high"}
+    assert not tidy["amount"].isna().any()
+    totals = tidy[tidy["index"] == "Total"].set_index("scenario")["amount"]
+    assert np.allclose(totals[["low", "high"]], mlca.lca_scores[0, 0, :])
+    with pytest.raises(ValueError):
+        contributions.top_scenario_contributions("unknown", fu, ("test", "gwp"))
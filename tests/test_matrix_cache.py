@@ -0,0 +1,27 @@
+# -*- coding: utf-8 -*-
+import brightway2 as bw
+import numpy as np
+
+from activity_browser.bwutils import MLCA
+from activity_browser.bwutils.matrix_cache import matrix_cache
+
+
+def test_matrix_cache(calculation_setup, monkeypatch, no_result_cache):
+    """ Matrices are built once and loaded from the cache afterwards, until
+    one of the databases is modified.
+    """
+    monkeypatch.setattr(type(matrix_cache), "max_size", 1024 ** 3)
+    mlca = MLCA(calculation_setup)
+    assert len(list(matrix_cache.directory.iterdir())) == 1
+    cached = MLCA(calculation_setup)
+    assert (cached.lca.technosphere_matrix != mlca.lca.technosphere_matrix).nnz == 0
+    assert (cached.lca.biosphere_matrix != mlca.lca.biosphere_matrix).nnz == 0
+    assert cached.lca.product_dict == mlca.lca.product_dict
+    mlca.calculate()
+    cached.calculate()
+    assert np.allclose(cached.lca_scores, mlca.lca_scores)
+
+    key = matrix_cache.key(mlca.lca.database_filepath)
+    bw.databases["testdb"]["modified"] = "2000-01-01T00:00:00"
+    bw.databases.flush()
+    assert matrix_cache.key(mlca.lca.database_filepath) != key
@@ -0,0 +1,197 @@
+# -*- coding: utf-8 -*-
+import pickle
+
+import brightway2 as bw
+import pandas as pd
+import pytest
+
+from activity_browser.bwutils.metadata import AB_metadata, MetaDataStore
+from activity_browser.controllers.activity import ActivityController
+
+
+def test_add_metadata(calculation_setup):
+    """ Metadata is read from the activity table, with only the selected
+    fields of the activity data and empty strings for missing values.
+    """
+    AB_metadata.reset_metadata()
+    AB_metadata.add_metadata(["testdb", "biosphere3"])
+    df = AB_metadata.dataframe
+    assert set(AB_metadata.DATA_FIELDS) | set(AB_metadata.COLUMNS.values()) | {"key"} == set(df.columns)
+    assert df.loc[("testdb", "c"), "location"] == "NL"
+    assert df.loc[("testdb", "c"), "key"] == ("testdb", "c")
+    assert df.loc[("biosphere3", "co2"), "categories"] == ("air",)
+    assert df.loc[("biosphere3", "co2"), "reference product"] == ""
+    assert not df.isna().any().any()
+
+    act = bw.Database("testdb").new_activity(
+        "d", name="process d", unit="kilogram", location="DE", type="process"
+    )
+    act.save()
+    AB_metadata.update_metadata(act.key)
+    assert AB_metadata.dataframe.loc[act.key, "unit"] == "kilogram"
+    assert AB_metadata.dataframe.loc[act.key, "reference product"] == ""
+    assert set(AB_metadata.dataframe.columns) == set(df.columns)
+    AB_metadata.reset_metadata()
+
+
+def test_metadata_data_fields_lazy(calculation_setup):
+    """ The data fields are only read for the activities they are needed
+    for, all of them are read when the dataframe is.
+    """
+    AB_metadata.reset_metadata()
+    AB_metadata.add_metadata(["testdb", "biosphere3"])
+    assert AB_metadata._unread == set(AB_metadata.index)
+    assert AB_metadata.get_labels([("testdb", "a")], ["name"]) == ["process a"]
+    assert ("testdb", "a") in AB_metadata._unread
+
+    act = bw.get_activity(("testdb", "a"))
+    label = AB_metadata.get_labels([act.key], ["name", "unit"])
+    assert label == ["{} | {}".format(act["name"], act["unit"])]
+    metadata = AB_metadata.get_metadata([("biosphere3", "co2")], ["categories"])
+    assert metadata.loc[("biosphere3", "co2"), "categories"] == ("air",)
+    assert AB_metadata._unread == set(AB_metadata.index) - {act.key, ("biosphere3", "co2")}
+
+    df = AB_metadata.dataframe
+    assert not AB_metadata._unread
+    assert all(df.loc[key, "unit"] == bw.get_activity(key).get("unit", "") for key in df.index)
+    AB_metadata.reset_metadata()
+
+
+def test_metadata_store_cache(calculation_setup, monkeypatch):
+    """ The metadata of a database is stored on disk until the database is
+    modified, it is then read again including changes made without
+    `update_metadata`.
+    """
+    AB_metadata.reset_metadata()
+    AB_metadata.clear()
+    AB_metadata.add_metadata(["testdb"])
+    df = AB_metadata.dataframe.copy()
+
+    def fail(*args, **kwargs):
+        raise AssertionError("Metadata should be loaded from disk")
+    with monkeypatch.context() as m:
+        m.setattr(MetaDataStore, "_build_dataframe", fail)
+        AB_metadata.reset_metadata()
+        AB_metadata.add_metadata(["testdb"])
+        pd.testing.assert_frame_equal(AB_metadata.dataframe, df)
+
+    untracked = bw.get_activity(("testdb", "a"))
+    untracked["name"] = "renamed a"
+    untracked.save()
+    act = bw.get_activity(("testdb", "b"))
+    act["name"] = "renamed b"
+    act.save()
+    bw.databases.set_modified("testdb")
+    AB_metadata.update_metadata(act.key)
+    assert AB_metadata.dataframe.loc[act.key, "name"] == "renamed b"
+    assert AB_metadata.load_database("testdb") is None
+
+    AB_metadata.reset_metadata()
+    AB_metadata.add_metadata(["testdb"])
+    assert AB_metadata.dataframe.loc[untracked.key, "name"] == "renamed a"
+    with monkeypatch.context() as m:
+        m.setattr(MetaDataStore, "_build_dataframe", fail)
+        AB_metadata.reset_metadata()
+        AB_metadata.add_metadata(["testdb"])
+        assert AB_metadata.dataframe.loc[act.key, "name"] == "renamed b"
+
+        bw.databases.set_modified("testdb")
+        AB_metadata.reset_metadata()
+        with pytest.raises(AssertionError):
+            AB_metadata.add_metadata(["testdb"])
+    AB_metadata.reset_metadata()
+    AB_metadata.clear()
+
+
+def test_metadata_store_unreadable_cache(calculation_setup, monkeypatch):
+    """ Stored metadata which can not be loaded is removed and read again."""
+    AB_metadata.reset_metadata()
+    AB_metadata.clear()
+    AB_metadata.add_metadata(["testdb"])
+    path = AB_metadata._path("testdb")
+    assert path.is_file()
+
+    def incompatible(*args, **kwargs):
+        raise ImportError("pickled by another version of pandas")
+    with monkeypatch.context() as m:
+        m.setattr(pickle, "load", incompatible)
+        assert AB_metadata.load_database("testdb") is None
+    assert not path.is_file()
+    AB_metadata.reset_metadata()
+    AB_metadata.add_metadata(["testdb"])
+    assert ("testdb", "a") in AB_metadata.index
+    assert path.is_file()
+    AB_metadata.reset_metadata()
+    AB_metadata.clear()
+
+
+def test_update_metadata_batch(calculation_setup, monkeypatch):
+    """ Updates are buffered and merged into the metadata at once when it
+    is read.
+    """
+    AB_metadata.reset_metadata()
+    AB_metadata.add_metadata(["testdb"])
+    db = bw.Database("testdb")
+    new = [db.new_activity("new{}".format(i), name="new {}".format(i), type="process") for i in range(3)]
+    for act in new:
+        act.save()
+    renamed = bw.get_activity(("testdb", "a"))
+    renamed["name"] = "renamed a"
+    renamed.save()
+    bw.get_activity(("testdb", "c")).delete()
+
+    calls = []
+    build = MetaDataStore._build_dataframe
+    monkeypatch.setattr(
+        MetaDataStore, "_build_dataframe", staticmethod(lambda rows: calls.append(rows) or build(rows))
+    )
+    AB_metadata.update_metadata([act.key for act in new])
+    AB_metadata.update_metadata(renamed.key)
+    AB_metadata.update_metadata(("testdb", "c"))
+    assert not calls
+
+    df = AB_metadata.dataframe
+    assert len(calls) == 1
+    assert df.loc[renamed.key, "name"] == "renamed a"
+    assert ("testdb", "c") not in df.index
+    assert all(act.key in df.index for act in new)
+    assert not df.isna().any().any()
+    AB_metadata.reset_metadata()
+
+
+def test_update_metadata_labels(calculation_setup):
+    """ Labels include the buffered updates of the metadata."""
+    AB_metadata.reset_metadata()
+    AB_metadata.add_metadata(["testdb"])
+    assert AB_metadata.get_labels([("testdb", "a")], ["name"]) == ["process a"]
+    act = bw.get_activity(("testdb", "a"))
+    act["name"] = "renamed a"
+    act.save()
+    AB_metadata.update_metadata(act.key)
+    assert AB_metadata.get_labels([("testdb", "a")], ["name"]) == ["renamed a"]
+    AB_metadata.reset_metadata()
+
+
+def test_copy_activities_batch(calculation_setup, monkeypatch):
+    """ Copies get their codes from one read of the metadata and are merged
+    into it once.
+    """
+    AB_metadata.reset_metadata()
+    AB_metadata.add_metadata(["testdb"])
+    assert ActivityController.generate_copy_codes(
+        [("testdb", "a"), ("testdb", "a_copy1"), ("testdb", "b")]
+    ) == ["a_copy1", "a_copy2", "b_copy1"]
+
+    calls = []
+    build = MetaDataStore._build_dataframe
+    monkeypatch.setattr(
+        MetaDataStore, "_build_dataframe", staticmethod(lambda rows: calls.append(rows) or build(rows))
+    )
+    acts = [bw.get_activity(("testdb", "a")), bw.get_activity(("testdb", "a"))]
+    new_keys = ActivityController._copy_activities("testdb", acts)
+    assert new_keys == [("testdb", "a_copy1"), ("testdb", "a_copy2")]
+    df = AB_metadata.dataframe
+    assert len(calls) == 1
+    assert all(key in df.index for key in new_keys)
+    assert ActivityController.generate_copy_code(("testdb", "a")) == "a_copy3"
+    AB_metadata.reset_metadata()
@@ -0,0 +1,155 @@
+# -*- coding: utf-8 -*-
+import multiprocessing
+
+import brightway2 as bw
+import numpy as np
+import pandas as pd
+import pytest
+
+from activity_browser.bwutils import (
+    MLCA, MonteCarloLCA, SharedGraphTraversal, SuperstructureMLCA,
+)
+from activity_browser.settings import ab_settings
+
+
+def test_mlca_batched_solve(calculation_setup):
+    """ Solving all reference flows at once gives the same results as
+    separate LCA calculations.
+    """
+    mlca = MLCA(calculation_setup)
+    mlca.calculate()
+    assert mlca.lca_scores.shape == (2, 2)
+
+    for row, func_unit in enumerate(mlca.func_units):
+        for col, method in enumerate(mlca.methods):
+            lca = bw.LCA(func_unit, method)
+            lca.lci()
+            lca.lcia()
+            assert mlca.lca_scores[row, col] == pytest.approx(lca.score)
+            assert np.allclose(mlca.scaling_factors[str(func_unit)], lca.supply_array)
+            assert mlca.process_contributions[row, col].sum() == pytest.approx(lca.score)
+            assert mlca.elementary_flow_contributions[row, col].sum() == pytest.approx(lca.score)
+
+
+def test_mlca_lazy_characterized_inventories(calculation_setup):
+    """ Characterized inventories are constructed on request and sum up to
+    the LCA score.
+    """
+    mlca = MLCA(calculation_setup)
+    mlca.calculate()
+    assert len(mlca.inventory_cache) == 0
+    assert len(mlca.characterized_inventories) == 4
+    for (row, col), score in np.ndenumerate(mlca.lca_scores):
+        matrix = mlca.characterized_inventories[(row, col)]
+        assert matrix.sum() == pytest.approx(score)
+    assert len(mlca.inventory_cache) > 0
+
+
+def test_mlca_update_methods(calculation_setup, no_result_cache):
+    """ Adding and removing impact categories gives the same results as a
+    complete recalculation.
+    """
+    mlca = MLCA(calculation_setup)
+    mlca.calculate()
+    bw.Method(("test", "co2")).write([(("biosphere3", "co2"), 1)])
+    methods = [("test", "co2"), ("test", "gwp")]
+    mlca.update_methods(methods)
+
+    bw.calculation_setups[calculation_setup]["ia"] = methods
+    expected = MLCA(calculation_setup)
+    expected.calculate()
+    assert mlca.methods == expected.methods
+    assert np.allclose(mlca.lca_scores, expected.lca_scores)
+    assert np.allclose(mlca.process_contributions, expected.process_contributions)
+    assert np.allclose(
+        mlca.elementary_flow_contributions, expected.elementary_flow_contributions
+    )
+
+
+def test_mlca_rescale(calculation_setup, no_result_cache):
+    """ Changing only the reference flow amounts rescales the results.
+    """
+    mlca = MLCA(calculation_setup)
+    mlca.calculate()
+    func_units = [{("testdb", "a"): 3}, {("testdb", "c"): 1}]
+    assert mlca.can_rescale(func_units)
+    assert not mlca.can_rescale([{("testdb", "b"): 3}, {("testdb", "c"): 1}])
+    mlca.rescale(func_units)
+
+    bw.calculation_setups[calculation_setup]["inv"] = func_units
+    expected = MLCA(calculation_setup)
+    expected.calculate()
+    assert np.allclose(mlca.lca_scores, expected.lca_scores)
+    assert np.allclose(mlca.process_contributions, expected.process_contributions)
+    for key, supply in expected.scaling_factors.items():
+        assert np.allclose(mlca.scaling_factors[key], supply)
+
+
+@pytest.mark.skipif(
+    "fork" not in multiprocessing.get_all_start_methods(),
+    reason="Parallel calculations require forking processes"
+)
+def test_mlca_parallel(calculation_setup, monkeypatch, no_result_cache):
+    """ Calculating the reference flows in worker processes gives the same
+    results as a serial calculation.
+    """
+    mlca = MLCA(calculation_setup)
+    mlca.calculate()
+    monkeypatch.setattr(type(ab_settings), "calculation_processes", 2)
+    parallel = MLCA(calculation_setup)
+    assert len(parallel._chunks(2)) == 2
+    parallel.calculate()
+    assert np.allclose(parallel.lca_scores, mlca.lca_scores)
+    assert np.allclose(parallel.process_contributions, mlca.process_contributions)
+    assert parallel.scaling_factors.keys() == mlca.scaling_factors.keys()
+
+
+@pytest.mark.skipif(
+    "fork" not in multiprocessing.get_all_start_methods(),
+    reason="Parallel calculations require forking processes"
+)
+def test_superstructure_parallel(calculation_setup, monkeypatch, no_result_cache):
+    """ Scenarios calculated in worker processes give the same results and
+    leave the MLCA in the same state as a serial calculation.
+    """
+    df = pd.DataFrame(
+        {"low": [2.0, 0.5], "mid": [np.nan, 0.6], "high": [4.0, np.nan]},
+        index=pd.MultiIndex.from_tuples([
+            (("testdb", "b"), ("testdb", "a")), (("biosphere3", "co2"), ("testdb", "b")),
+        ]),
+    )
+    serial = SuperstructureMLCA(calculation_setup, df)
+    serial.calculate()
+    # The inventories of scenarios with missing values use the values the
+    # calculation of the scenario used.
+    for index, score in np.ndenumerate(serial.lca_scores):
+        assert serial.characterized_inventories[index].sum() == pytest.approx(score)
+    monkeypatch.setattr(type(ab_settings), "calculation_processes", 2)
+    parallel = SuperstructureMLCA(calculation_setup, df)
+    assert len(parallel._chunks(2)) == 2
+    parallel.calculate()
+    assert np.allclose(parallel.lca_scores, serial.lca_scores)
+    assert parallel.current == serial.current
+    assert np.allclose(parallel.lca.technosphere_matrix.toarray(), serial.lca.technosphere_matrix.toarray())
+    assert np.allclose(parallel.lca.biosphere_matrix.toarray(), serial.lca.biosphere_matrix.toarray())
+
+
+def test_shared_lca(calculation_setup):
+    """ The Monte Carlo LCA and the graph traversal draw their matrices from
+    the MLCA without altering them.
+    """
+    mlca = MLCA(calculation_setup)
+    mlca.calculate()
+    technosphere = mlca.lca.technosphere_matrix
+    solver = mlca.lca.solver
+
+    mc = MonteCarloLCA(calculation_setup, lca=mlca.copy_lca(factorized=False))
+    assert not hasattr(mc.lca, "solver")
+    mc.calculate(iterations=2, seed=42)
+    assert mc.results.shape == (2, 2, 2)
+    assert mlca.lca.technosphere_matrix is technosphere
+
+    traversal = SharedGraphTraversal(mlca)
+    lca, supply, score = traversal.build_lca({("testdb", "c"): 2}, ("test", "gwp"))
+    assert lca.solver is solver
+    assert np.isclose(score, mlca.lca_scores[1, 0])
@@ -0,0 +1,48 @@
+# -*- coding: utf-8 -*-
+import json
+import tracemalloc
+
+import numpy as np
+
+from activity_browser.bwutils.profiling import Profiler
+
+
+def test_profiler_stages():
+    """ Nested stages are recorded with their depth and exported as Chrome
+    trace events.
+    """
+    profiler = Profiler()
+    with profiler.stage("outer", "test"):
+        with profiler.stage("inner", "test"):
+            np.zeros(1000)
+    inner, outer = profiler.records
+    assert (inner.name, inner.depth) == ("inner", 1)
+    assert (outer.name, outer.depth) == ("outer", 0)
+    assert outer.duration >= inner.duration
+    assert inner.peak_memory is None
+    events = json.loads(profiler.to_chrome_trace())["traceEvents"]
+    assert [e["name"] for e in events] == ["inner", "outer"]
+    assert all(e["ph"] == "X" for e in events)
+
+
+def test_profiler_peak_memory(monkeypatch):
+    """ The peak memory of a stage is measured from the start of the stage,
+    and not reported when the peak can not be reset.
+    """
+    profiler = Profiler()
+    profiler.trace_memory = True
+    try:
+        with profiler.stage("before"):
+            np.ones(10 ** 6)
+        with profiler.stage("small"):
+            np.ones(10)
+        monkeypatch.delattr(tracemalloc, "reset_peak", raising=False)
+        with profiler.stage("unavailable"):
+            np.ones(10)
+    finally:
+        profiler.trace_memory = False
+    before, small, unavailable = profiler.records
+    if before.peak_memory is not None:
+        assert before.peak_memory >= 8 * 10 ** 6
+        assert small.peak_memory < 10 ** 6
+    assert unavailable.peak_memory is None
@@ -0,0 +1,31 @@
+# -*- coding: utf-8 -*-
+import brightway2 as bw
+import numpy as np
+
+from activity_browser.bwutils import MLCA
+from activity_browser.bwutils.pruning import ReducedSolver
+
+
+def test_mlca_reachability_pruning(calculation_setup, no_result_cache):
+    """ Only the activities reachable from the reference flows are solved,
+    the supply is mapped back onto the full indices.
+    """
+    func_unit = {("testdb", "a"): 1}
+    bw.calculation_setups["pruned_cs"] = {"inv": [func_unit], "ia": [("test", "gwp")]}
+    mlca = MLCA("pruned_cs")
+    mlca.calculate()
+    assert isinstance(mlca.lca.solver, ReducedSolver)
+    assert mlca.lca.solver.size == 2
+
+    lca = bw.LCA(func_unit, ("test", "gwp"))
+    lca.lci()
+    lca.lcia()
+    assert np.isclose(mlca.lca_scores[0, 0], lca.score)
+    assert np.allclose(mlca.scaling_factors[str(func_unit)], lca.supply_array)
+
+    # Demand outside of the reduced system is solved with the full system.
+    demand = np.zeros(len(mlca.lca.product_dict))
+    demand[mlca.lca.product_dict[("testdb", "c")]] = 1
+    assert np.allclose(
+        mlca.lca.solver(demand), np.linalg.solve(mlca.lca.technosphere_matrix.toarray(), demand)
+    )
@@ -0,0 +1,43 @@
+# -*- coding: utf-8 -*-
+import brightway2 as bw
+import numpy as np
+
+from activity_browser.bwutils import MLCA
+from activity_browser.bwutils.result_cache import result_cache
+
+
+def test_mlca_result_cache(calculation_setup, monkeypatch):
+    """ Results of an unchanged calculation setup are loaded from the cache,
+    modifying a database invalidates the cached results.
+    """
+    monkeypatch.setattr(type(result_cache), "max_size", 1024 ** 2)
+    mlca = MLCA(calculation_setup)
+    mlca.calculate()
+    assert len(list(result_cache.directory.glob("*.npz"))) == 1
+
+    def fail():
+        raise AssertionError("Results should be loaded from the cache")
+    cached = MLCA(calculation_setup)
+    monkeypatch.setattr(cached, "_perform_calculations", fail)
+    cached.calculate()
+    assert np.allclose(cached.lca_scores, mlca.lca_scores)
+    assert np.allclose(cached.process_contributions, mlca.process_contributions)
+    assert cached.scaling_factors.keys() == mlca.scaling_factors.keys()
+
+    bw.databases.set_modified("testdb")
+    changed = MLCA(calculation_setup)
+    assert changed._result_cache_key() != mlca._result_cache_key()
+    changed.calculate()
+    # The stale results are replaced.
+    assert len(list(result_cache.directory.glob("*.npz"))) == 1
+
+
+def test_result_cache_oversized_entry(calculation_setup, monkeypatch):
+    """ Results larger than the cache are not stored and never evict the
+    results already in the cache.
+    """
+    monkeypatch.setattr(type(result_cache), "max_size", 1024)
+    result_cache.save("small", "results", {"scores": np.zeros(10)})
+    result_cache.save("large", "results", {"scores": np.zeros(1024)})
+    assert [p.name for p in result_cache.directory.glob("*.npz")] == ["small_results.npz"]
+    assert result_cache.load("large", "results") is None
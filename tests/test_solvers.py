@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+import brightway2 as bw
+import numpy as np
+
+from activity_browser.bwutils import MLCA, MonteCarloLCA
+from activity_browser.bwutils import solvers
+from activity_browser.bwutils.pruning import ReducedSolver
+from activity_browser.bwutils.solvers import IterativeSolver, LowRankSolver
+from activity_browser.settings import ab_settings
+
+
+def test_mlca_iterative_solver(calculation_setup, monkeypatch, no_result_cache):
+    """ Altered technosphere matrices are solved iteratively, preconditioned
+    with the first factorization, and directly when that does not converge.
+    """
+    monkeypatch.setattr(type(ab_settings), "solver_strategy", "bicgstab")
+    mlca = MLCA(calculation_setup)
+    mlca.calculate()
+    assert not isinstance(mlca.lca.solver, IterativeSolver)
+
+    technosphere = mlca.lca.technosphere_matrix.tocsr(copy=True)
+    technosphere.data[technosphere.data < 0] *= 1.1
+    mlca.lca.technosphere_matrix = technosphere
+    del mlca.lca.solver
+    demand = mlca._build_demand_matrix()
+    supply = mlca._solve_demand_matrix(demand)
+    assert isinstance(mlca.lca.solver, IterativeSolver)
+    assert np.allclose(supply, np.linalg.solve(technosphere.toarray(), demand))
+    # Both reference flows start from their last solution.
+    mlca._solve_demand_matrix(demand)
+    assert mlca.lca.solver.hits == 2
+
+    # Without a useful preconditioner the iteration stops early and the
+    # matrix is solved directly.
+    solver = IterativeSolver(lambda x: x, technosphere, maxiter=1)
+    assert np.allclose(solver(demand), np.linalg.solve(technosphere.toarray(), demand))
+
+
+def test_monte_carlo_shared_factorization(calculation_setup, monkeypatch, no_result_cache):
+    """ The iterative Monte Carlo solves are preconditioned with the
+    factorization shared by the MLCA, and start from the last solution of
+    each demand.
+    """
+    monkeypatch.setattr(type(ab_settings), "solver_strategy", "bicgstab")
+    mlca = MLCA(calculation_setup)
+    mlca.calculate()
+    mc = MonteCarloLCA(calculation_setup, lca=mlca.copy_lca())
+    assert mc._baseline_solver is mlca.lca.solver
+
+    def fail(*args, **kwargs):
+        raise AssertionError("The technosphere matrix should not be factorized again")
+    monkeypatch.setattr(solvers, "factorized", fail)
+    mc.calculate(iterations=3, technosphere=False)
+    assert mc._baseline_solver is mlca.lca.solver
+    assert isinstance(mc.lca.solver, IterativeSolver)
+    # Every iteration solves the demand of both reference flows and of
+    # each reference flow, all but the first iteration start warm.
+    solver = mc.lca.solver
+    assert len(solver.previous) == solver.warm_starts == len(mc.func_units) + 1
+    assert solver.hits == 2 * solver.warm_starts
+
+    # A factorization of the reachable system only preconditions the solves
+    # of the full system without factorizing the full matrix.
+    bw.calculation_setups["pruned_cs"] = {"inv": [{("testdb", "a"): 1}], "ia": [("test", "gwp")]}
+    pruned = MLCA("pruned_cs")
+    pruned.calculate()
+    reduced = pruned.lca.solver
+    assert isinstance(reduced, ReducedSolver)
+    mc = MonteCarloLCA("pruned_cs", lca=pruned.copy_lca())
+    mc.calculate(iterations=2, technosphere=False)
+    assert mc._baseline_solver is reduced
+    assert reduced._full_solver is None
+    assert mc.lca.solver.fallbacks == 0
+    assert np.allclose(mc.results[:, 0, 0], pruned.lca_scores[0, 0])
+
+
+def test_mlca_low_rank_update(calculation_setup, monkeypatch, no_result_cache):
+    """ Technosphere matrices which are altered in a few rows or columns are
+    solved with a low-rank update of the first factorization.
+    """
+    monkeypatch.setattr(MLCA, "_low_rank_updates", True)
+    mlca = MLCA(calculation_setup)
+    mlca.calculate()
+    demand = mlca._build_demand_matrix()
+
+    # Alter the technosphere matrix in place, like the scenarios do.
+    technosphere = mlca.lca.technosphere_matrix
+    row = mlca.lca.product_dict[("testdb", "b")]
+    col = mlca.lca.activity_dict[("testdb", "a")]
+    technosphere[row, col] = -3
+    del mlca.lca.solver
+    supply = mlca._solve_demand_matrix(demand)
+    assert isinstance(mlca.lca.solver, LowRankSolver)
+    assert mlca.lca.solver.rank == 1
+    assert np.allclose(supply, np.linalg.solve(technosphere.toarray(), demand))
+
+    # Above the threshold the matrix is factorized again.
+    monkeypatch.setattr(type(ab_settings), "low_rank_threshold", 0)
+    technosphere[row, col] = -4
+    del mlca.lca.solver
+    supply = mlca._solve_demand_matrix(demand)
+    assert not isinstance(mlca.lca.solver, LowRankSolver)
+    assert np.allclose(supply, np.linalg.solve(technosphere.toarray(), demand))
@@ -0,0 +1,33 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+
+from activity_browser.bwutils.utils import LRUCache, TopContributionArray
+
+
+def test_lru_cache_eviction():
+    """ The least recently used values are dropped when the cache is full.
+    """
+    cache = LRUCache(max_size=16)
+    cache["a"] = np.zeros(1)
+    cache["b"] = np.zeros(1)
+    assert cache.size == 16
+    cache["a"]
+    cache["c"] = np.zeros(1)
+    assert "a" in cache and "c" in cache
+    assert "b" not in cache
+    # Values larger than the budget are never stored.
+    cache["d"] = np.zeros(3)
+    assert "d" not in cache
+
+
+def test_top_contribution_array():
+    """ Only the largest contributions are kept, the remainder is summed
+    into the residual.
+    """
+    array = TopContributionArray((2, 4), k=2)
+    array[0] = np.array([1., -5., 2., 0.5])
+    array[1] = np.array([0., 0., 3., 0.])
+    assert np.allclose(array[0], [0., -5., 2., 0.])
+    assert np.allclose(array.residual, [1.5, 0.])
+    assert np.allclose(array.take(1, axis=0), [0., 0., 3., 0.])
+    assert array.nbytes < np.zeros((2, 4)).nbytes * 2